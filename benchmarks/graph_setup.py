@@ -0,0 +1,66 @@
+"""Per-run graph setup overhead: rebuilding the app versus the cached compiled app.
+
+Measures what ``run_pipeline`` pays before the first node executes. ``create_app`` rebuilds
+the ``StateGraph``, re-adds every node and recompiles; ``get_app`` returns the process-wide
+compiled app after the first call.
+
+Usage (from the repo root):
+
+    python benchmarks/graph_setup.py
+    python benchmarks/graph_setup.py --runs 200
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def _time_calls(factory: Callable[[], object], runs: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        factory()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(label: str, timings: List[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    print(
+        f"{label:<22} median {statistics.median(timings) * 1e3:9.3f} ms"
+        f"   p95 {p95 * 1e3:9.3f} ms   total {sum(timings):7.3f}s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50, help="Setups per mode (default: 50)")
+    args = parser.parse_args()
+    runs = max(1, args.runs)
+
+    from src.orchestration.graph import clear_app_cache, create_app, get_app
+
+    # Import cost is paid once by both modes; keep it out of the comparison.
+    create_app()
+
+    print(f"graph setup over {runs} runs")
+    _report("create_app() per run", _time_calls(create_app, runs))
+
+    clear_app_cache()
+    first_started = time.perf_counter()
+    get_app()
+    first_call = time.perf_counter() - first_started
+    _report("get_app() cached", _time_calls(get_app, runs))
+    print(f"{'get_app() first call':<22} {first_call * 1e3:9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
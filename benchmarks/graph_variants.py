@@ -0,0 +1,80 @@
+"""Compare graph variants end to end on the same problems.
+
+Runs every problem through each variant (live LLM calls; configure `.env` first) and
+reports wall time, LLM calls/tokens, final status and which artifacts were produced.
+
+Usage (from the repo root):
+
+    python benchmarks/graph_variants.py problems/p1.txt problems/p2.txt
+    python benchmarks/graph_variants.py problems/*.txt --variants generation,full
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+ARTIFACTS = ("model_builder", "datagen", "solution_checker")
+
+
+def _run_one(problem_text: str, variant: str) -> Dict[str, Any]:
+    from src.__main__ import run_pipeline
+
+    started = time.perf_counter()
+    model_pack = asyncio.run(run_pipeline(problem_text, graph_variant=variant))
+    summary = model_pack.tests.get("llm_trace_summary") or {}
+    return {
+        "seconds": time.perf_counter() - started,
+        "status": model_pack.status,
+        "llm_calls": summary.get("call_count", 0),
+        "llm_tokens": summary.get("total_tokens", 0),
+        "artifacts": [name for name in ARTIFACTS if getattr(model_pack.code, name, None)],
+        "timeouts": len(model_pack.tests.get("node_timeouts") or []),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("problems", nargs="+", help="Problem text files")
+    parser.add_argument(
+        "--variants",
+        default="generation,main,full",
+        help="Comma-separated variant names or spec paths (default: generation,main,full)",
+    )
+    args = parser.parse_args()
+
+    variants = [variant.strip() for variant in args.variants.split(",") if variant.strip()]
+    problems = [(path, Path(path).read_text(encoding="utf-8")) for path in args.problems]
+    results: Dict[str, List[Dict[str, Any]]] = {variant: [] for variant in variants}
+
+    for path, problem_text in problems:
+        for variant in variants:
+            result = _run_one(problem_text, variant)
+            results[variant].append(result)
+            print(
+                f"{variant:<12} {Path(path).name:<28} {result['seconds']:8.1f}s "
+                f"calls={result['llm_calls']:<3} tokens={result['llm_tokens']:<7} "
+                f"status={result['status']} artifacts={','.join(result['artifacts']) or '-'}"
+            )
+
+    print()
+    print(f"{'variant':<12} {'median s':>9} {'total s':>9} {'calls':>6} {'tokens':>9} {'timeouts':>9}")
+    for variant, rows in results.items():
+        print(
+            f"{variant:<12} {statistics.median(row['seconds'] for row in rows):9.1f} "
+            f"{sum(row['seconds'] for row in rows):9.1f} "
+            f"{sum(row['llm_calls'] for row in rows):6d} "
+            f"{sum(row['llm_tokens'] for row in rows):9d} "
+            f"{sum(row['timeouts'] for row in rows):9d}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
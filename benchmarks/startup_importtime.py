@@ -0,0 +1,121 @@
+"""Startup import-time benchmark for the CLI and worker entry points.
+
+Runs each scenario in a fresh interpreter under ``python -X importtime`` and reports the
+wall time, the cumulative import time, the slowest top-level imports, and which heavy
+dependencies were loaded.
+
+Usage (from the repo root):
+
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --repeat 5 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("litellm", "instructor", "langgraph", "pyomo", "numpy")
+
+SCENARIOS: Dict[str, List[str]] = {
+    "cli_help": ["-m", "src", "--help"],
+    "import_entrypoint": ["-c", "import src.__main__"],
+    "single_agent_path": [
+        "-c",
+        "import src.__main__; import src.agents.build_model; import src.llm",
+    ],
+    "graph_module": ["-c", "import src.orchestration.graph"],
+}
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime`` output."""
+    rows: List[Tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:") :].split("|", 2)
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        # Keep the indentation after the column separator: it encodes import nesting.
+        rows.append((parts[2][1:].rstrip(), self_us, cumulative_us))
+    return rows
+
+
+def _run_scenario(args: List[str]) -> Tuple[float, List[Tuple[str, int, int]]]:
+    env = dict(os.environ)
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        tail = "\n".join(completed.stderr.splitlines()[-5:])
+        raise RuntimeError(f"scenario {' '.join(args)} failed:\n{tail}")
+    return elapsed, _parse_importtime(completed.stderr)
+
+
+def _top_level_rows(rows: List[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+    # Top-level imports are printed without leading indentation after the separator.
+    return [
+        (name.strip(), self_us, cum_us)
+        for name, self_us, cum_us in rows
+        if not name.startswith(" ")
+    ]
+
+
+def _loaded_heavy_modules(rows: List[Tuple[str, int, int]]) -> List[str]:
+    loaded = {name.strip().split(".")[0] for name, _, _ in rows}
+    return [module for module in HEAVY_MODULES if module in loaded]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10)")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Restrict to one or more scenarios (default: all)",
+    )
+    args = parser.parse_args()
+
+    for name in args.scenario or list(SCENARIOS):
+        wall_times: List[float] = []
+        cumulative_totals: List[int] = []
+        rows: List[Tuple[str, int, int]] = []
+        for _ in range(max(1, args.repeat)):
+            elapsed, rows = _run_scenario(SCENARIOS[name])
+            wall_times.append(elapsed)
+            cumulative_totals.append(sum(cum_us for _, _, cum_us in _top_level_rows(rows)))
+
+        print(f"== {name}")
+        print(f"  wall time (median of {len(wall_times)}): {statistics.median(wall_times):.3f}s")
+        print(f"  import time (median):      {statistics.median(cumulative_totals) / 1e6:.3f}s")
+        heavy = _loaded_heavy_modules(rows)
+        print(f"  heavy modules loaded:      {', '.join(heavy) if heavy else 'none'}")
+        print("  slowest top-level imports:")
+        for module, _, cum_us in sorted(_top_level_rows(rows), key=lambda row: -row[2])[: args.top]:
+            print(f"    {cum_us / 1e3:9.1f} ms  {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,15 @@
 # modelpack/__init__.py
-from .schemas import ModelPack, ComponentsNL, ComponentsMATH, CodePack
-from .llm import llm_client, LLMClient
+import importlib
+from typing import Any
+
+_LAZY_EXPORTS = {
+    "ModelPack": ".schemas",
+    "ComponentsNL": ".schemas",
+    "ComponentsMATH": ".schemas",
+    "CodePack": ".schemas",
+    "llm_client": ".llm",
+    "LLMClient": ".llm",
+}
 
 __all__ = [
     "ModelPack",
@@ -10,3 +19,12 @@ __all__ = [
     "llm_client",
     "LLMClient",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,58 +2,124 @@
 
 import asyncio
 import argparse
+import json
+import os
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict
+
 import structlog
 from dotenv import load_dotenv
 
-from .agents.build_model import (
-    _apply_create_model_autofixes,
-    _validate_create_model_entrypoint,
-)
-from .llm import llm_client
-from .prompts import PROMPTS, llm_problem_text
-from .schemas import CodeBlob, ModelPack
+if TYPE_CHECKING:
+    from .orchestration.budget import RunBudget
+    from .orchestration.context import PipelineContext
+    from .schemas import ModelPack
 
+# Pipeline modules (pydantic, LLM client, agents) are imported inside the run functions so
+# that `--help` and argument errors return without loading them.
 load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 logger = structlog.get_logger(__name__)
 
+_LOGGING_CONFIGURED = False
+_LOGGING_LOCK = threading.Lock()
+
+
+def configure_logging(verbose: bool) -> None:
+    """Configure structlog once per process (it is global state shared by every run)."""
+    global _LOGGING_CONFIGURED
+    if not verbose:
+        return
+    with _LOGGING_LOCK:
+        if _LOGGING_CONFIGURED:
+            return
+        structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(0))
+        _LOGGING_CONFIGURED = True
+
 
-def _attach_llm_trace(model_pack: ModelPack, trace_payload: dict[str, object]) -> None:
+def _attach_llm_trace(model_pack: "ModelPack", trace_payload: dict[str, object]) -> None:
     detailed_calls = [
         dict(call) for call in trace_payload.get("calls", []) if isinstance(call, dict)
     ]
     model_pack.tests["llm_trace"] = detailed_calls
+    blobs = trace_payload.get("blobs")
+    model_pack.tests["llm_trace_blobs"] = dict(blobs) if isinstance(blobs, dict) else {}
+    summary = trace_payload.get("summary")
+    if isinstance(summary, dict):
+        model_pack.tests["llm_trace_summary"] = summary
+
+
+def export_llm_trace(model_pack: "ModelPack", directory: str | Path) -> dict[str, str]:
+    """Write a run's trace as ``calls.jsonl`` plus content-addressed ``blobs/``."""
+    from .trace_store import export_trace
+
+    return export_trace(
+        directory,
+        calls=list(model_pack.tests.get("llm_trace") or []),
+        blobs=dict(model_pack.tests.get("llm_trace_blobs") or {}),
+        summary=model_pack.tests.get("llm_trace_summary"),
+    )
 
 
 async def run_pipeline(
     problem_text: str,
     target_interface: str = "",
-) -> ModelPack:
-    """Run the full modeling pipeline on a natural language problem."""
+    budget: "RunBudget | None" = None,
+    graph_variant: str | None = None,
+    model_pack: "ModelPack | None" = None,
+    context: "PipelineContext | None" = None,
+    screen_policy: "Dict[str, Any] | None" = None,
+    solve_policy: "Dict[str, Any] | None" = None,
+) -> "ModelPack":
+    """Run the full modeling pipeline on a natural language problem.
+
+    ``budget`` bounds the run (default: ``RUN_MAX_*`` env vars); an exhausted run ends
+    early with status ``budget_exhausted``. ``graph_variant`` names a bundled graph spec
+    or a spec file (default: ``GRAPH_VARIANT`` or ``main``). ``model_pack`` starts the run
+    from a pre-seeded pack (see ``context["preseeded_stages"]``). ``context`` isolates the
+    run's LLM client, trace, budget, executor and caches from concurrent runs in the same
+    process (default: a fresh ``PipelineContext`` with the process-wide client).
+    ``screen_policy`` / ``solve_policy`` override ``ScreenPolicy`` / ``SolvePolicy`` fields
+    for this run's ``screen_data`` / ``solve_model``.
+    """
+    from .orchestration.context import PipelineContext
+    from .orchestration.graph import get_app
+    from .schemas import ModelPack
+
     logger.info("starting_pipeline", problem_length=len(problem_text))
 
     # Initialize state
-    model_pack = ModelPack()
+    model_pack = model_pack if model_pack is not None else ModelPack()
     model_pack.context["nl_problem"] = problem_text
     target_interface = (target_interface or "").strip()
     if target_interface:
         model_pack.context["target_interface"] = target_interface
-
-    # Create and run app
-    from .orchestration.graph import create_app
-
-    app = create_app()
+    if screen_policy:
+        model_pack.context["screen_policy"] = dict(screen_policy)
+    if solve_policy:
+        model_pack.context["solve_policy"] = dict(solve_policy)
+
+    context = context if context is not None else PipelineContext()
+    if budget is not None:
+        context.budget = budget
+    model_pack.context["run_id"] = context.run_id
+
+    # Reuse the process-wide compiled app
+    graph_variant = graph_variant or os.getenv("GRAPH_VARIANT") or "main"
+    model_pack.context["graph_variant"] = graph_variant
+    app = get_app(graph_variant)
     initial_state = {"model_pack": model_pack}
 
     # Execute pipeline
-    trace_token = llm_client.begin_trace()
     result = None
     try:
-        result = await app.ainvoke(initial_state)
+        with context.activate():
+            result = await app.ainvoke(initial_state, config=context.as_config())
     finally:
-        trace_payload = llm_client.end_trace(trace_token)
         target_model_pack = result["model_pack"] if result is not None else model_pack
-        _attach_llm_trace(target_model_pack, trace_payload)
+        if context.trace_payload is not None:
+            _attach_llm_trace(target_model_pack, context.trace_payload)
+        target_model_pack.tests["spans"] = context.spans
 
     logger.info("pipeline_complete", status=result["model_pack"].status)
     return result["model_pack"]
@@ -61,8 +127,17 @@ async def run_pipeline(
 
 async def run_single_agent_generation(
     problem_text: str,
-) -> ModelPack:
+) -> "ModelPack":
     """Run a direct single-agent create_model baseline on the provided input."""
+    from .agents.build_model import (
+        _apply_create_model_autofixes,
+        _create_model_output_validator,
+        _validate_create_model_entrypoint,
+    )
+    from .llm import llm_caller, llm_client
+    from .prompts import PROMPTS, llm_problem_text
+    from .schemas import CodeBlob, ModelPack
+
     logger.info("starting_single_agent_generation", problem_length=len(problem_text))
 
     model_pack = ModelPack()
@@ -87,13 +162,15 @@ async def run_single_agent_generation(
                 }
             ],
         }
-        code = llm_client.code_generation_call(
-            sys_prompt=system_prompt,
-            user_prompt=llm_problem,
-            temperature=0.0,
-            validate=True,
-            trace_input=trace_input,
-        )
+        with llm_caller("single_agent_create_model"):
+            code = llm_client.code_generation_call(
+                sys_prompt=system_prompt,
+                user_prompt=llm_problem,
+                temperature=0.0,
+                validate=True,
+                trace_input=trace_input,
+                output_validator=_create_model_output_validator(),
+            )
         code = _apply_create_model_autofixes(code)
         valid, diagnostics = _validate_create_model_entrypoint(code)
         if not valid:
@@ -117,10 +194,34 @@ async def run_single_agent_generation(
     return model_pack
 
 
+# Subcommands are dispatched before the one-shot parser so that a bare problem text stays
+# the positional argument; each handler is imported only when its command is used.
+SUBCOMMANDS = {
+    "serve": "service.main",
+    "batch": "batch.main",
+    "worker": "worker_queue.worker_main",
+    "queue": "worker_queue.queue_main",
+}
+
+
+def _run_subcommand(name: str, argv: list[str]) -> int:
+    import importlib
+
+    module_name, _, function_name = SUBCOMMANDS[name].rpartition(".")
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, function_name)(argv)
+
+
 def main():
     """CLI entry point."""
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return _run_subcommand(sys.argv[1], sys.argv[2:])
+
     parser = argparse.ArgumentParser(
-        description="Convert natural language optimization problems to Pyomo code"
+        description="Convert natural language optimization problems to Pyomo code",
+        epilog=f"Commands: {', '.join(SUBCOMMANDS)} (run `python -m src <command> --help`)",
     )
     parser.add_argument(
         "input",
@@ -134,12 +235,54 @@ def main():
         help="Output directory for generated code (default: output)",
     )
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    parser.add_argument(
+        "--trace-dir",
+        default=None,
+        help="Export the LLM trace (calls.jsonl + deduplicated blobs/) to this directory",
+    )
+
+    parser.add_argument(
+        "--graph-variant",
+        default=None,
+        help="Graph variant name (main, generation, full) or path to a graph spec file "
+        "(default: GRAPH_VARIANT or main)",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Wall-clock budget for the run (default: RUN_MAX_SECONDS)",
+    )
+    parser.add_argument(
+        "--max-llm-tokens",
+        type=int,
+        default=None,
+        help="LLM token budget for the run (default: RUN_MAX_LLM_TOKENS)",
+    )
+    parser.add_argument(
+        "--max-llm-calls",
+        type=int,
+        default=None,
+        help="LLM call budget for the run (default: RUN_MAX_LLM_CALLS)",
+    )
+    parser.add_argument(
+        "--screen-policy",
+        type=json.loads,
+        default=None,
+        help='JSON overrides for screen_data\'s ScreenPolicy, e.g. \'{"feasibility_check": true}\' '
+        "(default: SCREEN_* env vars)",
+    )
+    parser.add_argument(
+        "--solve-policy",
+        type=json.loads,
+        default=None,
+        help='JSON overrides for solve_model\'s SolvePolicy, e.g. \'{"mip_gap": 0.01}\' '
+        "(default: SOLVE_* env vars)",
+    )
 
     args = parser.parse_args()
 
-    # Configure logging
-    if args.verbose:
-        structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(0))
+    configure_logging(args.verbose)
 
     # Get problem text
     if args.input:
@@ -151,8 +294,6 @@ def main():
             problem_text = args.input
     else:
         print("Enter your optimization problem (Ctrl+D or Ctrl+Z to finish):")
-        import sys
-
         problem_text = sys.stdin.read()
 
     if not problem_text.strip():
@@ -160,13 +301,39 @@ def main():
         return 1
 
     # Run pipeline
-    result = asyncio.run(run_pipeline(problem_text))
+    from dataclasses import replace
+
+    from .orchestration.budget import RunBudget
+
+    budget = RunBudget.from_env()
+    overrides = {
+        "max_seconds": args.max_seconds,
+        "max_llm_tokens": args.max_llm_tokens,
+        "max_llm_calls": args.max_llm_calls,
+    }
+    budget = replace(budget, **{key: value for key, value in overrides.items() if value})
+    result = asyncio.run(
+        run_pipeline(
+            problem_text,
+            budget=budget,
+            graph_variant=args.graph_variant,
+            screen_policy=args.screen_policy,
+            solve_policy=args.solve_policy,
+        )
+    )
 
     # Output results
     print(f"\n{'='*60}")
     print("Pipeline Complete!")
     print(f"{'='*60}")
     print(f"Status: {result.status}")
+    budget_report = result.tests.get("budget")
+    if isinstance(budget_report, dict) and budget_report.get("exhausted"):
+        print(f"Budget exhausted: {budget_report['exhausted_reason']} {budget_report['usage']}")
+
+    if args.trace_dir:
+        paths = export_llm_trace(result, args.trace_dir)
+        print(f"LLM trace: {paths['calls']}")
 
     if result.code.model_builder:
         print(f"\nModel Builder: {result.code.model_builder.filename}")
@@ -1,13 +1,6 @@
 # modelpack/agents/__init__.py
-from . import audit_model
-from . import build_model
-from . import check_solution
-from . import derive_math
-from . import generate_data
-from . import judge_solution
-from . import screen_data
-from . import solve_model
-from . import specify_problem
+import importlib
+from typing import Any
 
 __all__ = [
     "audit_model",
@@ -20,3 +13,12 @@ __all__ = [
     "solve_model",
     "specify_problem",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Agent modules pull in Pyomo/NumPy/LLM dependencies, so load them on first access.
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
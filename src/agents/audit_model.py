@@ -8,7 +8,7 @@ to add any that are missing from the code — without inventing new ones.
 
 import json
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import structlog
 
@@ -17,8 +17,10 @@ from ..prompts import PROMPTS, llm_problem_text
 from ..schemas import CodeBlob, ModelPack
 from .build_model import (
     _apply_create_model_autofixes,
+    _create_model_output_validator,
     _validate_create_model_entrypoint,
 )
+from .utils import dump_artifact
 
 logger = structlog.get_logger(__name__)
 
@@ -43,6 +45,20 @@ def _extract_signature_line(problem_text: str) -> str:
     return match.group(1) if match else "def create_model(...) -> pyo.ConcreteModel:"
 
 
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompt is built from; the stage memo key for this agent."""
+    model_builder = state.code.model_builder
+    return {
+        "target_interface": str(state.context.get("target_interface") or "").strip(),
+        "problem_input": llm_problem_text(
+            state.context.get("nl_problem") or "",
+            preserve_data_generator_contract=True,
+        ),
+        "components_nl": dump_artifact(state.components_nl),
+        "previous_code": getattr(model_builder, "source", None),
+    }
+
+
 async def audit_model(state: ModelPack) -> ModelPack:
     """Audit create_model against the structured NL constraint list."""
 
@@ -99,6 +115,7 @@ async def audit_model(state: ModelPack) -> ModelPack:
             temperature=0.0,
             validate=True,
             trace_input=trace_input,
+            output_validator=_create_model_output_validator(signature_line),
         )
     except Exception as exc:
         logger.warning("audit_model_llm_failed", error=str(exc))
@@ -1,20 +1,26 @@
 # modelpack/agents/build_model.py
 import ast
+import asyncio
 import builtins
 import re
 import symtable
-from typing import Dict, List, Optional, Set, Tuple
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import structlog
 
-from ..schemas import ModelPack, CodeBlob
-from ..llm import llm_client
+from ..schemas import ModelPack, CodeBlob, CodePack
+from ..llm import llm_caller_mode, llm_client
 from ..prompts import (
     PROMPTS,
     compact_feedback_context,
     llm_problem_text,
     runtime_data_note,
 )
+from .instance_store import datagen_handoff
+from .screen_data import screen_candidate
+from .screen_policy import screen_policy_for
+from .utils import dump_artifact, targeted_feedback_payload
 logger = structlog.get_logger(__name__)
 _DICT_LIKE_ANNOTATIONS = {"dict", "Dict", "Mapping", "MutableMapping"}
 
@@ -1167,6 +1173,89 @@ def _validate_create_model_entrypoint(
     return len(deduped) == 0, deduped
 
 
+def _create_model_output_validator(
+    required_signature: Optional[str] = None,
+) -> Callable[[str], Tuple[bool, List[str]]]:
+    """Validator for ``code_generation_call``: autofix, then check the entrypoint contract."""
+
+    def validate(source: str) -> Tuple[bool, List[str]]:
+        fixed = _apply_create_model_autofixes(source, required_signature=required_signature)
+        return _validate_create_model_entrypoint(fixed, required_signature=required_signature)
+
+    return validate
+
+
+def _start_speculative_screen(
+    state: ModelPack, candidate: str
+) -> Tuple[asyncio.Task, threading.Event]:
+    """Screen ``candidate`` on a worker thread as soon as a DataGen exists.
+
+    Uses the pack's DataGen when build_model re-runs after generate_data; on the first
+    pass, where generate_data runs in a parallel branch, the screen waits for the DataGen
+    it publishes until ``stop`` is set.
+    """
+    state.tests.pop("speculative_screen", None)
+    datagen = state.code.datagen
+    handoff = datagen_handoff() if datagen is None else None
+    policy = screen_policy_for(state.context)
+    stop = threading.Event()
+
+    def screen() -> Optional[Dict[str, Any]]:
+        ready = datagen if handoff is None else handoff.wait(stop)
+        if ready is None:
+            return None
+        candidate_pack = CodePack(
+            model_builder=CodeBlob(language="python", filename="create_model.py", source=candidate),
+            datagen=ready,
+        )
+        return screen_candidate(candidate_pack, policy)
+
+    return asyncio.create_task(asyncio.to_thread(screen)), stop
+
+
+async def _finish_speculative_screen(
+    state: ModelPack,
+    speculative: Tuple[asyncio.Task, threading.Event],
+    candidate: str,
+    final_code: str,
+) -> None:
+    """Keep the speculative result when the critique left the candidate unchanged.
+
+    A screen still waiting for DataGen is not started: screen_data will run it anyway.
+    """
+    task, stop = speculative
+    stop.set()
+    if final_code != candidate:
+        # screen_data screens the new code; let the stale probe finish unobserved.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        logger.info("build_model_speculative_screen_stale")
+        return
+    try:
+        result = await task
+    except Exception as exc:
+        logger.warning("build_model_speculative_screen_failed", error=str(exc))
+        return
+    if result is None:
+        logger.info("build_model_speculative_screen_skipped", reason="datagen_not_ready")
+        return
+    state.tests["speculative_screen"] = result
+    logger.info("build_model_speculative_screen_ready", seconds=result.get("seconds"))
+
+
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompts are built from; the stage memo key for this agent."""
+    return {
+        "target_interface": str(state.context.get("target_interface") or "").strip(),
+        "problem_input": llm_problem_text(
+            state.context.get("nl_problem") or "",
+            preserve_data_generator_contract=True,
+        ),
+        "components_nl": dump_artifact(state.components_nl),
+        "components_math": dump_artifact(state.components_math),
+        "targeted_feedback": targeted_feedback_payload(state, "build_model"),
+    }
+
+
 async def build_model(state: ModelPack) -> ModelPack:
     """Generate Pyomo model code."""
 
@@ -1303,12 +1392,14 @@ Math:
             system_prompt = PROMPTS["build_model"]["system"]
 
         if benchmark_mode:
+            output_validator = _create_model_output_validator(signature_line)
             code = llm_client.code_generation_call(
                 sys_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.0,
                 validate=True,
                 trace_input=trace_input,
+                output_validator=output_validator,
             )
             code = _apply_create_model_autofixes(code, required_signature=signature_line)
             valid, diagnostics = _validate_create_model_entrypoint(
@@ -1359,17 +1450,19 @@ Math:
                         },
                     ],
                 }
-                repaired_code = llm_client.code_generation_call(
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                        {"role": "assistant", "content": code},
-                        {"role": "user", "content": repair_prompt},
-                    ],
-                    temperature=0.0,
-                    validate=True,
-                    trace_input=repair_trace_input,
-                )
+                with llm_caller_mode("repair"):
+                    repaired_code = llm_client.code_generation_call(
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt},
+                            {"role": "assistant", "content": code},
+                            {"role": "user", "content": repair_prompt},
+                        ],
+                        temperature=0.0,
+                        validate=True,
+                        trace_input=repair_trace_input,
+                        output_validator=output_validator,
+                    )
                 repaired_code = _apply_create_model_autofixes(
                     repaired_code, required_signature=signature_line
                 )
@@ -1418,22 +1511,32 @@ Math:
                         "Return a corrected create_model if any issue applies, else return it unchanged. Code only.",
                     ]
                 )
+                critique_trace_input = {
+                    "agent": "build_model",
+                    "mode": "focused_critique",
+                    "upstream_artifacts": [
+                        {"label": "problem_input", "source": "problem_input", "value": problem_input},
+                        {"label": "required_interface", "source": "signature_line", "value": signature_line},
+                        {"label": "previous_code", "source": "build_model_first_pass", "value": code},
+                    ],
+                }
+
+                def run_critique() -> str:
+                    with llm_caller_mode("critique"):
+                        return llm_client.code_generation_call(
+                            sys_prompt=PROMPTS["build_model_critique"]["system"],
+                            user_prompt=critique_prompt,
+                            temperature=0.0,
+                            validate=True,
+                            trace_input=critique_trace_input,
+                            output_validator=output_validator,
+                        )
+
+                # Screen the first-pass candidate while the critique request is in flight.
+                candidate = code
+                speculative_screen = _start_speculative_screen(state, candidate)
                 try:
-                    critiqued = llm_client.code_generation_call(
-                        sys_prompt=PROMPTS["build_model_critique"]["system"],
-                        user_prompt=critique_prompt,
-                        temperature=0.0,
-                        validate=True,
-                        trace_input={
-                            "agent": "build_model",
-                            "mode": "focused_critique",
-                            "upstream_artifacts": [
-                                {"label": "problem_input", "source": "problem_input", "value": problem_input},
-                                {"label": "required_interface", "source": "signature_line", "value": signature_line},
-                                {"label": "previous_code", "source": "build_model_first_pass", "value": code},
-                            ],
-                        },
-                    )
+                    critiqued = await asyncio.to_thread(run_critique)
                     critiqued = _apply_create_model_autofixes(
                         critiqued, required_signature=signature_line
                     )
@@ -1445,6 +1548,7 @@ Math:
                         logger.info("build_model_critique_applied")
                 except Exception as critique_exc:
                     logger.warning("build_model_critique_failed", error=str(critique_exc))
+                await _finish_speculative_screen(state, speculative_screen, candidate, code)
 
         state.code.model_builder = CodeBlob(
             language="python",
@@ -1,5 +1,6 @@
 # modelpack/agents/check_solution.py
 import json
+from typing import Any, Dict
 
 import structlog
 from ..schemas import ModelPack, CodeBlob
@@ -7,11 +8,29 @@ from ..llm import llm_client
 from ..prompts import PROMPTS, compact_feedback_context, runtime_data_note
 from .utils import (
     build_checker_contract,
+    targeted_feedback_payload,
 )
 
 logger = structlog.get_logger(__name__)
 
 
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompt is built from; the stage memo key for this agent."""
+    checker_contract = state.tests.get("checker_contract")
+    if not isinstance(checker_contract, dict) and state.components_nl is not None:
+        model_builder = state.code.model_builder
+        checker_contract = build_checker_contract(
+            components_nl=state.components_nl,
+            model_source=getattr(model_builder, "source", "") or "",
+        )
+    solution_checker = state.code.solution_checker
+    return {
+        "checker_contract": checker_contract,
+        "targeted_feedback": targeted_feedback_payload(state, "check_solution"),
+        "existing_checker_code": getattr(solution_checker, "source", None),
+    }
+
+
 async def check_solution(state: ModelPack) -> ModelPack:
     """Generate solution-checking code."""
 
@@ -1,13 +1,25 @@
 # modelpack/agents/derive_math.py
+from typing import Any, Dict
+
 import structlog
 
 from ..schemas import ComponentsMATH, ModelPack
 from ..llm import llm_client
 from ..prompts import PROMPTS
+from .utils import dump_artifact
 
 logger = structlog.get_logger(__name__)
 
 
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompt is built from; the stage memo key for this agent."""
+    return {
+        "components_nl": dump_artifact(state.components_nl),
+        "objective_sense": state.context.get("objective_sense", "minimize"),
+        "retry_reason": str(state.tests.get("build_model_retry_reason") or "").strip(),
+    }
+
+
 async def derive_math(state: ModelPack) -> ModelPack:
     """Convert NL components to mathematical notation."""
 
@@ -50,6 +62,11 @@ Map every explicit NL requirement to a math constraint. Stay compact and non-spe
                     "source": "state.context.objective_sense",
                     "value": objective_sense,
                 },
+                {
+                    "label": "retry_reason",
+                    "source": "state.tests.build_model_retry_reason",
+                    "value": retry_reason,
+                },
             ],
         }
 
@@ -1,12 +1,26 @@
 # modelpack/agents/generate_data.py
+from typing import Any, Dict
+
 import structlog
 from ..schemas import ModelPack, CodeBlob
 from ..llm import llm_client
 from ..prompts import PROMPTS, compact_feedback_context, llm_problem_text, runtime_data_note
+from .instance_store import datagen_handoff
+from .utils import dump_artifact, targeted_feedback_payload
 
 logger = structlog.get_logger(__name__)
 
 
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompt is built from; the stage memo key for this agent."""
+    return {
+        "problem_input": llm_problem_text(state.context.get("nl_problem") or ""),
+        "components_nl": dump_artifact(state.components_nl),
+        "components_math": dump_artifact(state.components_math),
+        "targeted_feedback": targeted_feedback_payload(state, "generate_data"),
+    }
+
+
 async def generate_data(state: ModelPack) -> ModelPack:
     """Generate data generation code."""
 
@@ -90,6 +104,7 @@ Generate feasible data."""
         )
 
         state.code.datagen = CodeBlob(language="python", filename="datagen.py", source=code)
+        datagen_handoff().publish(state.code.datagen)
 
         logger.info("generate_data_success", code_length=len(code))
 
@@ -0,0 +1,158 @@
+# modelpack/agents/instance_store.py
+"""Per-pipeline cache of DataGen instances and the Pyomo models built from them.
+
+``screen_data``, ``solve_model`` and ``judge_solution`` all need ``DataGen(seed)`` for the
+same seeds and a model built from each. Data is cached by (DataGen source hash, seed) and
+generated once per run; every caller gets its own copy (the first one the generated value
+itself), so a builder that mutates its input cannot corrupt the next consumer. Built models are cached by (model source hash, DataGen source
+hash, seed) with take/put ownership: a consumer takes the model out, uses it, and puts it
+back only when it is safe for the next consumer (e.g. after a solve, whose variable values
+every later consumer overwrites). A new model-code version gets new keys, so nothing built
+from stale code is ever reused.
+
+The store lives in the run's ``PipelineContext`` caches; without one, each call gets a
+fresh store and nothing is shared. ``DataGenHandoff`` shares the same way the DataGen code
+generate_data produced, so build_model in a parallel branch can screen against it early.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_MAX_DATA = 32
+DEFAULT_MAX_MODELS = 6
+
+
+def source_hash(source: Optional[str]) -> str:
+    return hashlib.sha256(str(source or "").encode("utf-8")).hexdigest()
+
+
+class InstanceStore:
+    def __init__(self, max_data: int = DEFAULT_MAX_DATA, max_models: int = DEFAULT_MAX_MODELS) -> None:
+        self.max_data = max_data
+        self.max_models = max_models
+        self._data: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._models: "OrderedDict[Tuple[str, str, int], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"data_hits": 0, "data_misses": 0, "model_hits": 0, "model_misses": 0}
+
+    def data(self, datagen_hash: str, seed: int, generate: Callable[[int], Any]) -> Any:
+        """``generate(seed)``, computed once per (DataGen source, seed).
+
+        The caller always owns what it gets: a miss hands out the generated value and keeps
+        a copy, a hit hands out a copy of the kept one.
+        """
+        key = (datagen_hash, seed)
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None:
+                self._data.move_to_end(key)
+                self._stats["data_hits"] += 1
+        if cached is not None:
+            return copy.deepcopy(cached)
+        # Generated outside the lock; a concurrent miss on the same key just races to
+        # insert an equal value.
+        generated = generate(seed)
+        kept = copy.deepcopy(generated)
+        with self._lock:
+            self._stats["data_misses"] += 1
+            self._data[key] = kept
+            while len(self._data) > self.max_data:
+                self._data.popitem(last=False)
+        return generated
+
+    def put_data(self, datagen_hash: str, seed: int, data: Any) -> None:
+        """Keep ``data`` generated elsewhere (e.g. in a worker process); the store owns it."""
+        with self._lock:
+            self._data[(datagen_hash, seed)] = data
+            while len(self._data) > self.max_data:
+                self._data.popitem(last=False)
+
+    def take_model(self, model_hash: str, datagen_hash: str, seed: int) -> Optional[Any]:
+        """Remove and return the cached model for the key, if any."""
+        with self._lock:
+            model = self._models.pop((model_hash, datagen_hash, seed), None)
+            self._stats["model_hits" if model is not None else "model_misses"] += 1
+        return model
+
+    def put_model(self, model_hash: str, datagen_hash: str, seed: int, model: Any) -> None:
+        with self._lock:
+            self._models[(model_hash, datagen_hash, seed)] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "cached_data": len(self._data), "cached_models": len(self._models)}
+
+    def for_code(self, code_pack: Any) -> "CodeInstances":
+        return CodeInstances(self, code_pack)
+
+
+class CodeInstances:
+    """The store's view for one (model code, DataGen code) pair."""
+
+    def __init__(self, store: InstanceStore, code_pack: Any) -> None:
+        self.store = store
+        self.model_hash = source_hash(getattr(code_pack.model_builder, "source", None))
+        self.datagen_hash = source_hash(getattr(code_pack.datagen, "source", None))
+
+    def data(self, DataGen: Callable[[int], Any], seed: int) -> Any:
+        return self.store.data(self.datagen_hash, seed, DataGen)
+
+    def put_data(self, seed: int, data: Any) -> None:
+        self.store.put_data(self.datagen_hash, seed, data)
+
+    def take_model(self, seed: Optional[int]) -> Optional[Any]:
+        if seed is None:
+            return None
+        return self.store.take_model(self.model_hash, self.datagen_hash, seed)
+
+    def put_model(self, seed: Optional[int], model: Any) -> None:
+        if seed is not None and model is not None:
+            self.store.put_model(self.model_hash, self.datagen_hash, seed, model)
+
+
+class DataGenHandoff:
+    """The latest DataGen code generate_data produced in this run."""
+
+    def __init__(self) -> None:
+        self._ready = threading.Event()
+        self._datagen: Any = None
+
+    def publish(self, datagen: Any) -> None:
+        self._datagen = datagen
+        self._ready.set()
+
+    def wait(self, stop: threading.Event, poll_seconds: float = 0.2) -> Optional[Any]:
+        """Block until DataGen is published; ``None`` once ``stop`` is set first."""
+        while not stop.is_set():
+            if self._ready.wait(poll_seconds):
+                return self._datagen
+        return None
+
+
+def datagen_handoff() -> DataGenHandoff:
+    """The active run's handoff (``PipelineContext.caches["datagen_handoff"]``)."""
+    from ..orchestration.context import current_pipeline_context
+
+    context = current_pipeline_context()
+    if context is None:
+        return DataGenHandoff()
+    return context.cache("datagen_handoff", DataGenHandoff)
+
+
+def instance_store() -> InstanceStore:
+    """The active run's store (``PipelineContext.caches["instance_store"]``)."""
+    from ..orchestration.context import current_pipeline_context
+
+    context = current_pipeline_context()
+    if context is None:
+        return InstanceStore()
+    return context.cache("instance_store", InstanceStore)
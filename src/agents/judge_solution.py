@@ -1,7 +1,22 @@
 # modelpack/agents/judge_solution.py
+"""Judge checker and model consistency deterministically.
+
+Re-evaluating each solved instance and every ``SolutionChecker`` call run as separate
+tasks, in worker processes with a per-task timeout (``JUDGE_TASK_TIMEOUT_SECONDS``), so a
+checker that loops forever becomes a runtime failure instead of a stuck run and judge
+latency follows the slowest task. ``JUDGE_ISOLATION=0`` runs the tasks in-process.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Mapping
+
 import structlog
 
+from ..env import env_flag, env_positive
 from ..schemas import Feedback, ModelPack
+from .instance_store import instance_store
+from .sandbox import UNPICKLABLE_RESULT, ResourceLimits, run_calls
 from .utils import (
     assign_solution_to_model,
     build_checker_contract,
@@ -19,6 +34,45 @@ from .utils import (
 
 logger = structlog.get_logger(__name__)
 
+DEFAULT_TASK_TIMEOUT_SECONDS = 60.0
+
+
+def evaluate_solution(
+    namespace: Mapping[str, Any],
+    data_dict: Mapping[str, Any],
+    solution_dict: Mapping[str, Any],
+    model: Any = None,
+) -> Dict[str, Any]:
+    """Assign ``solution_dict`` to a model of ``data_dict`` and re-evaluate it deterministically."""
+    if model is None:
+        model = build_model_from_instance(namespace, data_dict)
+    return {
+        "assignment_issues": assign_solution_to_model(model, solution_dict),
+        "deterministic": evaluate_model_deterministically(model),
+    }
+
+
+def run_checker(
+    namespace: Mapping[str, Any],
+    data_dict: Mapping[str, Any],
+    solution_dict: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """``SolutionChecker``'s verdict reduced to plain ``feasible`` / ``violations`` values."""
+    checker_result = namespace["SolutionChecker"](data_dict, solution_dict)
+    return {
+        "feasible": bool(checker_result.get("feasible", False)),
+        "violations": str(checker_result.get("violations", "") or "").strip(),
+    }
+
+
+def _isolated_evaluation(code_pack: Any, data_dict: Any, solution_dict: Any) -> Dict[str, Any]:
+    """Worker-process entry point; builds its own model (Pyomo models do not pickle)."""
+    return evaluate_solution(load_modules_with_shared_namespace(code_pack), data_dict, solution_dict)
+
+
+def _isolated_checker(code_pack: Any, data_dict: Any, solution_dict: Any) -> Dict[str, Any]:
+    return run_checker(load_modules_with_shared_namespace(code_pack), data_dict, solution_dict)
+
 
 def _feedback_retry_key(target_agent: str) -> str:
     return (
@@ -95,6 +149,7 @@ async def judge_solution(state: ModelPack) -> ModelPack:
         positive_mismatches = []
         checker_runtime_failures = []
         deterministic_positive_failures = []
+        evaluation_failures = []
         checker_false_positive_examples = []
         missing_solution_refs = set()
         missing_data_refs = set()
@@ -102,9 +157,27 @@ async def judge_solution(state: ModelPack) -> ModelPack:
         data_keys = set()
         indexed_key_samples = {}
         data_key_samples = {}
-        reference_instance = None
-
-        for instance in solved_instances[:3]:
+        reference_instance: Any = None
+        reference_model: Any = None
+        store = instance_store()
+        instances = store.for_code(state.code)
+
+        isolation = env_flag("JUDGE_ISOLATION", True)
+        timeout = env_positive("JUDGE_TASK_TIMEOUT_SECONDS", DEFAULT_TASK_TIMEOUT_SECONDS, float)
+        max_workers = env_positive("JUDGE_MAX_WORKERS", None, int)
+        # Generated checkers also run under GUARD_CPU_SECONDS / GUARD_MEMORY_MB.
+        checker_limits = ResourceLimits.from_env()
+        evaluate_fn: Callable[..., Dict[str, Any]]
+        checker_fn: Callable[..., Dict[str, Any]]
+        source: Any
+        if isolation:
+            evaluate_fn, checker_fn, source = _isolated_evaluation, _isolated_checker, state.code
+        else:
+            evaluate_fn, checker_fn, source = evaluate_solution, run_checker, namespace
+
+        judged_instances = solved_instances[:3]
+        judged_models = []
+        for instance in judged_instances:
             data_summary = summarize_data_dict(instance.data_dict)
             solution_summary = summarize_solution_dict(instance.solution_dict)
             data_keys.update(data_summary.get("data_keys") or [])
@@ -117,20 +190,47 @@ async def judge_solution(state: ModelPack) -> ModelPack:
             missing_data_refs.update(
                 ref for ref in checker_data_refs if ref not in data_summary.get("data_keys", [])
             )
-
-            try:
-                model = build_model_from_instance(namespace, instance.data_dict)
-                assignment_issues = assign_solution_to_model(model, instance.solution_dict)
-                deterministic_result = evaluate_model_deterministically(model)
-            except Exception as exc:
-                deterministic_positive_failures.append(
-                    {
-                        "instance_id": instance.id,
-                        "error": str(exc),
-                    }
+            # solve_model leaves the model it solved for this seed in the store; workers
+            # cannot receive it, so isolated evaluations leave it there.
+            judged_models.append(None if isolation else instances.take_model(instance.seed))
+
+        judge_started = time.monotonic()
+        evaluations = await asyncio.to_thread(
+            run_calls,
+            [
+                (
+                    evaluate_fn,
+                    (source, instance.data_dict, instance.solution_dict)
+                    + (() if isolation else (model,)),
                 )
+                for instance, model in zip(judged_instances, judged_models)
+            ],
+            timeout=timeout,
+            isolated=isolation,
+            max_workers=max_workers,
+        )
+
+        checker_instances = []
+        for instance, model, outcome in zip(judged_instances, judged_models, evaluations):
+            if not outcome.ok:
+                failure = {"instance_id": instance.id, "error": outcome.error_message}
+                if outcome.outcome == "error" and outcome.error_type != UNPICKLABLE_RESULT:
+                    deterministic_positive_failures.append(failure)
+                else:
+                    # The worker hit its timeout or limits, or its result could not be
+                    # read back: says nothing about the model, so no build_model feedback.
+                    failure["isolation_outcome"] = outcome.outcome
+                    failure["error_type"] = outcome.error_type
+                    evaluation_failures.append(failure)
+                    logger.warning(
+                        "judge_solution_evaluation_failed",
+                        instance_id=instance.id,
+                        isolation_outcome=outcome.outcome,
+                    )
                 continue
 
+            assignment_issues = outcome.value["assignment_issues"]
+            deterministic_result = outcome.value["deterministic"]
             if assignment_issues or not deterministic_result.get("feasible", False):
                 deterministic_positive_failures.append(
                     {
@@ -141,72 +241,116 @@ async def judge_solution(state: ModelPack) -> ModelPack:
                 )
                 continue
 
+            checker_instances.append(instance)
             if reference_instance is None:
                 reference_instance = instance
-
-            try:
-                checker_result = SolutionChecker(instance.data_dict, instance.solution_dict)
-            except Exception as exc:
-                checker_runtime_failures.append(
-                    {
-                        "instance_id": instance.id,
-                        "error": str(exc),
-                    }
-                )
-                continue
-
-            checker_feasible = bool(checker_result.get("feasible", False))
-            violations = str(checker_result.get("violations", "") or "").strip()
-            matched_constraints = match_violation_to_constraints(violations, constraint_catalog)
-
-            if not checker_feasible:
-                positive_mismatches.append(
-                    {
-                        "instance_id": instance.id,
-                        "checker_says": "infeasible",
-                        "violations": violations,
-                        "matched_constraints": matched_constraints,
-                    }
-                )
+                reference_model = model
+            elif model is not None:
+                instances.put_model(instance.seed, model)
 
         negative_examples = []
         if reference_instance is not None:
+            if reference_model is None:
+                reference_model = instances.take_model(reference_instance.seed)
+            if reference_model is None:
+                try:
+                    reference_model = build_model_from_instance(namespace, reference_instance.data_dict)
+                except Exception:
+                    reference_model = None
             negative_examples = find_infeasible_solution_mutations(
                 namespace,
                 reference_instance.data_dict,
                 reference_instance.solution_dict,
                 canonical_solution_schema,
+                model=reference_model,
             )
-            for example in negative_examples:
+            if reference_model is not None:
+                # The mutations left their last values on the model; hand it on holding the
+                # reference solution again, or not at all.
                 try:
-                    checker_result = SolutionChecker(
-                        reference_instance.data_dict,
-                        example["solution"],
+                    restored = not assign_solution_to_model(
+                        reference_model, reference_instance.solution_dict
                     )
-                except Exception as exc:
-                    checker_runtime_failures.append(
-                        {
-                            "instance_id": reference_instance.id,
-                            "phase": "negative_example",
-                            "error": str(exc),
-                            "mutation": example.get("mutation"),
-                        }
-                    )
-                    continue
+                except Exception:
+                    restored = False
+                if restored:
+                    instances.put_model(reference_instance.seed, reference_model)
+
+        # One checker call per feasible solved instance, then one per negative example.
+        checks = [(instance, None) for instance in checker_instances] + [
+            (reference_instance, example) for example in negative_examples
+        ]
+        verdicts = await asyncio.to_thread(
+            run_calls,
+            [
+                (
+                    checker_fn,
+                    (
+                        source,
+                        instance.data_dict,
+                        instance.solution_dict if example is None else example["solution"],
+                    ),
+                )
+                for instance, example in checks
+            ],
+            timeout=timeout,
+            isolated=isolation,
+            max_workers=max_workers,
+            limits=checker_limits,
+        )
+
+        for (instance, example), outcome in zip(checks, verdicts):
+            if not outcome.ok:
+                failure = {"instance_id": instance.id, "error": outcome.error_message}
+                if example is not None:
+                    failure.update(phase="negative_example", mutation=example.get("mutation"))
+                if outcome.outcome != "error":
+                    failure["isolation_outcome"] = outcome.outcome
+                checker_runtime_failures.append(failure)
+                continue
 
-                if bool(checker_result.get("feasible", False)):
-                    checker_false_positive_examples.append(
+            verdict = outcome.value
+            if example is None:
+                if not verdict["feasible"]:
+                    positive_mismatches.append(
                         {
-                            "instance_id": reference_instance.id,
-                            "mutation": example.get("mutation"),
-                            "deterministic_violations": example.get("deterministic_violations", []),
+                            "instance_id": instance.id,
+                            "checker_says": "infeasible",
+                            "violations": verdict["violations"],
+                            "matched_constraints": match_violation_to_constraints(
+                                verdict["violations"],
+                                constraint_catalog,
+                            ),
                         }
                     )
+            elif verdict["feasible"]:
+                checker_false_positive_examples.append(
+                    {
+                        "instance_id": instance.id,
+                        "mutation": example.get("mutation"),
+                        "deterministic_violations": example.get("deterministic_violations", []),
+                    }
+                )
 
+        state.tests["judge_evaluation"] = {
+            "isolation": isolation,
+            "task_timeout_seconds": timeout,
+            "checker_limits": checker_limits.as_dict() if isolation else None,
+            "tasks": len(evaluations) + len(verdicts),
+            "timeouts": sum(
+                1 for outcome in [*evaluations, *verdicts] if outcome.outcome == "timeout"
+            ),
+            "memory_exceeded": sum(
+                1 for outcome in [*evaluations, *verdicts] if outcome.outcome == "memory_exceeded"
+            ),
+            "seconds": round(time.monotonic() - judge_started, 4),
+        }
+        state.tests["instance_store"] = store.stats()
         validation_report = {
             "positive_mismatches": positive_mismatches,
             "checker_runtime_failures": checker_runtime_failures,
             "deterministic_positive_failures": deterministic_positive_failures,
+            "evaluation_failures": evaluation_failures,
             "checker_false_positive_examples": checker_false_positive_examples,
             "negative_examples_tested": len(negative_examples),
             "checker_metadata": checker_metadata,
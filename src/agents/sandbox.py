@@ -0,0 +1,414 @@
+# modelpack/agents/sandbox.py
+"""Run generated code in short-lived worker processes with a per-call timeout.
+
+LLM-written ``DataGen`` / ``ModelBuilder`` code can hang or crash the interpreter. Each
+call here runs in its own child process and reports back over a pipe; a call that
+outlives its timeout is terminated, and a child that dies without answering is reported
+as crashed. Results are plain ``IsolatedResult`` values, never raised exceptions, so
+callers can turn every outcome into feedback.
+
+``ResourceLimits`` adds ``setrlimit`` caps inside the child: CPU seconds (the kernel stops
+the process, reported as ``timeout``) and memory the call may allocate on top of what the
+worker starts with (a ``MemoryError``, reported as ``memory_exceeded``). A call may mark its
+steps with ``report_progress``; the last marker comes back as ``IsolatedResult.progress``,
+so a caller can tell which step a timeout or crash hit. ``guarded`` wraps
+a callable such as ``DataGen`` so each call runs this way and raises ``GuardedCallError``
+on any outcome but ``ok``.
+
+Workers start from a ``forkserver`` (``spawn`` where there is none), never by forking the
+caller: agents run on threads, and a child forked while another thread holds a lock can
+hang on it. The callable must therefore be a module-level function, and it, its
+arguments and its return value must be picklable.
+"""
+
+import functools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+import structlog
+
+if TYPE_CHECKING:
+    from multiprocessing.context import ForkServerContext, SpawnContext
+
+from ..env import env_flag, env_positive
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+logger = structlog.get_logger(__name__)
+
+TRACEBACK_LIMIT = 1500
+DEFAULT_GUARD_TIMEOUT_SECONDS = 120.0
+DEFAULT_GUARD_CPU_SECONDS = 120.0
+DEFAULT_GUARD_MEMORY_MB = 4096
+_TERMINATE_GRACE_SECONDS = 1.0
+UNPICKLABLE_RESULT = "UnpicklableResult"
+
+IsolatedCall = Tuple[Callable[..., Any], Tuple[Any, ...]]
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    cpu_seconds: Optional[float] = DEFAULT_GUARD_CPU_SECONDS
+    memory_mb: Optional[int] = DEFAULT_GUARD_MEMORY_MB
+
+    @classmethod
+    def from_env(cls) -> "ResourceLimits":
+        defaults = cls()
+        return cls(
+            cpu_seconds=env_positive("GUARD_CPU_SECONDS", defaults.cpu_seconds, float),
+            memory_mb=env_positive("GUARD_MEMORY_MB", defaults.memory_mb, int),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def _apply_limits(limits: ResourceLimits) -> None:
+    """Cap this process; called in the child before the guarded call runs."""
+    if resource is None:
+        return
+    try:
+        if limits.cpu_seconds:
+            used = sum(os.times()[:2])
+            soft = int(used + limits.cpu_seconds) + 1
+            # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored.
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+        if limits.memory_mb:
+            # The worker already maps what the fork server preloaded; cap the growth.
+            cap = _address_space_bytes() + int(limits.memory_mb) * 1024 * 1024
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            if hard != resource.RLIM_INFINITY:
+                cap = min(cap, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (cap, hard))
+    except (OSError, ValueError) as exc:
+        logger.warning("sandbox_limits_not_applied", error=str(exc))
+
+
+@dataclass
+class IsolatedResult:
+    outcome: str  # "ok" | "error" | "timeout" | "memory_exceeded" | "crashed"
+    value: Any = None
+    error_type: Optional[str] = None
+    error_message: Optional[str] = None
+    traceback: Optional[str] = None
+    exitcode: Optional[int] = None
+    seconds: float = 0.0
+    progress: Optional[str] = None  # last ``report_progress`` marker the worker sent
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == "ok"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Imported once by the fork server, so each worker starts with Pyomo and the agent entry
+# points already loaded.
+_FORKSERVER_PRELOAD = (
+    "pyomo.environ",
+    "numpy",
+    f"{__package__}.screen_data",
+    f"{__package__}.judge_solution",
+)
+_MP_CONTEXT: Optional[Union["ForkServerContext", "SpawnContext"]] = None
+_MP_CONTEXT_LOCK = threading.Lock()
+# The worker's end of the result pipe, while a call runs in this process as a worker.
+_PROGRESS_CONN: Optional[Connection] = None
+
+
+def _mp_context() -> Union["ForkServerContext", "SpawnContext"]:
+    global _MP_CONTEXT
+    with _MP_CONTEXT_LOCK:
+        if _MP_CONTEXT is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                forkserver = multiprocessing.get_context("forkserver")
+                forkserver.set_forkserver_preload(list(_FORKSERVER_PRELOAD))
+                _MP_CONTEXT = forkserver
+            else:
+                _MP_CONTEXT = multiprocessing.get_context("spawn")
+        return _MP_CONTEXT
+
+
+def report_progress(marker: str) -> None:
+    """Tell the parent how far the current call got (``IsolatedResult.progress``).
+
+    Lets a caller tell which step a timeout or crash hit; a no-op outside a worker.
+    """
+    if _PROGRESS_CONN is not None:
+        _PROGRESS_CONN.send(("progress", marker))
+
+
+def _child_main(
+    conn: Connection,
+    fn: Callable[..., Any],
+    args: Tuple[Any, ...],
+    limits: Optional[ResourceLimits] = None,
+) -> None:
+    global _PROGRESS_CONN
+    _PROGRESS_CONN = conn
+    try:
+        try:
+            if limits is not None:
+                _apply_limits(limits)
+            message: Tuple[Any, ...] = ("ok", fn(*args))
+        except BaseException as exc:
+            message = ("error", type(exc).__name__, str(exc), traceback.format_exc()[-TRACEBACK_LIMIT:])
+        try:
+            conn.send(message)
+        except Exception as exc:
+            # An unpicklable return value is an error like any other.
+            conn.send(("error", UNPICKLABLE_RESULT, str(exc), traceback.format_exc()[-TRACEBACK_LIMIT:]))
+    finally:
+        conn.close()
+
+
+def _stop(process: BaseProcess) -> None:
+    if process.is_alive():
+        process.terminate()
+        process.join(_TERMINATE_GRACE_SECONDS)
+    if process.is_alive():
+        process.kill()
+    process.join()
+
+
+def _received(message: Tuple[Any, ...], seconds: float) -> IsolatedResult:
+    if message[0] == "ok":
+        return IsolatedResult(outcome="ok", value=message[1], seconds=seconds)
+    _, error_type, error_message, error_trace = message
+    if error_type == "MemoryError":
+        return IsolatedResult(
+            outcome="memory_exceeded",
+            error_type=error_type,
+            error_message=error_message or "ran out of memory under the memory limit",
+            traceback=error_trace,
+            seconds=seconds,
+        )
+    return IsolatedResult(
+        outcome="error",
+        error_type=error_type,
+        error_message=error_message,
+        traceback=error_trace,
+        seconds=seconds,
+    )
+
+
+def run_isolated_many(
+    calls: Sequence[IsolatedCall],
+    *,
+    timeout: float,
+    max_workers: Optional[int] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> List[IsolatedResult]:
+    """Run ``fn(*args)`` for each call in its own process, at most ``max_workers`` at once.
+
+    ``timeout`` applies to each call from the moment its process starts; ``limits`` caps
+    each process's CPU time and memory. Results are returned in call order.
+    """
+    ctx = _mp_context()
+    limit = max(1, max_workers or len(calls) or 1)
+    pending = deque(enumerate(calls))
+    running: Dict[Connection, Tuple[int, BaseProcess, float]] = {}
+    results: List[Optional[IsolatedResult]] = [None] * len(calls)
+    progress: Dict[int, str] = {}
+
+    while pending or running:
+        while pending and len(running) < limit:
+            index, (fn, args) = pending.popleft()
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process: BaseProcess = ctx.Process(
+                target=_child_main,
+                args=(child_conn, fn, tuple(args), limits),
+                daemon=True,
+            )
+            try:
+                process.start()
+            except Exception as exc:
+                # The call could not be sent to a worker (e.g. a closure as ``fn``).
+                child_conn.close()
+                parent_conn.close()
+                results[index] = IsolatedResult(
+                    outcome="error",
+                    error_type=type(exc).__name__,
+                    error_message=f"could not start worker: {exc}",
+                )
+                logger.warning("sandbox_call_not_started", index=index, error=str(exc))
+                continue
+            # Only the child may hold the write end, so its death shows up as EOF here.
+            child_conn.close()
+            running[parent_conn] = (index, process, time.monotonic())
+
+        if not running:
+            continue
+        next_deadline = min(started for _, _, started in running.values()) + timeout
+        ready = wait(list(running), timeout=max(0.0, next_deadline - time.monotonic()))
+
+        # Only pipe ends were waited on.
+        for conn in cast(List[Connection], ready):
+            index, process, started = running[conn]
+            try:
+                message = conn.recv()
+            except EOFError:
+                process.join()
+                if limits is not None and limits.cpu_seconds and process.exitcode == -signal.SIGXCPU:
+                    result = IsolatedResult(
+                        outcome="timeout",
+                        error_type="CPUTimeExceeded",
+                        error_message=f"exceeded the {limits.cpu_seconds:g}s CPU time limit",
+                        exitcode=process.exitcode,
+                        seconds=round(time.monotonic() - started, 4),
+                    )
+                    logger.warning("sandbox_call_cpu_limit", index=index, cpu_seconds=limits.cpu_seconds)
+                else:
+                    result = IsolatedResult(
+                        outcome="crashed",
+                        error_type="ProcessCrashed",
+                        error_message=f"worker exited with code {process.exitcode} without a result",
+                        exitcode=process.exitcode,
+                        seconds=round(time.monotonic() - started, 4),
+                    )
+            except Exception as exc:
+                # Sent, but not loadable here (e.g. a class only the worker imported).
+                process.join()
+                result = IsolatedResult(
+                    outcome="error",
+                    error_type=UNPICKLABLE_RESULT,
+                    error_message=str(exc),
+                    seconds=round(time.monotonic() - started, 4),
+                )
+            else:
+                if message[0] == "progress":
+                    progress[index] = message[1]
+                    continue
+                process.join()
+                result = _received(message, round(time.monotonic() - started, 4))
+            del running[conn]
+            conn.close()
+            results[index] = result
+
+        now = time.monotonic()
+        for conn in [conn for conn, (_, _, started) in running.items() if now - started >= timeout]:
+            index, process, started = running.pop(conn)
+            _stop(process)
+            conn.close()
+            results[index] = IsolatedResult(
+                outcome="timeout",
+                error_type="TimeoutError",
+                error_message=f"did not finish within {timeout:g}s",
+                exitcode=process.exitcode,
+                seconds=round(now - started, 4),
+            )
+            logger.warning("sandbox_call_timeout", index=index, timeout_seconds=timeout)
+
+    for index, marker in progress.items():
+        finished = results[index]
+        if finished is not None:
+            finished.progress = marker
+    return [result for result in results if result is not None]
+
+
+def run_isolated(
+    fn: Callable[..., Any],
+    *args: Any,
+    timeout: float,
+    limits: Optional[ResourceLimits] = None,
+) -> IsolatedResult:
+    return run_isolated_many([(fn, args)], timeout=timeout, limits=limits)[0]
+
+
+def run_calls(
+    calls: Sequence[IsolatedCall],
+    *,
+    timeout: float,
+    isolated: bool = True,
+    max_workers: Optional[int] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> List[IsolatedResult]:
+    """``run_isolated_many``, or the same calls one after another in this process.
+
+    The in-process path enforces no timeout; it exists for callers that must share objects
+    with the caller or run where worker processes are not wanted.
+    """
+    if isolated:
+        return run_isolated_many(calls, timeout=timeout, max_workers=max_workers, limits=limits)
+    results = []
+    for fn, args in calls:
+        started = time.monotonic()
+        try:
+            value = fn(*args)
+        except Exception as exc:
+            results.append(
+                IsolatedResult(
+                    outcome="error",
+                    error_type=type(exc).__name__,
+                    error_message=str(exc),
+                    traceback=traceback.format_exc()[-TRACEBACK_LIMIT:],
+                    seconds=round(time.monotonic() - started, 4),
+                )
+            )
+        else:
+            results.append(IsolatedResult(outcome="ok", value=value, seconds=round(time.monotonic() - started, 4)))
+    return results
+
+
+class GuardedCallError(RuntimeError):
+    """A guarded call that did not return; ``result`` holds the worker outcome."""
+
+    def __init__(self, name: str, result: IsolatedResult) -> None:
+        super().__init__(f"{name}: {result.outcome}: {result.error_type}: {result.error_message}")
+        self.result = result
+
+
+def guarded(
+    fn: Callable[..., Any],
+    *,
+    timeout: Optional[float] = None,
+    limits: Optional[ResourceLimits] = None,
+    name: Optional[str] = None,
+) -> Callable[..., Any]:
+    """``fn`` run through ``run_isolated`` under ``limits`` (``GUARD_*`` env vars by default).
+
+    ``fn`` is sent to a worker, so it must be picklable: a module-level function or a
+    ``functools.partial`` of one (``name`` then labels it in errors and logs).
+
+    ``GUARD_CALLS=0`` returns ``fn`` unchanged. A result that cannot be sent back from the
+    worker (e.g. an instance of a class defined in generated code) raises
+    ``GuardedCallError`` like any other failure; it is never recomputed without the caps.
+    """
+    if not env_flag("GUARD_CALLS", True):
+        return fn
+    timeout = timeout or env_positive("GUARD_TIMEOUT_SECONDS", DEFAULT_GUARD_TIMEOUT_SECONDS, float)
+    limits = limits or ResourceLimits.from_env()
+    label = name or str(getattr(fn, "__name__", "call"))
+
+    @functools.wraps(fn)
+    def call(*args: Any, **kwargs: Any) -> Any:
+        target = functools.partial(fn, **kwargs) if kwargs else fn
+        result = run_isolated(target, *args, timeout=timeout, limits=limits)
+        if result.ok:
+            return result.value
+        if result.outcome != "error":
+            logger.warning("sandbox_guarded_call_failed", call=label, outcome=result.outcome)
+        raise GuardedCallError(label, result)
+
+    return call
@@ -0,0 +1,130 @@
+# modelpack/agents/screen_policy.py
+"""How deep ``screen_data`` probes a candidate model.
+
+Screening runs in waves. The first wave builds the model for ``base_seeds`` cheap seeds
+(today's 0..2 smoke test). While the run's screening time budget allows another wave of
+the same cost, further waves escalate: to larger instances when ``DataGen`` accepts a
+``scale`` keyword (``DataGen(seed, scale=s)`` for each of ``scales``), otherwise to fresh
+seeds, up to ``max_probes`` builds in total. Escalation stops at the first failing wave.
+``feasibility_check`` adds a fast ``check_feasibility`` run (``feasibility_mode``:
+``lp_relaxation``, ``presolve`` or ``first_feasible``) to each first-wave build, so an
+infeasible formulation is caught before ``solve_model`` spends its full time limit.
+``isolation`` builds each probe in a worker process: its ``DataGen`` output still reaches
+the run's instance store for ``solve_model``, its built model does not.
+
+Defaults come from ``SCREEN_*`` env vars; a run overrides any field with
+``model_pack.context["screen_policy"]`` (a dict). The resolved policy is recorded in
+``tests["screen"]``.
+"""
+
+import os
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import structlog
+
+from ..env import env_flag, env_positive
+
+from .utils import FEASIBILITY_MODES
+
+logger = structlog.get_logger(__name__)
+
+
+def _env_mode(name: str, default: str) -> str:
+    raw_value = (os.getenv(name) or "").strip()
+    return raw_value if raw_value in FEASIBILITY_MODES else default
+
+
+def _parse_scales(value: Any) -> Tuple[int, ...]:
+    if isinstance(value, str):
+        value = [part for part in value.split(",") if part.strip()]
+    return tuple(int(scale) for scale in value if int(scale) > 0)
+
+
+@dataclass(frozen=True)
+class ScreenPolicy:
+    base_seeds: int = 3
+    max_probes: int = 9
+    time_budget_seconds: float = 20.0
+    scales: Tuple[int, ...] = (2, 4)
+    feasibility_check: bool = False
+    feasibility_mode: str = "lp_relaxation"
+    feasibility_time_limit_seconds: float = 5.0
+    isolation: bool = True
+    probe_timeout_seconds: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "ScreenPolicy":
+        defaults = cls()
+        raw_scales = os.getenv("SCREEN_SCALES")
+        try:
+            scales = _parse_scales(raw_scales) if raw_scales is not None else defaults.scales
+        except ValueError:
+            scales = defaults.scales
+        return cls(
+            base_seeds=env_positive("SCREEN_BASE_SEEDS", defaults.base_seeds, int),
+            max_probes=env_positive("SCREEN_MAX_PROBES", defaults.max_probes, int),
+            time_budget_seconds=env_positive(
+                "SCREEN_TIME_BUDGET_SECONDS",
+                defaults.time_budget_seconds,
+                float,
+            ),
+            scales=scales,
+            feasibility_check=env_flag("SCREEN_FEASIBILITY_CHECK", defaults.feasibility_check),
+            feasibility_mode=_env_mode("SCREEN_FEASIBILITY_MODE", defaults.feasibility_mode),
+            feasibility_time_limit_seconds=env_positive(
+                "SCREEN_FEASIBILITY_TIME_LIMIT_SECONDS",
+                defaults.feasibility_time_limit_seconds,
+                float,
+            ),
+            isolation=env_flag("SCREEN_PROBE_ISOLATION", defaults.isolation),
+            probe_timeout_seconds=env_positive(
+                "SCREEN_PROBE_TIMEOUT_SECONDS",
+                defaults.probe_timeout_seconds,
+                float,
+            ),
+        )
+
+    def with_overrides(self, overrides: Optional[Mapping[str, Any]]) -> "ScreenPolicy":
+        """Copy with the fields named in ``overrides``; unknown or invalid values are ignored."""
+        if not isinstance(overrides, Mapping):
+            return self
+        known = {field.name for field in fields(self)}
+        updates: Dict[str, Any] = {}
+        for name, value in overrides.items():
+            if name not in known or value is None:
+                logger.warning("screen_policy_override_ignored", field=name)
+                continue
+            current = getattr(self, name)
+            try:
+                if name == "scales":
+                    updates[name] = _parse_scales(value)
+                elif name == "feasibility_mode":
+                    if value not in FEASIBILITY_MODES:
+                        raise ValueError(name)
+                    updates[name] = value
+                elif isinstance(current, bool):
+                    updates[name] = (
+                        value.strip().lower() not in {"0", "false", "no", "off"}
+                        if isinstance(value, str)
+                        else bool(value)
+                    )
+                else:
+                    parsed_value = type(current)(value)
+                    if parsed_value <= 0:
+                        raise ValueError(name)
+                    updates[name] = parsed_value
+            except (TypeError, ValueError):
+                logger.warning("screen_policy_override_ignored", field=name, value=repr(value))
+        return replace(self, **updates)
+
+    def as_dict(self) -> Dict[str, Any]:
+        policy = asdict(self)
+        policy["scales"] = list(self.scales)
+        return policy
+
+
+def screen_policy_for(context: Optional[Mapping[str, Any]] = None) -> ScreenPolicy:
+    """The env-var policy with the run's ``context["screen_policy"]`` overrides applied."""
+    overrides = (context or {}).get("screen_policy")
+    return ScreenPolicy.from_env().with_overrides(overrides)
@@ -1,19 +1,35 @@
 # modelpack/agents/solve_model.py
+import functools
 import structlog
+import time
+from typing import Any, Dict
 import pyomo.environ as pyo
 from pyomo.opt import SolverStatus, TerminationCondition
+from ..columnar import extract_solution
 from ..schemas import ModelPack, TestInstance
+from .instance_store import instance_store
+from .sandbox import guarded
+from .solve_policy import solve_policy_for, solve_statistics
 from .utils import (
     build_checker_contract,
+    check_feasibility,
     load_modules_with_shared_namespace,
     resolve_solver,
-    store_solution_entry,
+    run_datagen,
     summarize_solution_dict,
 )
 
 logger = structlog.get_logger(__name__)
 
 
+def _data_dict(data: Any) -> Dict[str, Any]:
+    if isinstance(data, dict):
+        return dict(data)
+    if hasattr(data, "__dict__"):
+        return vars(data)
+    return {}
+
+
 async def solve_model(state: ModelPack) -> ModelPack:
     """Solve the generated model and extract solutions."""
 
@@ -46,16 +62,30 @@ async def solve_model(state: ModelPack) -> ModelPack:
         if not solver:
             return state
         logger.info("solve_model_solver_selected", solver=solver_name)
+        policy = solve_policy_for(state.context)
+        solver_options = policy.solver_options(solver_name)
+        state.tests["solve_policy"] = {
+            **policy.as_dict(),
+            "solver": solver_name,
+            "solver_options": solver_options,
+        }
 
         checker_contract_written = False
+        store = instance_store()
+        instances = store.for_code(state.code)
+
+        # Generated DataGen runs in a worker under GUARD_* time and memory caps.
+        generate = guarded(functools.partial(run_datagen, state.code), name="DataGen")
 
         # Solve multiple instances
         for seed in range(3):
             try:
-                data = DataGen(seed)
-                if ModelBuilder:
+                data = instances.data(generate, seed)
+                # screen_data usually built this exact (code, seed) model already.
+                model = instances.take_model(seed)
+                if model is None and ModelBuilder:
                     model = ModelBuilder(data)
-                else:
+                elif model is None:
                     if isinstance(data, dict):
                         data_kwargs = dict(data)
                     elif hasattr(data, "__dict__"):
@@ -64,7 +94,39 @@ async def solve_model(state: ModelPack) -> ModelPack:
                         raise TypeError("DataGen output must be dict-like for create_model mode")
                     model = create_model_fn(**data_kwargs)
 
-                results = solver.solve(model, tee=False, timelimit=120)
+                if policy.precheck_mode:
+                    precheck = check_feasibility(
+                        model,
+                        policy.precheck_mode,
+                        time_limit=policy.precheck_time_limit_seconds,
+                        solver_name=solver_name,
+                    )
+                    if precheck["feasible"] is False:
+                        # Proven infeasible: record it without spending the full time limit.
+                        state.tests["instances"].append(
+                            TestInstance(
+                                id=f"solve_{seed}",
+                                data_dict=_data_dict(data),
+                                seed=seed,
+                                feasible=False,
+                                solver_status=f"precheck_{precheck['mode']}_{precheck['status']}",
+                                solve_wall_seconds=precheck.get("seconds"),
+                            )
+                        )
+                        logger.info(
+                            "solve_model_precheck_infeasible",
+                            seed=seed,
+                            mode=precheck["mode"],
+                            seconds=precheck.get("seconds"),
+                        )
+                        continue
+
+                num_variables = sum(1 for _ in model.component_data_objects(pyo.Var, active=True))
+                time_limit = policy.time_limit_for(num_variables)
+                solve_kwargs = {"options": dict(solver_options)} if solver_options else {}
+                solve_started = time.perf_counter()
+                results = solver.solve(model, tee=False, timelimit=time_limit, **solve_kwargs)
+                solve_seconds = time.perf_counter() - solve_started
 
                 feasible = (
                     results.solver.status == SolverStatus.ok
@@ -73,42 +135,31 @@ async def solve_model(state: ModelPack) -> ModelPack:
                 )
 
                 # Extract solution
-                solution_dict = {}
-                if feasible:
-                    for var in model.component_objects(pyo.Var, active=True):
-                        var_name = var.name
-                        if var.is_indexed():
-                            solution_dict[var_name] = {}
-                            for index in var:
-                                store_solution_entry(
-                                    solution_dict[var_name],
-                                    index,
-                                    pyo.value(var[index]),
-                                )
-                        else:
-                            solution_dict[var_name] = pyo.value(var)
+                solution_dict = extract_solution(model) if feasible else {}
 
                 obj_value = None
                 if feasible and hasattr(model, "objective"):
                     obj_value = pyo.value(model.objective)
 
                 # Store instance
-                if isinstance(data, dict):
-                    data_dict = dict(data)
-                elif hasattr(data, "__dict__"):
-                    data_dict = vars(data)
-                else:
-                    data_dict = {}
+                data_dict = _data_dict(data)
                 instance = TestInstance(
                     id=f"solve_{seed}",
                     data_dict=data_dict,
+                    seed=seed,
                     solution_dict=solution_dict if feasible else None,
                     feasible=feasible,
                     solver_status=str(results.solver.termination_condition),
                     objective_value=obj_value,
+                    time_limit_seconds=time_limit,
+                    **solve_statistics(solver, results, solve_seconds, obj_value),
                 )
 
                 state.tests["instances"].append(instance)
+                if feasible:
+                    # Its variable values are exactly the stored solution, so judge_solution
+                    # can evaluate this model instead of rebuilding it.
+                    instances.put_model(seed, model)
                 if feasible and solution_dict:
                     observed_solution_schema = summarize_solution_dict(solution_dict)
                     observed_solution_schema["instance_id"] = instance.id
@@ -127,6 +178,9 @@ async def solve_model(state: ModelPack) -> ModelPack:
                     seed=seed,
                     feasible=feasible,
                     obj_value=obj_value,
+                    seconds=instance.solve_wall_seconds,
+                    gap=instance.gap,
+                    nodes=instance.node_count,
                 )
 
             except Exception as e:
@@ -137,6 +191,7 @@ async def solve_model(state: ModelPack) -> ModelPack:
                 components_nl=state.components_nl,
                 model_source=state.code.model_builder.source,
             )
+        state.tests["instance_store"] = store.stats()
 
     except Exception as e:
         logger.error("solve_model_error", error=str(e))
@@ -0,0 +1,207 @@
+# modelpack/agents/solve_policy.py
+"""Time limit, MIP gap, thread and node limits for ``solve_model``, per solver.
+
+``SolvePolicy`` holds solver-neutral limits and translates them into each solver's
+option names (``solver_options``). ``precheck_mode`` (``lp_relaxation`` or ``presolve``;
+off by default) runs ``check_feasibility`` first, so an instance the solver proves
+infeasible in milliseconds skips the full solve; it costs an extra solver call on every
+feasible instance, so it pays off only when infeasible instances are common. The time limit can grow with instance size
+(``seconds_per_1k_variables``) up to ``max_time_limit_seconds``. Defaults come from
+``SOLVE_*`` env vars; a run overrides any field with ``model_pack.context["solve_policy"]``
+(a dict). ``solve_statistics`` reads wall time, best bound, gap, node and iteration
+counts back from a finished solve.
+"""
+
+import math
+import os
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, Mapping, Optional
+
+import structlog
+
+from ..env import env_positive
+
+logger = structlog.get_logger(__name__)
+
+# check_feasibility modes that can prove infeasibility without a full solve.
+PRECHECK_MODES = ("lp_relaxation", "presolve")
+
+# Option names per solver for (mip_gap, threads, node_limit); None = not supported.
+SOLVER_OPTION_NAMES: Dict[str, Dict[str, Optional[str]]] = {
+    "highs": {"mip_gap": "mip_rel_gap", "threads": "threads", "node_limit": "mip_max_nodes"},
+    "appsi_highs": {"mip_gap": "mip_rel_gap", "threads": "threads", "node_limit": "mip_max_nodes"},
+    "scip": {"mip_gap": "limits/gap", "threads": "lp/threads", "node_limit": "limits/nodes"},
+    "gurobi": {"mip_gap": "MIPGap", "threads": "Threads", "node_limit": "NodeLimit"},
+    "gurobi_direct": {"mip_gap": "MIPGap", "threads": "Threads", "node_limit": "NodeLimit"},
+    "cplex": {"mip_gap": "mip_tolerances_mipgap", "threads": "threads", "node_limit": "mip_limits_nodes"},
+    "cbc": {"mip_gap": "ratioGap", "threads": "threads", "node_limit": "maxNodes"},
+    "glpk": {"mip_gap": "mipgap", "threads": None, "node_limit": None},
+}
+
+
+def _precheck_mode(value: Any) -> Optional[str]:
+    """``lp_relaxation`` / ``presolve``; anything else (``""``, ``off``, ``None``) disables."""
+    text = str(value or "").strip()
+    return text if text in PRECHECK_MODES else None
+
+
+def _finite(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value) if math.isfinite(value) else None
+
+
+@dataclass(frozen=True)
+class SolvePolicy:
+    time_limit_seconds: float = 120.0
+    seconds_per_1k_variables: float = 0.0
+    max_time_limit_seconds: float = 600.0
+    mip_gap: Optional[float] = None
+    threads: Optional[int] = None
+    node_limit: Optional[int] = None
+    precheck_mode: Optional[str] = None
+    precheck_time_limit_seconds: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "SolvePolicy":
+        defaults = cls()
+        return cls(
+            time_limit_seconds=env_positive(
+                "SOLVE_TIME_LIMIT_SECONDS",
+                defaults.time_limit_seconds,
+                float,
+            ),
+            seconds_per_1k_variables=env_positive(
+                "SOLVE_SECONDS_PER_1K_VARIABLES",
+                defaults.seconds_per_1k_variables,
+                float,
+            ),
+            max_time_limit_seconds=env_positive(
+                "SOLVE_MAX_TIME_LIMIT_SECONDS",
+                defaults.max_time_limit_seconds,
+                float,
+            ),
+            mip_gap=env_positive("SOLVE_MIP_GAP", defaults.mip_gap, float),
+            threads=env_positive("SOLVE_THREADS", defaults.threads, int),
+            node_limit=env_positive("SOLVE_NODE_LIMIT", defaults.node_limit, int),
+            precheck_mode=_precheck_mode(os.getenv("SOLVE_PRECHECK_MODE", defaults.precheck_mode)),
+            precheck_time_limit_seconds=env_positive(
+                "SOLVE_PRECHECK_TIME_LIMIT_SECONDS",
+                defaults.precheck_time_limit_seconds,
+                float,
+            ),
+        )
+
+    def with_overrides(self, overrides: Optional[Mapping[str, Any]]) -> "SolvePolicy":
+        """Copy with the fields named in ``overrides``; unknown or invalid values are ignored."""
+        if not isinstance(overrides, Mapping):
+            return self
+        known = {field.name for field in fields(self)}
+        integer_fields = {"threads", "node_limit"}
+        updates: Dict[str, Any] = {}
+        for name, value in overrides.items():
+            if name not in known:
+                logger.warning("solve_policy_override_ignored", field=name)
+                continue
+            if name == "precheck_mode":
+                updates[name] = _precheck_mode(value)
+                continue
+            if value is None:
+                updates[name] = None
+                continue
+            try:
+                parsed_value = int(value) if name in integer_fields else float(value)
+                if parsed_value <= 0:
+                    raise ValueError(name)
+                updates[name] = parsed_value
+            except (TypeError, ValueError):
+                logger.warning("solve_policy_override_ignored", field=name, value=repr(value))
+        return replace(self, **updates)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def time_limit_for(self, num_variables: int) -> float:
+        scaled = self.time_limit_seconds + self.seconds_per_1k_variables * num_variables / 1000.0
+        return round(min(scaled, max(self.max_time_limit_seconds, self.time_limit_seconds)), 3)
+
+    def solver_options(self, solver_name: str) -> Dict[str, Any]:
+        """The policy's gap/thread/node limits under ``solver_name``'s option names."""
+        names = SOLVER_OPTION_NAMES.get(str(solver_name).lower(), {})
+        options: Dict[str, Any] = {}
+        for field_name in ("mip_gap", "threads", "node_limit"):
+            value = getattr(self, field_name)
+            if value is None:
+                continue
+            option_name = names.get(field_name)
+            if option_name is None:
+                logger.warning("solve_policy_option_unsupported", solver=solver_name, option=field_name)
+                continue
+            options[option_name] = value
+        return options
+
+
+def solve_policy_for(context: Optional[Mapping[str, Any]] = None) -> SolvePolicy:
+    """The env-var policy with the run's ``context["solve_policy"]`` overrides applied."""
+    overrides = (context or {}).get("solve_policy")
+    return SolvePolicy.from_env().with_overrides(overrides)
+
+
+def solve_statistics(
+    solver: Any,
+    results: Any,
+    wall_seconds: float,
+    objective_value: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Wall time, best bound, relative gap, node and iteration counts of the last solve.
+
+    HiGHS exposes its counters through the wrapped ``highspy.Highs`` object; other solvers
+    fall back to what Pyomo's results object reports. Missing values are ``None``.
+    """
+    stats: Dict[str, Any] = {
+        "solve_wall_seconds": round(wall_seconds, 4),
+        "best_bound": None,
+        "gap": None,
+        "node_count": None,
+        "iteration_count": None,
+    }
+
+    highs = getattr(solver, "_solver_model", None)
+    get_info = getattr(highs, "getInfo", None)
+    if callable(get_info):
+        try:
+            info = get_info()
+        except Exception:
+            info = None
+        if info is not None:
+            if getattr(info, "mip_node_count", -1) >= 0:
+                stats["node_count"] = int(info.mip_node_count)
+                stats["best_bound"] = _finite(getattr(info, "mip_dual_bound", None))
+                stats["gap"] = _finite(getattr(info, "mip_gap", None))
+            iterations = [
+                int(getattr(info, name, -1))
+                for name in ("simplex_iteration_count", "ipm_iteration_count")
+                if int(getattr(info, name, -1)) >= 0
+            ]
+            if iterations:
+                stats["iteration_count"] = sum(iterations)
+
+    problem = getattr(results, "problem", None)
+    if stats["best_bound"] is None and problem is not None:
+        maximize = "max" in str(getattr(problem, "sense", "")).lower()
+        bound_name = "upper_bound" if maximize else "lower_bound"
+        stats["best_bound"] = _finite(getattr(problem, bound_name, None))
+
+    if stats["node_count"] is None:
+        try:
+            branch_and_bound = results.solver.statistics.branch_and_bound
+            stats["node_count"] = int(branch_and_bound.number_of_created_subproblems)
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+    objective = _finite(objective_value)
+    if stats["gap"] is None and objective is not None and stats["best_bound"] is not None:
+        stats["gap"] = abs(objective - stats["best_bound"]) / max(abs(objective), 1e-10)
+    if stats["gap"] is not None:
+        stats["gap"] = round(stats["gap"], 8)
+    return stats
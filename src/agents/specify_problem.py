@@ -1,4 +1,6 @@
 # modelpack/agents/specify_problem.py
+from typing import Any, Dict
+
 import structlog
 from pydantic import BaseModel
 
@@ -9,6 +11,11 @@ from ..prompts import PROMPTS, llm_problem_text, problem_input_note
 logger = structlog.get_logger(__name__)
 
 
+def upstream_reads(state: ModelPack) -> Dict[str, Any]:
+    """What the prompts are built from; the stage memo key for this agent."""
+    return {"problem_input": llm_problem_text(state.context.get("nl_problem") or "")}
+
+
 async def specify_problem(state: ModelPack) -> ModelPack:
     """Specify the problem contract and extract NL components."""
 
@@ -7,21 +7,38 @@ import sys
 import os
 import re
 import math
-from typing import Any, Dict, List, Mapping
-import pyomo.environ as pyo
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional
 import structlog
 
 logger = structlog.get_logger(__name__)
 
 
+def _private_module_name(name: str) -> str:
+    # Generated code runs once per candidate and per concurrent run; a unique name keeps
+    # one run's module from replacing another's and keeps `if __name__ == "__main__":`
+    # demo blocks from executing.
+    return f"_modelpack_generated_{name}_{uuid.uuid4().hex[:12]}"
+
+
 def load_module_from_source(name: str, source: str) -> Any:
-    """Load Python module from source code string."""
+    """Load Python module from source code string.
+
+    The module is registered in ``sys.modules`` under a unique name only while it executes
+    (dataclasses and typing resolve their module there), so concurrent runs never see or
+    replace each other's modules.
+    """
+    module_name = _private_module_name(name)
     with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as f:
         f.write(source)
-        spec = importlib.util.spec_from_file_location(name, f.name)
+        spec = importlib.util.spec_from_file_location(module_name, f.name)
         module = importlib.util.module_from_spec(spec)
-        sys.modules[name] = module
-        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.modules.pop(module_name, None)
     return module
 
 
@@ -31,7 +48,7 @@ def load_modules_with_shared_namespace(code_pack) -> Dict[str, Any]:
     import numpy as np
 
     namespace = {
-        "__name__": "__main__",
+        "__name__": _private_module_name("namespace"),
         "pyo": pyo,
         "np": np,
         "List": list,
@@ -59,6 +76,23 @@ def load_modules_with_shared_namespace(code_pack) -> Dict[str, Any]:
     return namespace
 
 
+def run_datagen(code_pack, seed: int, **kwargs: Any) -> Any:
+    """``DataGen(seed, **kwargs)`` loaded from ``code_pack``.
+
+    Module-level, so ``guarded(functools.partial(run_datagen, code_pack))`` can send it to a
+    worker process; the namespace's own ``DataGen`` cannot be pickled.
+    """
+    return load_modules_with_shared_namespace(code_pack)["DataGen"](seed, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def solver_available(name: str) -> bool:
+    """Whether Pyomo can run ``name``; probed once per process (the probe spawns the binary)."""
+    import pyomo.environ as pyo
+
+    return bool(pyo.SolverFactory(name).available(exception_flag=False))
+
+
 def resolve_solver():
     """
     Resolve a usable solver.
@@ -68,23 +102,130 @@ def resolve_solver():
     2) scip
     3) highs
     """
+    import pyomo.environ as pyo
+
     explicit = os.getenv("SOLVER")
     if explicit:
-        solver = pyo.SolverFactory(explicit)
-        if solver.available():
-            return explicit, solver
+        if solver_available(explicit):
+            return explicit, pyo.SolverFactory(explicit)
         logger.error(f"Solver {explicit} not available")
         return None, None
 
     for name in ("scip", "highs"):
-        solver = pyo.SolverFactory(name)
-        if solver.available():
-            return name, solver
+        if solver_available(name):
+            return name, pyo.SolverFactory(name)
 
     logger.error("No solver available (tried: scip, highs)")
     return None, None
 
 
+FEASIBILITY_MODES = ("lp_relaxation", "presolve", "first_feasible")
+
+# Solver options that stop a MIP solve early, per feasibility mode and solver. "presolve"
+# stops before branching (presolve plus, where the solver has no presolve-only stop, the
+# root node); "first_feasible" stops at the first incumbent.
+_FEASIBILITY_OPTIONS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "presolve": {
+        "highs": {"mip_max_nodes": 0, "simplex_iteration_limit": 0},
+        "appsi_highs": {"mip_max_nodes": 0, "simplex_iteration_limit": 0},
+        "scip": {"limits/nodes": 1},
+        "gurobi": {"NodeLimit": 0},
+        "cplex": {"mip_limits_nodes": 0},
+        "cbc": {"maxNodes": 0},
+    },
+    "first_feasible": {
+        "highs": {"mip_max_improving_sols": 1},
+        "appsi_highs": {"mip_max_improving_sols": 1},
+        "scip": {"limits/solutions": 1},
+        "gurobi": {"SolutionLimit": 1},
+        "cplex": {"mip_limits_solutions": 1},
+        "cbc": {"maxSolutions": 1},
+    },
+}
+
+
+def check_feasibility(
+    model: Any,
+    mode: str = "lp_relaxation",
+    *,
+    time_limit: float = 5.0,
+    solver_name: Optional[str] = None,
+    in_place: bool = False,
+) -> Dict[str, Any]:
+    """Fast feasibility verdict for ``model`` without a full solve.
+
+    ``mode`` is ``lp_relaxation`` (solve with integrality relaxed; applied to a clone unless
+    ``in_place``), ``presolve`` (stop before branching) or ``first_feasible`` (stop at the
+    first incumbent). Solutions are never loaded into ``model``. ``feasible`` is ``False``
+    only when the solver proved infeasibility, ``True`` when it found a feasible point (for
+    ``lp_relaxation``: of the relaxation) and ``None`` when the check was inconclusive.
+    """
+    import time
+
+    import pyomo.environ as pyo
+    from pyomo.opt import TerminationCondition
+
+    verdict: Dict[str, Any] = {"mode": mode, "solver": solver_name, "status": None, "feasible": None}
+    if mode not in FEASIBILITY_MODES:
+        raise ValueError(f"Unknown feasibility mode {mode!r}; expected one of {FEASIBILITY_MODES}")
+    if solver_name is None:
+        solver_name, _ = resolve_solver()
+        verdict["solver"] = solver_name
+    if not solver_name:
+        verdict["status"] = "no_solver"
+        return verdict
+
+    options: Dict[str, Any] = {}
+    if mode != "lp_relaxation":
+        options = _FEASIBILITY_OPTIONS[mode].get(str(solver_name).lower(), {})
+        if not options:
+            verdict["status"] = "unsupported"
+            return verdict
+
+    started = time.perf_counter()
+    try:
+        target = model
+        if mode == "lp_relaxation":
+            target = model if in_place else model.clone()
+            pyo.TransformationFactory("core.relax_integer_vars").apply_to(target)
+        # A fresh solver object, so the early-stop options cannot leak into later solves.
+        solver = pyo.SolverFactory(solver_name)
+        solve_kwargs = {"options": dict(options)} if options else {}
+        results = solver.solve(
+            target,
+            tee=False,
+            timelimit=time_limit,
+            load_solutions=False,
+            **solve_kwargs,
+        )
+    except Exception as exc:
+        verdict.update(status="error", error=str(exc)[:500])
+        verdict["seconds"] = round(time.perf_counter() - started, 4)
+        return verdict
+
+    termination = results.solver.termination_condition
+    verdict["status"] = str(termination)
+    verdict["seconds"] = round(time.perf_counter() - started, 4)
+    if termination == TerminationCondition.infeasible:
+        verdict["feasible"] = False
+    elif termination in (
+        TerminationCondition.optimal,
+        TerminationCondition.feasible,
+        TerminationCondition.locallyOptimal,
+        TerminationCondition.globallyOptimal,
+        TerminationCondition.unbounded,
+    ):
+        verdict["feasible"] = True
+    else:
+        # Stopped early: feasible if the solver reported an incumbent objective.
+        problem = getattr(results, "problem", None)
+        maximize = "max" in str(getattr(problem, "sense", "")).lower()
+        incumbent = getattr(problem, "lower_bound" if maximize else "upper_bound", None)
+        if isinstance(incumbent, (int, float)) and math.isfinite(incumbent):
+            verdict["feasible"] = True
+    return verdict
+
+
 def _call_name(node: ast.AST) -> str:
     if isinstance(node, ast.Name):
         return node.id
@@ -188,13 +329,6 @@ def build_canonical_solution_schema(grounding: Mapping[str, Any]) -> Dict[str, A
     return schema
 
 
-def store_solution_entry(container: Dict[Any, Any], index: Any, value: Any) -> None:
-    container[index] = value
-    text_index = str(index)
-    if text_index != index:
-        container[text_index] = value
-
-
 def summarize_solution_dict(
     solution_dict: Mapping[str, Any],
     *,
@@ -207,6 +341,7 @@ def summarize_solution_dict(
     }
     if not isinstance(solution_dict, Mapping):
         return summary
+    from ..columnar import IndexedColumn
 
     solution_keys = [
         str(key)
@@ -217,15 +352,19 @@ def summarize_solution_dict(
 
     for var_name in solution_keys:
         value = solution_dict.get(var_name)
-        variable_summary: Dict[str, Any] = {
-            "container_type": type(value).__name__,
-        }
+        # A column answers both native and ``str(index)`` keys, like the small dicts, but
+        # is not a ``dict``; the checker prompt says to treat either as a mapping.
+        is_column = isinstance(value, IndexedColumn)
+        variable_summary: Dict[str, Any] = {"container_type": type(value).__name__}
         if isinstance(value, Mapping):
             native_samples: List[str] = []
             string_samples: List[str] = []
             has_tuple_keys = False
             has_stringified_tuple_keys = False
             for key in value.keys():
+                if is_column and not isinstance(key, str):
+                    string_samples.append(str(key))
+                    has_stringified_tuple_keys = has_stringified_tuple_keys or isinstance(key, tuple)
                 if isinstance(key, str):
                     string_samples.append(key)
                     if key.startswith("(") and key.endswith(")"):
@@ -279,6 +418,18 @@ def summarize_data_dict(
     return summary
 
 
+def targeted_feedback_payload(state: Any, agent: str) -> Optional[Dict[str, Any]]:
+    """The pending feedback aimed at ``agent``, whole, as JSON (for stage memo keys)."""
+    feedback = state.tests.get("last_feedback")
+    if feedback is not None and getattr(feedback, "target_agent", None) == agent:
+        return feedback.model_dump(mode="json")
+    return None
+
+
+def dump_artifact(value: Any) -> Any:
+    return value.model_dump(mode="json") if value is not None else None
+
+
 def build_constraint_catalog(components_nl: Any) -> List[Dict[str, Any]]:
     if components_nl is None:
         return []
@@ -477,6 +628,8 @@ def assign_solution_to_model(
     model: Any,
     solution_dict: Mapping[str, Any],
 ) -> List[str]:
+    import pyomo.environ as pyo
+
     issues: List[str] = []
     for var in model.component_objects(pyo.Var, active=True):
         var_name = var.name
@@ -509,6 +662,8 @@ def evaluate_model_deterministically(
     tolerance: float = 1e-6,
     max_violations: int = 8,
 ) -> Dict[str, Any]:
+    import pyomo.environ as pyo
+
     violations: List[str] = []
     checked_constraints = 0
 
@@ -597,6 +752,432 @@ def _mutation_values(current_value: Any, domain: str) -> List[Any]:
     return mutations
 
 
+# Multi-variable mutations move at most this many entries, so each stays a small, readable edit.
+MAX_MULTI_CHANGES = 4
+
+
+def _solution_variables(model: Any, solution_dict: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """The model's variables that have a value in ``solution_dict``, in model order."""
+    import pyomo.environ as pyo
+
+    variables: List[Dict[str, Any]] = []
+    for var_data in model.component_data_objects(pyo.Var, active=True):
+        value = pyo.value(var_data, exception=False)
+        component = var_data.parent_component()
+        if value is None or component.name not in solution_dict:
+            continue
+        domain_name = _domain_name(var_data)
+        variables.append(
+            {
+                "data": var_data,
+                "variable": component.name,
+                "key": var_data.index() if component.is_indexed() else None,
+                "value": float(value),
+                "lb": pyo.value(var_data.lb, exception=False) if var_data.lb is not None else None,
+                "ub": pyo.value(var_data.ub, exception=False) if var_data.ub is not None else None,
+                "domain": (
+                    "Binary" if "Binary" in domain_name else "Integer" if "Integer" in domain_name else "Reals"
+                ),
+            }
+        )
+    return variables
+
+
+def _constraint_rows(model: Any, positions: Dict[int, int]) -> Dict[str, Any]:
+    """Every active constraint's body value, bounds, slack and (when linear) coefficients.
+
+    Computed once for the reference solution; ``positions`` maps ``id(var_data)`` to the
+    variable's position in ``_solution_variables``.
+    """
+    import numpy as np
+    import pyomo.environ as pyo
+    from pyomo.core.expr.visitor import identify_variables
+    from pyomo.repn import generate_standard_repn
+
+    rows: List[Dict[str, Any]] = []
+    for constraint in model.component_data_objects(pyo.Constraint, active=True):
+        body_value = pyo.value(constraint.body, exception=False)
+        if body_value is None:
+            continue
+        lower = pyo.value(constraint.lower, exception=False) if constraint.has_lb() else None
+        upper = pyo.value(constraint.upper, exception=False) if constraint.has_ub() else None
+        sides = []
+        if lower is not None:
+            sides.append((body_value - lower, -1, lower))
+        if upper is not None:
+            sides.append((upper - body_value, 1, upper))
+        if not sides:
+            continue
+        slack, direction, bound = min(sides, key=lambda side: side[0])
+        try:
+            repn = generate_standard_repn(constraint.body, quadratic=False, compute_values=True)
+            linear = repn.is_linear()
+        except Exception:
+            linear = False
+        if linear:
+            terms = [
+                (positions[id(var_data)], float(coef))
+                for var_data, coef in zip(repn.linear_vars, repn.linear_coefs)
+                if id(var_data) in positions and coef
+            ]
+        else:
+            terms = [
+                (positions[id(var_data)], 0.0)
+                for var_data in identify_variables(constraint.body, include_fixed=False)
+                if id(var_data) in positions
+            ]
+        rows.append(
+            {
+                "name": constraint.name,
+                "component": constraint.parent_component().name,
+                "body": float(body_value),
+                "lower": lower,
+                "upper": upper,
+                "slack": float(slack),
+                "tightness": float(slack) / max(1.0, abs(float(bound))),
+                "direction": direction,
+                "bound": float(bound),
+                "linear": linear,
+                "terms": terms,
+            }
+        )
+
+    linear_rows = [row for row in rows if row["linear"]]
+    columns: Dict[int, List[tuple]] = {}
+    for row_number, row in enumerate(linear_rows):
+        for position, coef in row["terms"]:
+            columns.setdefault(position, []).append((row_number, coef))
+    return {
+        "rows": rows,
+        "linear_rows": linear_rows,
+        "body": np.asarray([row["body"] for row in linear_rows], dtype=np.float64),
+        "lower": np.asarray(
+            [math.nan if row["lower"] is None else row["lower"] for row in linear_rows],
+            dtype=np.float64,
+        ),
+        "upper": np.asarray(
+            [math.nan if row["upper"] is None else row["upper"] for row in linear_rows],
+            dtype=np.float64,
+        ),
+        "columns": {
+            position: (
+                np.asarray([entry[0] for entry in entries], dtype=np.int64),
+                np.asarray([entry[1] for entry in entries], dtype=np.float64),
+            )
+            for position, entries in columns.items()
+        },
+        "nonlinear_positions": {
+            position for row in rows if not row["linear"] for position, _ in row["terms"]
+        },
+    }
+
+
+def _crossing_margin(bound: float) -> float:
+    # Clearly past the bound, so a checker with a looser tolerance still sees the violation.
+    return 0.01 * max(1.0, abs(bound))
+
+
+def _unit_move(variable: Dict[str, Any], sign: int) -> Optional[float]:
+    """The value one integral step in direction ``sign`` within the domain, if any."""
+    value = variable["value"]
+    if variable["domain"] == "Binary":
+        if (sign > 0 and value < 0.5) or (sign < 0 and value >= 0.5):
+            return 1.0 - round(value)
+        return None
+    if variable["domain"] == "Integer":
+        return float(round(value) + sign)
+    return None
+
+
+def _row_candidates(
+    row: Dict[str, Any],
+    variables: List[Dict[str, Any]],
+    *,
+    per_row: int,
+) -> List[tuple]:
+    """Single-variable crossings, multi-variable crossings and ±1/0 moves for one tight row."""
+    candidates: List[tuple] = []
+    slack = max(0.0, row["slack"])
+    margin = _crossing_margin(row["bound"])
+    terms = sorted(row["terms"], key=lambda term: -abs(term[1]))[:per_row]
+
+    for position, coef in terms:
+        variable = variables[position]
+        for new_value in _mutation_values(variable["value"], variable["domain"]):
+            candidates.append(("single", ((position, float(new_value)),), row["name"]))
+        if not coef:
+            continue
+        sign = row["direction"] * (1 if coef > 0 else -1)
+        if variable["domain"] == "Reals":
+            new_value = variable["value"] + sign * (slack + margin) / abs(coef)
+        elif variable["domain"] == "Integer":
+            steps = math.floor((slack + 1e-4 * max(1.0, abs(row["bound"]))) / abs(coef)) + 1
+            new_value = float(round(variable["value"]) + sign * steps)
+        else:
+            new_value = _unit_move(variable, sign)
+            if new_value is None or abs(coef) <= slack:
+                continue
+        candidates.append(("bound_crossing", ((position, float(new_value)),), row["name"]))
+
+    if not row["linear"]:
+        return candidates
+
+    # Unit moves that each keep the row feasible but together push it past its bound.
+    movable = []
+    for position, coef in row["terms"]:
+        if not coef:
+            continue
+        new_value = _unit_move(variables[position], row["direction"] * (1 if coef > 0 else -1))
+        if new_value is not None and abs(coef) * abs(new_value - variables[position]["value"]) <= slack:
+            movable.append((abs(coef) * abs(new_value - variables[position]["value"]), position, new_value))
+    movable.sort()
+    # Smallest moves first, largest first, and a few rotations for different subsets.
+    orderings = [movable, movable[::-1]]
+    orderings += [movable[offset:] + movable[:offset] for offset in range(1, min(len(movable), 4))]
+    for ordering in orderings:
+        changes: List[tuple] = []
+        consumed = 0.0
+        for amount, position, new_value in ordering[:MAX_MULTI_CHANGES]:
+            changes.append((position, float(new_value)))
+            consumed += amount
+            if consumed > slack + 1e-9:
+                break
+        if consumed > slack + 1e-9 and len(changes) >= 2:
+            candidates.append(("multi_variable", tuple(changes), row["name"]))
+    return candidates
+
+
+def _bound_candidates(position: int, variable: Dict[str, Any]) -> List[tuple]:
+    candidates = []
+    if variable["lb"] is not None:
+        new_value = variable["lb"] - max(1.0, _crossing_margin(variable["lb"]))
+        candidates.append(("bound_crossing", ((position, float(new_value)),), None))
+    if variable["ub"] is not None:
+        new_value = variable["ub"] + max(1.0, _crossing_margin(variable["ub"]))
+        candidates.append(("bound_crossing", ((position, float(new_value)),), None))
+    return candidates
+
+
+def _mutation_candidates(
+    variables: List[Dict[str, Any]],
+    table: Dict[str, Any],
+    *,
+    max_candidates: int,
+    max_target_constraints: int,
+    max_locations: int,
+) -> List[tuple]:
+    """Candidate mutations ``(kind, ((position, new_value), ...), target_row)``, tightest rows first.
+
+    Candidates are interleaved across rows so that capping the list keeps its spread.
+    """
+    # Tightest rows first, interleaved across constraint components so one large family
+    # of binding rows (e.g. equalities) does not take every slot.
+    by_component: Dict[str, List[Dict[str, Any]]] = {}
+    for row in sorted(table["rows"], key=lambda row: row["tightness"]):
+        by_component.setdefault(row["component"], []).append(row)
+    tight_rows = [
+        rows[rank]
+        for rank in range(max((len(rows) for rows in by_component.values()), default=0))
+        for rows in by_component.values()
+        if rank < len(rows)
+    ][:max_target_constraints]
+    # Spread the candidate budget over the target rows (each variable yields ~3 candidates).
+    per_row = max(8, max_candidates // max(1, 3 * len(tight_rows)))
+    groups = [_row_candidates(row, variables, per_row=per_row) for row in tight_rows]
+
+    targeted: List[int] = []
+    for row in tight_rows:
+        for position, _ in row["terms"]:
+            if position not in targeted:
+                targeted.append(position)
+    groups.append(
+        [
+            candidate
+            for position in targeted[: max(max_locations, per_row)]
+            for candidate in _bound_candidates(position, variables[position])
+        ]
+    )
+    # Untargeted ±1/0 moves keep a baseline when few constraints are tight.
+    groups.append(
+        [
+            ("single", ((position, float(new_value)),), None)
+            for position in range(min(len(variables), max_locations))
+            for new_value in _mutation_values(variables[position]["value"], variables[position]["domain"])
+        ]
+    )
+
+    candidates: List[tuple] = []
+    seen = set()
+    for rank in range(max((len(group) for group in groups), default=0)):
+        for group in groups:
+            if rank >= len(group):
+                continue
+            kind, changes, target = group[rank]
+            marker = tuple((position, round(value, 9)) for position, value in sorted(changes))
+            if marker in seen:
+                continue
+            seen.add(marker)
+            candidates.append((kind, changes, target))
+            if len(candidates) >= max_candidates:
+                return candidates
+    return candidates
+
+
+def _screen_candidates(
+    candidates: List[tuple],
+    variables: List[Dict[str, Any]],
+    table: Dict[str, Any],
+    tolerance: float,
+) -> List[set]:
+    """Per candidate, the constraint components (or ``bounds:``/``domain:`` variables) it violates.
+
+    Linear rows are evaluated for all candidates at once from the body values and
+    coefficients computed for the reference solution; bounds and domains directly. An
+    empty set means the screen found no violation.
+    """
+    import numpy as np
+
+    violated_by: List[set] = [set() for _ in candidates]
+    for number, (_, changes, _) in enumerate(candidates):
+        for position, new_value in changes:
+            variable = variables[position]
+            if (variable["lb"] is not None and new_value < variable["lb"] - tolerance) or (
+                variable["ub"] is not None and new_value > variable["ub"] + tolerance
+            ):
+                violated_by[number].add(f"bounds:{variable['variable']}")
+            elif variable["domain"] != "Reals" and abs(new_value - round(new_value)) > tolerance:
+                violated_by[number].add(f"domain:{variable['variable']}")
+
+    candidate_ids: List[Any] = []
+    row_ids: List[Any] = []
+    contributions: List[Any] = []
+    for number, (_, changes, _) in enumerate(candidates):
+        for position, new_value in changes:
+            column = table["columns"].get(position)
+            if column is None:
+                continue
+            rows, coefs = column
+            candidate_ids.append(np.full(len(rows), number, dtype=np.int64))
+            row_ids.append(rows)
+            contributions.append(coefs * (new_value - variables[position]["value"]))
+    if not candidate_ids:
+        return violated_by
+
+    row_count = max(1, len(table["linear_rows"]))
+    keys = np.concatenate(candidate_ids) * row_count + np.concatenate(row_ids)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    deltas = np.bincount(inverse, weights=np.concatenate(contributions))
+    touched_rows = unique_keys % row_count
+    bodies = table["body"][touched_rows] + deltas
+    with np.errstate(invalid="ignore"):
+        violated = (bodies < table["lower"][touched_rows] - tolerance) | (
+            bodies > table["upper"][touched_rows] + tolerance
+        )
+    for key in unique_keys[violated].tolist():
+        number, row_number = divmod(key, row_count)
+        violated_by[number].add(table["linear_rows"][row_number]["component"])
+    return violated_by
+
+
+def _violation_label(violation: str) -> str:
+    """``evaluate_model_deterministically`` violation text as a ``_screen_candidates`` label."""
+    kind, _, name = violation.partition(":")
+    component = name.split("[", 1)[0]
+    if kind.endswith("bound_violation") and not kind.startswith("constraint"):
+        return f"bounds:{component}"
+    if kind.endswith("domain_violation"):
+        return f"domain:{component}"
+    return component
+
+
+def _apply_mutation(
+    solution_dict: Mapping[str, Any],
+    variables: List[Dict[str, Any]],
+    changes: tuple,
+) -> Dict[str, Any]:
+    mutated = copy.deepcopy(solution_dict)
+    for position, new_value in changes:
+        variable = variables[position]
+        var_name, key = variable["variable"], variable["key"]
+        if key is None:
+            mutated[var_name] = new_value
+            continue
+        container = mutated[var_name]
+        text_key = str(key)
+        if not isinstance(container, Mapping) or key in container:
+            container[key] = new_value
+            # Plain dicts may hold the same entry under str(index) as well.
+            if isinstance(container, dict) and text_key in container:
+                container[text_key] = new_value
+        elif text_key in container:
+            container[text_key] = new_value
+        else:
+            container[key] = new_value
+    return mutated
+
+
+def _describe_mutation(
+    kind: str,
+    changes: tuple,
+    target: Optional[str],
+    variables: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    described = [
+        {
+            "variable": variables[position]["variable"],
+            "key": repr(variables[position]["key"]) if variables[position]["key"] is not None else None,
+            "old_value": variables[position]["value"],
+            "new_value": new_value,
+        }
+        for position, new_value in changes
+    ]
+    mutation: Dict[str, Any] = {"kind": kind}
+    if len(described) == 1:
+        mutation.update(described[0])
+    else:
+        mutation["changes"] = described
+    mutation["target_constraint"] = target
+    return mutation
+
+
+def _diverse_order(candidates: List[tuple], violated_by: List[set]) -> List[int]:
+    """Candidate numbers round-robin over the components they violate.
+
+    For each component, candidates that violate the fewest other things come first (the
+    checker has to catch that specific constraint), with mutation kinds rotated across
+    components; constraint components are visited before bound and domain labels.
+    """
+    kinds = ("multi_variable", "bound_crossing", "single")
+    labels: List[str] = []
+    for violations in violated_by:
+        for label in sorted(violations):
+            if label not in labels:
+                labels.append(label)
+    labels.sort(key=lambda label: label.startswith(("bounds:", "domain:")))
+
+    queues = []
+    for offset, label in enumerate(labels):
+        rank = {kind: (index + offset) % len(kinds) for index, kind in enumerate(kinds)}
+        queues.append(
+            sorted(
+                (number for number, violations in enumerate(violated_by) if label in violations),
+                key=lambda number: (len(violated_by[number]), rank.get(candidates[number][0], 0)),
+            )
+        )
+
+    order: List[int] = []
+    chosen = set()
+    cursors = [0] * len(queues)
+    while len(chosen) < sum(1 for violations in violated_by if violations):
+        for index, queue in enumerate(queues):
+            while cursors[index] < len(queue) and queue[cursors[index]] in chosen:
+                cursors[index] += 1
+            if cursors[index] < len(queue):
+                chosen.add(queue[cursors[index]])
+                order.append(queue[cursors[index]])
+    return order
+
+
 def find_infeasible_solution_mutations(
     namespace: Mapping[str, Any],
     data_dict: Mapping[str, Any],
@@ -604,48 +1185,100 @@ def find_infeasible_solution_mutations(
     canonical_solution_schema: Mapping[str, Any],
     *,
     tolerance: float = 1e-6,
-    max_examples: int = 2,
+    max_examples: int = 8,
     max_locations: int = 12,
+    max_candidates: int = 400,
+    max_target_constraints: int = 40,
+    model: Any = None,
 ) -> List[Dict[str, Any]]:
-    examples: List[Dict[str, Any]] = []
-    locations = _iter_solution_locations(solution_dict)[:max_locations]
-
-    for var_name, key, current_value in locations:
-        schema_entry = canonical_solution_schema.get(var_name, {})
-        domain = str(schema_entry.get("domain") or "")
-        for candidate_value in _mutation_values(current_value, domain):
-            mutated = copy.deepcopy(solution_dict)
-            if key is None:
-                mutated[var_name] = candidate_value
-            else:
-                mutated[var_name][key] = candidate_value
-                text_key = str(key)
-                if isinstance(mutated[var_name], Mapping) and text_key in mutated[var_name]:
-                    mutated[var_name][text_key] = candidate_value
-
-            try:
-                model = build_model_from_instance(namespace, data_dict)
-                assign_solution_to_model(model, mutated)
-                deterministic = evaluate_model_deterministically(model, tolerance=tolerance)
-            except Exception:
-                continue
+    """Mutations of a feasible solution that the model itself rejects, diverse by violation.
+
+    The model is built once (or ``model`` is reused; ``solution_dict`` must then cover all
+    its variables) and the slack of every constraint is computed once for the feasible
+    solution. Candidates target variables of the tightest constraints: single-variable
+    moves just past a constraint or variable bound, multi-variable moves that are
+    harmless one at a time but cross a bound together, and the classic ±1/0 moves.
+    Up to ``max_candidates`` are screened in one batch against the linear constraints,
+    bounds and domains. Candidates touching nonlinear constraints are evaluated on the
+    model. Examples are picked round-robin over the violated constraint components and
+    confirmed by deterministic re-evaluation.
+    """
+    import time
 
-            if deterministic["feasible"]:
-                continue
+    started = time.monotonic()
+    try:
+        if model is None:
+            model = build_model_from_instance(namespace, data_dict)
+        if assign_solution_to_model(model, solution_dict):
+            return []
+        if not evaluate_model_deterministically(model, tolerance=tolerance)["feasible"]:
+            return []
+        variables = _solution_variables(model, solution_dict)
+        for variable in variables:
+            schema_entry = canonical_solution_schema.get(variable["variable"]) or {}
+            schema_domain = str(schema_entry.get("domain") or "")
+            if variable["domain"] == "Reals" and ("Binary" in schema_domain or "Integer" in schema_domain):
+                variable["domain"] = "Binary" if "Binary" in schema_domain else "Integer"
+        positions = {id(variable["data"]): position for position, variable in enumerate(variables)}
+        table = _constraint_rows(model, positions)
+    except Exception as exc:
+        logger.warning("mutation_search_setup_failed", error=str(exc))
+        return []
 
-            examples.append(
-                {
-                    "solution": mutated,
-                    "mutation": {
-                        "variable": var_name,
-                        "key": repr(key) if key is not None else None,
-                        "old_value": current_value,
-                        "new_value": candidate_value,
-                    },
-                    "deterministic_violations": deterministic["violations"],
-                }
-            )
-            if len(examples) >= max_examples:
-                return examples
+    candidates = _mutation_candidates(
+        variables,
+        table,
+        max_candidates=max_candidates,
+        max_target_constraints=max_target_constraints,
+        max_locations=max_locations,
+    )
+    violated_by = _screen_candidates(candidates, variables, table, tolerance)
+
+    # The batch screen cannot judge nonlinear constraints; a few such candidates go to the model.
+    model_evaluations = 0
+    for number, (_, changes, _) in enumerate(candidates):
+        if model_evaluations >= 4 * max_examples:
+            break
+        if violated_by[number]:
+            continue
+        if not any(position in table["nonlinear_positions"] for position, _ in changes):
+            continue
+        model_evaluations += 1
+        try:
+            assign_solution_to_model(model, _apply_mutation(solution_dict, variables, changes))
+            deterministic = evaluate_model_deterministically(model, tolerance=tolerance)
+        except Exception:
+            continue
+        if not deterministic["feasible"]:
+            violated_by[number] = {_violation_label(violation) for violation in deterministic["violations"]}
+
+    examples: List[Dict[str, Any]] = []
+    for number in _diverse_order(candidates, violated_by):
+        kind, changes, target = candidates[number]
+        mutated = _apply_mutation(solution_dict, variables, changes)
+        try:
+            assign_solution_to_model(model, mutated)
+            deterministic = evaluate_model_deterministically(model, tolerance=tolerance)
+        except Exception:
+            continue
+        if deterministic["feasible"]:
+            continue
+        examples.append(
+            {
+                "solution": mutated,
+                "mutation": _describe_mutation(kind, changes, target, variables),
+                "deterministic_violations": deterministic["violations"],
+            }
+        )
+        if len(examples) >= max_examples:
+            break
 
+    logger.info(
+        "mutation_search_complete",
+        candidates=len(candidates),
+        screened_infeasible=sum(1 for violations in violated_by if violations),
+        model_evaluations=model_evaluations,
+        examples=len(examples),
+        seconds=round(time.monotonic() - started, 4),
+    )
     return examples
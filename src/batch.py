@@ -0,0 +1,347 @@
+# modelpack/batch.py
+"""Batch runner with cross-problem deduplication.
+
+Problems are canonicalised with ``llm_problem_text`` (keeping the data generator contract,
+which ``build_model`` reads) and hashed together with the target interface and graph
+variant. Concurrent problems with the same key are coalesced into one pipeline execution
+whose ModelPack is fanned out to every requester (single-flight).
+
+With ``share_spec`` the ``specify_problem``/``derive_math`` artifacts are additionally
+computed once per NL text (the input before ``Required create_model signature:``) and
+pre-seeded into every run that differs only in its signature or data contract.
+
+    python -m src batch problems/ --output batch_out --workers 4 --share-spec
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import structlog
+
+if TYPE_CHECKING:
+    from .schemas import ModelPack
+
+logger = structlog.get_logger(__name__)
+
+SIGNATURE_MARKER = "\nRequired create_model signature:"
+SHARED_SPEC_STAGES = ("specify_problem", "derive_math")
+_SHARED_CONTEXT_KEYS = ("assumptions", "units", "objective_sense", "scope", "deliverables")
+
+
+def _sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _normalize_whitespace(text: str) -> str:
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def run_key(problem_text: str, target_interface: str = "", graph_variant: str = "") -> str:
+    """Single-flight key: everything a pipeline run reads from its input."""
+    from .prompts import llm_problem_text
+
+    canonical = llm_problem_text(problem_text, preserve_data_generator_contract=True)
+    return _sha256(_normalize_whitespace(canonical), target_interface.strip(), graph_variant)
+
+
+def spec_key(problem_text: str) -> str:
+    """Key for reusable specify/derive artifacts: the NL text before the signature."""
+    from .prompts import llm_problem_text
+
+    nl_text = llm_problem_text(problem_text).split(SIGNATURE_MARKER, 1)[0]
+    return _sha256(_normalize_whitespace(nl_text))
+
+
+@dataclass
+class BatchItem:
+    item_id: str
+    problem_text: str
+    target_interface: str = ""
+
+
+@dataclass
+class BatchResult:
+    item_id: str
+    key: str
+    status: str
+    seconds: float
+    dedup_of: Optional[str] = None
+    shared_spec_from: Optional[str] = None
+    error: Optional[str] = None
+    model_pack: Any = field(default=None, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        trace_summary: Dict[str, Any] = {}
+        if self.model_pack is not None:
+            trace_summary = self.model_pack.tests.get("llm_trace_summary") or {}
+        return {
+            "id": self.item_id,
+            "key": self.key,
+            "status": self.status,
+            "seconds": round(self.seconds, 3),
+            "dedup_of": self.dedup_of,
+            "shared_spec_from": self.shared_spec_from,
+            "llm_calls": 0 if self.dedup_of else trace_summary.get("call_count", 0),
+            "llm_tokens": 0 if self.dedup_of else trace_summary.get("total_tokens", 0),
+            "error": self.error,
+        }
+
+
+def load_batch_items(source: str | Path) -> List[BatchItem]:
+    """Read ``*.txt`` files from a directory, or ``{"id", "problem"}`` lines from JSONL."""
+    path = Path(source)
+    if path.is_dir():
+        return [
+            BatchItem(item_id=file_path.stem, problem_text=file_path.read_text(encoding="utf-8"))
+            for file_path in sorted(path.glob("*.txt"))
+        ]
+    items: List[BatchItem] = []
+    for index, line in enumerate(path.read_text(encoding="utf-8").splitlines()):
+        if not line.strip():
+            continue
+        payload = json.loads(line)
+        items.append(
+            BatchItem(
+                item_id=str(payload.get("id") or f"item_{index}"),
+                problem_text=str(payload.get("problem") or payload.get("nl_problem") or ""),
+                target_interface=str(payload.get("target_interface") or ""),
+            )
+        )
+    return items
+
+
+class BatchRunner:
+    """Run batch items with at most ``workers`` pipelines in flight."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        graph_variant: Optional[str] = None,
+        share_spec: bool = False,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.graph_variant = graph_variant or ""
+        self.share_spec = share_spec
+        self._runs: Dict[str, "asyncio.Future[ModelPack]"] = {}
+        self._run_leaders: Dict[str, str] = {}
+        self._specs: Dict[str, "asyncio.Future[Optional[ModelPack]]"] = {}
+        self._spec_leaders: Dict[str, str] = {}
+        self._semaphore = asyncio.Semaphore(self.workers)
+
+    async def run(self, items: List[BatchItem]) -> List[BatchResult]:
+        self._semaphore = asyncio.Semaphore(self.workers)
+        shared_spec_keys = self._shared_spec_keys(items) if self.share_spec else set()
+        return list(
+            await asyncio.gather(*(self._run_item(item, shared_spec_keys) for item in items))
+        )
+
+    def _shared_spec_keys(self, items: List[BatchItem]) -> set:
+        # Sharing only pays off when one NL text appears with more than one run key.
+        run_keys_by_spec: Dict[str, set] = {}
+        for item in items:
+            run_keys_by_spec.setdefault(spec_key(item.problem_text), set()).add(
+                run_key(item.problem_text, item.target_interface, self.graph_variant)
+            )
+        return {key for key, run_keys in run_keys_by_spec.items() if len(run_keys) > 1}
+
+    async def _run_item(self, item: BatchItem, shared_spec_keys: set) -> BatchResult:
+        started = time.perf_counter()
+        key = run_key(item.problem_text, item.target_interface, self.graph_variant)
+        future = self._runs.get(key)
+        dedup_of = None
+        if future is None:
+            future = self._runs[key] = asyncio.get_running_loop().create_future()
+            self._run_leaders[key] = item.item_id
+            asyncio.ensure_future(self._lead_run(item, key, future, shared_spec_keys))
+        else:
+            dedup_of = self._run_leaders[key]
+            logger.info("batch_run_coalesced", item_id=item.item_id, leader=dedup_of)
+
+        try:
+            model_pack = await asyncio.shield(future)
+        except Exception as exc:
+            return BatchResult(
+                item.item_id,
+                key,
+                status="error",
+                seconds=time.perf_counter() - started,
+                dedup_of=dedup_of,
+                error=str(exc),
+            )
+        if dedup_of is not None:
+            model_pack = model_pack.model_copy(deep=True)
+            model_pack.context["dedup_of"] = dedup_of
+        return BatchResult(
+            item.item_id,
+            key,
+            status=model_pack.status,
+            seconds=time.perf_counter() - started,
+            dedup_of=dedup_of,
+            shared_spec_from=model_pack.context.get("preseeded_from"),
+            model_pack=model_pack,
+        )
+
+    async def _lead_run(
+        self,
+        item: BatchItem,
+        key: str,
+        future: "asyncio.Future[ModelPack]",
+        shared_spec_keys: set,
+    ) -> None:
+        try:
+            seeded_pack = None
+            item_spec_key = spec_key(item.problem_text)
+            if item_spec_key in shared_spec_keys:
+                seeded_pack = await self._seeded_pack(item, item_spec_key)
+            async with self._semaphore:
+                model_pack = await asyncio.to_thread(
+                    asyncio.run,
+                    _run_pipeline(item, self.graph_variant or None, seeded_pack),
+                )
+            future.set_result(model_pack)
+        except Exception as exc:
+            logger.error("batch_run_failed", item_id=item.item_id, error=str(exc))
+            future.set_exception(exc)
+
+    async def _seeded_pack(self, item: BatchItem, key: str) -> Optional["ModelPack"]:
+        future = self._specs.get(key)
+        if future is None:
+            future = self._specs[key] = asyncio.get_running_loop().create_future()
+            self._spec_leaders[key] = item.item_id
+            try:
+                async with self._semaphore:
+                    donor = await asyncio.to_thread(asyncio.run, prepare_shared_spec(item))
+            except Exception as exc:
+                logger.warning("batch_shared_spec_failed", item_id=item.item_id, error=str(exc))
+                donor = None
+            future.set_result(donor)
+        donor = await future
+        if donor is None:
+            return None
+        return seed_model_pack(donor, source=self._spec_leaders[key])
+
+
+async def _run_pipeline(
+    item: BatchItem,
+    graph_variant: Optional[str],
+    model_pack: Optional["ModelPack"],
+) -> "ModelPack":
+    from .__main__ import run_pipeline
+
+    return await run_pipeline(
+        item.problem_text,
+        target_interface=item.target_interface,
+        graph_variant=graph_variant,
+        model_pack=model_pack,
+    )
+
+
+async def prepare_shared_spec(item: BatchItem) -> Optional["ModelPack"]:
+    """Run only the specify/derive stages for ``item``; ``None`` if either produced nothing."""
+    from .agents.derive_math import derive_math
+    from .agents.specify_problem import specify_problem
+    from .llm import llm_caller, llm_client
+    from .schemas import ModelPack
+
+    model_pack = ModelPack()
+    model_pack.context["nl_problem"] = item.problem_text
+    trace_token = llm_client.begin_trace()
+    try:
+        with llm_caller("specify_problem"):
+            model_pack = await specify_problem(model_pack)
+        if model_pack.components_nl is not None:
+            with llm_caller("derive_math"):
+                model_pack = await derive_math(model_pack)
+    finally:
+        trace_payload = llm_client.end_trace(trace_token)
+    model_pack.tests["shared_spec_llm_summary"] = trace_payload["summary"]
+    if model_pack.components_nl is None or model_pack.components_math is None:
+        return None
+    return model_pack
+
+
+def seed_model_pack(donor: "ModelPack", *, source: str) -> "ModelPack":
+    """New pack carrying the donor's specify/derive artifacts, marked to skip those stages."""
+    from .schemas import ModelPack
+
+    if donor.components_nl is None or donor.components_math is None:
+        raise ValueError("shared spec donor is missing components_nl/components_math")
+    model_pack = ModelPack()
+    for name in _SHARED_CONTEXT_KEYS:
+        if name in donor.context:
+            model_pack.context[name] = donor.context[name]
+    model_pack.components_nl = donor.components_nl.model_copy(deep=True)
+    model_pack.components_math = donor.components_math.model_copy(deep=True)
+    model_pack.context["preseeded_stages"] = list(SHARED_SPEC_STAGES)
+    model_pack.context["preseeded_from"] = source
+    return model_pack
+
+
+def write_batch_outputs(results: List[BatchResult], output_dir: str | Path) -> Path:
+    root = Path(output_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    summary_path = root / "results.jsonl"
+    with summary_path.open("w", encoding="utf-8") as handle:
+        for result in results:
+            handle.write(json.dumps(result.summary(), default=str))
+            handle.write("\n")
+            if result.model_pack is not None:
+                (root / f"{result.item_id}.json").write_text(
+                    result.model_pack.model_dump_json(indent=2), encoding="utf-8"
+                )
+    return summary_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src batch",
+        description="Run a batch of problems with single-flight deduplication",
+    )
+    parser.add_argument("input", help="Directory of *.txt problems or a JSONL file")
+    parser.add_argument("-o", "--output", default="batch_output", help="Output directory")
+    parser.add_argument("--workers", type=int, default=2, help="Pipelines in flight")
+    parser.add_argument("--graph-variant", default=None, help="Graph variant or spec path")
+    parser.add_argument(
+        "--share-spec",
+        action="store_true",
+        help="Reuse specify_problem/derive_math artifacts across problems with the same NL "
+        "text but a different signature or data contract",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args(argv)
+
+    from .__main__ import configure_logging
+
+    configure_logging(args.verbose)
+
+    items = load_batch_items(args.input)
+    if not items:
+        print(f"Error: no problems found in {args.input}")
+        return 1
+
+    runner = BatchRunner(
+        workers=args.workers,
+        graph_variant=args.graph_variant,
+        share_spec=args.share_spec,
+    )
+    results = asyncio.run(runner.run(items))
+    summary_path = write_batch_outputs(results, args.output)
+
+    executed = sum(1 for result in results if result.dedup_of is None)
+    print(f"Problems: {len(results)}  pipeline runs: {executed}  coalesced: {len(results) - executed}")
+    print(f"Shared spec reuse: {sum(1 for result in results if result.shared_spec_from)}")
+    print(f"Results: {summary_path}")
+    return 0
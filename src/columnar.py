@@ -0,0 +1,356 @@
+# modelpack/columnar.py
+"""Columnar storage for indexed solutions and parameters.
+
+Indexed solver solutions (and, above a size threshold, indexed DataGen parameters) are
+kept as ``IndexedColumn``s instead of dicts of small Python objects. A column stores its
+keys as NumPy integer codes (one column per key component, each mapping to a short list of
+the distinct component values) and its values as one NumPy array. It is a mapping over the
+native keys, so ``lookup_solution_value``, Pyomo ``initialize=`` and generated checkers
+work unchanged, and ``str(index)`` keys still resolve: that string table is built on the
+first string access instead of being materialised per value. Native lookups go through a
+sorted array of combined key codes, so they need no per-key Python objects either.
+
+Copies share the key arrays and share the value array until one side writes
+(copy-on-write), so deep-copying a solution for a mutation costs one small object per
+column. Writing an existing key updates the value array; adding a key (rare) falls back to
+a plain key list. Unset float values are stored as NaN and read back as ``None``.
+
+``extract_solution`` reads every active variable of a model in one pass per component
+(``var.items()`` and the raw ``.value``, no expression evaluation); only variables above
+the same size threshold become columns. ``compact_mapping``
+converts a dict when its keys and values allow it. ``to_json`` gives the JSON form, with
+each column as ``{str(index): value}``.
+"""
+
+import math
+import os
+from collections.abc import Mapping, MutableMapping
+from numbers import Integral, Real
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MIN_ENTRIES = 50_000
+
+
+def columnar_min_entries() -> int:
+    """``COLUMNAR_MIN_ENTRIES``: size from which TestInstance data is compacted (0 = never)."""
+    raw_value = os.getenv("COLUMNAR_MIN_ENTRIES")
+    if not raw_value:
+        return DEFAULT_MIN_ENTRIES
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        return DEFAULT_MIN_ENTRIES
+
+
+_KeyLookup = Tuple[List[Dict[Any, int]], np.ndarray, np.ndarray, np.ndarray]
+
+
+class _KeyTable:
+    """Keys of uniform arity as per-component category codes plus a sorted lookup index."""
+
+    __slots__ = ("tuple_keys", "categories", "codes", "_category_index", "_lookup")
+
+    def __init__(self, tuple_keys: bool, categories: List[List[Any]], codes: np.ndarray) -> None:
+        self.tuple_keys = tuple_keys
+        self.categories = categories
+        self.codes = codes
+        self._category_index: Optional[List[Dict[Any, int]]] = None
+        # (category index, radix, sorted combined codes, row order), built on first lookup.
+        self._lookup: Optional[_KeyLookup] = None
+
+    @classmethod
+    def build(cls, keys: Sequence[Any]) -> Optional["_KeyTable"]:
+        """``None`` when the keys are not all tuples of one arity or all non-tuples."""
+        if not keys:
+            return None
+        tuple_keys = isinstance(keys[0], tuple)
+        arity = len(keys[0]) if tuple_keys else 1
+        if tuple_keys and arity == 0:
+            return None
+        category_index: List[Dict[Any, int]] = [{} for _ in range(arity)]
+        codes = np.empty((len(keys), arity), dtype=np.int64)
+        try:
+            for row, key in enumerate(keys):
+                parts = key if tuple_keys else (key,)
+                if isinstance(key, tuple) != tuple_keys or len(parts) != arity:
+                    return None
+                for component, part in enumerate(parts):
+                    codes[row, component] = category_index[component].setdefault(
+                        part,
+                        len(category_index[component]),
+                    )
+        except TypeError:
+            return None
+        total = 1
+        for index in category_index:
+            total *= max(1, len(index))
+        if total >= 2**62:
+            return None
+        table = cls(tuple_keys, [list(index) for index in category_index], codes)
+        table._category_index = category_index
+        return table
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def key_at(self, row: int) -> Any:
+        parts = tuple(
+            categories[code] for categories, code in zip(self.categories, self.codes[row].tolist())
+        )
+        return parts if self.tuple_keys else parts[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        categories = self.categories
+        for row in self.codes.tolist():
+            parts = tuple(values[code] for values, code in zip(categories, row))
+            yield parts if self.tuple_keys else parts[0]
+
+    def _prepare(self) -> "_KeyLookup":
+        if self._lookup is not None:
+            return self._lookup
+        category_index = self._category_index
+        if category_index is None:
+            category_index = [
+                {value: code for code, value in enumerate(categories)} for categories in self.categories
+            ]
+            self._category_index = category_index
+        radix = np.ones(len(self.categories), dtype=np.int64)
+        for component in range(len(self.categories) - 2, -1, -1):
+            radix[component] = radix[component + 1] * max(1, len(self.categories[component + 1]))
+        combined = self.codes @ radix
+        order = np.argsort(combined, kind="stable")
+        self._lookup = (category_index, radix, combined[order], order)
+        return self._lookup
+
+    def position(self, key: Any) -> Optional[int]:
+        category_index, radix, sorted_codes, order = self._prepare()
+        parts = key if self.tuple_keys else (key,)
+        if isinstance(key, tuple) != self.tuple_keys or len(parts) != len(self.categories):
+            return None
+        combined = 0
+        try:
+            for component, part in enumerate(parts):
+                code = category_index[component].get(part)
+                if code is None:
+                    return None
+                combined += code * int(radix[component])
+        except TypeError:
+            return None
+        slot = int(np.searchsorted(sorted_codes, combined))
+        if slot < len(sorted_codes) and int(sorted_codes[slot]) == combined:
+            return int(order[slot])
+        return None
+
+    def __getstate__(self) -> Tuple[bool, List[List[Any]], np.ndarray]:
+        return (self.tuple_keys, self.categories, self.codes)
+
+    def __setstate__(self, state: Tuple[bool, List[List[Any]], np.ndarray]) -> None:
+        self.tuple_keys, self.categories, self.codes = state
+        self._category_index = None
+        self._lookup = None
+
+
+def _values_array(values: Sequence[Any]) -> Optional[np.ndarray]:
+    """int64 for all-integer values, float64 (None as NaN) for numbers; ``None`` otherwise."""
+    all_integers = True
+    for value in values:
+        if isinstance(value, bool) or not (value is None or isinstance(value, Real)):
+            return None
+        if value is None or not isinstance(value, Integral):
+            all_integers = False
+    if all_integers and values:
+        try:
+            return np.asarray(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    return np.asarray([math.nan if value is None else value for value in values], dtype=np.float64)
+
+
+class IndexedColumn(MutableMapping):
+    """An indexed variable or parameter: key ``i`` of the key store has value ``values[i]``."""
+
+    __slots__ = ("_keys", "_values", "_shared", "_positions", "_text_positions")
+
+    def __init__(self, keys: Any, values: np.ndarray, shared: bool = False) -> None:
+        self._keys = keys  # _KeyTable, or a plain key list after keys were added/removed
+        self._values = values
+        self._shared = shared
+        self._positions: Optional[Dict[Any, int]] = None
+        self._text_positions: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_items(cls, keys: Sequence[Any], values: Sequence[Any]) -> Optional["IndexedColumn"]:
+        """A column for ``zip(keys, values)``; ``None`` if the values are not all numeric."""
+        array = _values_array(values)
+        if array is None:
+            return None
+        table = _KeyTable.build(keys)
+        return cls(table if table is not None else list(keys), array)
+
+    def _position(self, key: Any) -> Optional[int]:
+        if isinstance(self._keys, _KeyTable):
+            position = self._keys.position(key)
+        else:
+            if self._positions is None:
+                self._positions = {item: row for row, item in enumerate(self._keys)}
+            try:
+                position = self._positions.get(key)
+            except TypeError:
+                position = None
+        if position is None and isinstance(key, str):
+            if self._text_positions is None:
+                self._text_positions = {str(item): row for row, item in enumerate(self)}
+            position = self._text_positions.get(key)
+        return position
+
+    def _decode(self, value: Any) -> Any:
+        value = value.item()
+        return None if isinstance(value, float) and math.isnan(value) else value
+
+    def __getitem__(self, key: Any) -> Any:
+        position = self._position(key)
+        if position is None:
+            raise KeyError(key)
+        return self._decode(self._values[position])
+
+    def _writable_values(self, value: Any) -> np.ndarray:
+        values = self._values
+        if values.dtype.kind == "i" and not (isinstance(value, Integral) and not isinstance(value, bool)):
+            values = values.astype(np.float64)
+        elif self._shared:
+            values = values.copy()
+        self._values = values
+        self._shared = False
+        return values
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if isinstance(value, bool) or not (value is None or isinstance(value, Real)):
+            raise TypeError(f"IndexedColumn values must be numbers, not {type(value).__name__}")
+        position = self._position(key)
+        encoded: Any = math.nan if value is None else value
+        if position is not None:
+            self._writable_values(value)[position] = encoded
+            return
+        values = self._writable_values(value)
+        self._keys = list(self) + [key]
+        self._values = np.append(values, encoded)
+        self._positions = None
+        self._text_positions = None
+
+    def __delitem__(self, key: Any) -> None:
+        position = self._position(key)
+        if position is None:
+            raise KeyError(key)
+        keys = list(self)
+        del keys[position]
+        self._keys = keys
+        self._values = np.delete(self._values, position)
+        self._shared = False
+        self._positions = None
+        self._text_positions = None
+
+    def __contains__(self, key: Any) -> bool:
+        return self._position(key) is not None
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def items(self) -> Iterable[tuple]:  # type: ignore[override]
+        return list(zip(self, self.values()))
+
+    def values(self) -> List[Any]:  # type: ignore[override]
+        if self._values.dtype.kind == "f":
+            return [None if math.isnan(value) else value for value in self._values.tolist()]
+        values: List[Any] = self._values.tolist()
+        return values
+
+    def __copy__(self) -> "IndexedColumn":
+        # Key stores are never mutated in place, so they are always shared.
+        self._shared = True
+        return IndexedColumn(self._keys, self._values, shared=True)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "IndexedColumn":
+        return self.__copy__()
+
+    def __reduce__(self) -> Tuple[type, Tuple[Any, np.ndarray]]:
+        return (IndexedColumn, (self._keys, self._values))
+
+    def __repr__(self) -> str:
+        return f"IndexedColumn({len(self)} values, dtype={self._values.dtype})"
+
+    @property
+    def nbytes(self) -> int:
+        keys = self._keys.codes.nbytes if isinstance(self._keys, _KeyTable) else 0
+        return keys + self._values.nbytes
+
+    def as_dict(self) -> Dict[str, Any]:
+        """``{str(index): value}``, the JSON form."""
+        return {str(key): value for key, value in zip(self, self.values())}
+
+
+def compact_mapping(mapping: Any, min_entries: int = 0) -> Any:
+    """``mapping`` as an ``IndexedColumn`` when it has ``min_entries``+ numeric values."""
+    if isinstance(mapping, IndexedColumn) or not isinstance(mapping, Mapping):
+        return mapping
+    if not mapping or len(mapping) < max(1, min_entries):
+        return mapping
+    column = IndexedColumn.from_items(list(mapping.keys()), list(mapping.values()))
+    return column if column is not None else mapping
+
+
+def compact_values(container: Optional[Dict[str, Any]], min_entries: int) -> Optional[Dict[str, Any]]:
+    """Top-level copy of ``container`` with its large numeric mappings compacted."""
+    if not container or min_entries <= 0:
+        return container
+    return {name: compact_mapping(value, min_entries) for name, value in container.items()}
+
+
+def extract_solution(model: Any, min_entries: Optional[int] = None) -> Dict[str, Any]:
+    """``{var_name: IndexedColumn | dict | value}`` for every active variable of ``model``.
+
+    Indexed variables with at least ``min_entries`` (default ``COLUMNAR_MIN_ENTRIES``)
+    indices become columns; smaller ones stay dicts keyed by both the native index and
+    ``str(index)``.
+    """
+    import pyomo.environ as pyo
+
+    if min_entries is None:
+        min_entries = columnar_min_entries()
+    solution: Dict[str, Any] = {}
+    for var in model.component_objects(pyo.Var, active=True):
+        if var.is_indexed():
+            keys: List[Any] = []
+            values: List[Any] = []
+            for index, var_data in var.items():
+                keys.append(index)
+                values.append(var_data.value)
+            if min_entries <= 0 or len(keys) < min_entries:
+                entries: Dict[Any, Any] = {}
+                for index, value in zip(keys, values):
+                    entries[index] = value
+                    text_index = str(index)
+                    if text_index != index:
+                        entries[text_index] = value
+                solution[var.name] = entries
+                continue
+            table = _KeyTable.build(keys)
+            array = np.asarray(
+                [math.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+            solution[var.name] = IndexedColumn(table if table is not None else keys, array)
+        else:
+            solution[var.name] = var.value
+    return solution
+
+
+def to_json(container: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: value.as_dict() if isinstance(value, IndexedColumn) else value
+        for name, value in container.items()
+    }
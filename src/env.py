@@ -0,0 +1,35 @@
+# modelpack/env.py
+"""Typed readers for the optional ``*_SECONDS`` / ``*_MAX_*`` / on-off environment settings.
+
+Unset, blank or unparsable values fall back to the caller's default, so a bad setting never
+stops a run.
+"""
+
+import os
+from typing import Callable, TypeVar, Union
+
+_Number = TypeVar("_Number", int, float)
+_Default = TypeVar("_Default")
+
+
+def env_flag(name: str, default: bool) -> bool:
+    raw_value = os.getenv(name)
+    if raw_value is None or not raw_value.strip():
+        return default
+    return raw_value.strip().lower() not in {"0", "false", "no", "off"}
+
+
+def env_positive(
+    name: str,
+    default: _Default,
+    cast: Callable[[str], _Number],
+) -> Union[_Number, _Default]:
+    """``cast(os.environ[name])`` if it parses to a positive number, else ``default``."""
+    raw_value = os.getenv(name)
+    if not raw_value:
+        return default
+    try:
+        parsed_value = cast(raw_value)
+    except ValueError:
+        return default
+    return parsed_value if parsed_value > 0 else default
@@ -0,0 +1,239 @@
+# modelpack/http_pool.py
+"""Process-wide pooled HTTP sessions for LLM provider calls.
+
+litellm opens its provider connections through ``litellm.client_session`` when it is
+set. The pool installs one sync httpx client whose transport keeps a separate keep-alive
+connection pool per base URL origin, so every call and pipeline in the process reuses warm
+(HTTP/2 when available) connections instead of negotiating TLS per request.
+
+Only the sync client is pooled: agents call litellm synchronously, and an httpx async client
+is bound to the event loop it first runs on while each pipeline thread runs its own loop.
+``close_http_pool()`` closes the pooled connections at process shutdown.
+"""
+
+import importlib.util
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import structlog
+
+from .env import env_flag, env_positive
+
+logger = structlog.get_logger(__name__)
+
+Origin = Tuple[str, str, int]
+
+_NEW_CONNECTION_EVENT = "connection.connect_tcp.complete"
+
+
+@dataclass(frozen=True)
+class HTTPPoolConfig:
+    enabled: bool = True
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_seconds: float = 120.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> "HTTPPoolConfig":
+        defaults = cls()
+        return cls(
+            enabled=env_flag("LLM_HTTP_POOL", defaults.enabled),
+            max_connections=env_positive(
+                "LLM_HTTP_POOL_MAX_CONNECTIONS",
+                defaults.max_connections,
+                int,
+            ),
+            max_keepalive_connections=env_positive(
+                "LLM_HTTP_POOL_MAX_KEEPALIVE",
+                defaults.max_keepalive_connections,
+                int,
+            ),
+            keepalive_expiry_seconds=env_positive(
+                "LLM_HTTP_KEEPALIVE_SECONDS",
+                defaults.keepalive_expiry_seconds,
+                float,
+            ),
+            http2=env_flag("LLM_HTTP2", defaults.http2),
+        )
+
+
+class _OriginStats:
+    __slots__ = ("requests", "new_connections")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+
+
+def _origin(url: Any) -> Origin:
+    scheme = str(url.scheme)
+    port = url.port or (443 if scheme == "https" else 80)
+    return scheme, str(url.host), int(port)
+
+
+def _origin_label(origin: Origin) -> str:
+    scheme, host, port = origin
+    return f"{scheme}://{host}:{port}"
+
+
+class _PerOriginTransport(httpx.BaseTransport):
+    """Sync transport that dispatches each request to a per-origin connection pool."""
+
+    def __init__(self, pool: "HTTPSessionPool") -> None:
+        self._pool = pool
+        self._transports: Dict[Origin, httpx.HTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def _transport(self, origin: Origin) -> httpx.HTTPTransport:
+        with self._lock:
+            transport = self._transports.get(origin)
+            if transport is None:
+                transport = self._transports[origin] = httpx.HTTPTransport(
+                    http2=self._pool.http2,
+                    limits=self._pool.limits(),
+                )
+            return transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        origin = _origin(request.url)
+        stats = self._pool._count_request(origin)
+        upstream_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == _NEW_CONNECTION_EVENT:
+                self._pool._count_new_connection(stats)
+            if upstream_trace is not None:
+                upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        return self._transport(origin).handle_request(request)
+
+    def close(self) -> None:
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+        for transport in transports:
+            transport.close()
+
+
+class HTTPSessionPool:
+    """Own a long-lived sync httpx client with one connection pool per origin."""
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None) -> None:
+        self.config = config or HTTPPoolConfig.from_env()
+        self.http2 = self.config.http2 and importlib.util.find_spec("h2") is not None
+        if self.config.http2 and not self.http2:
+            logger.info("http_pool_http2_unavailable", reason="h2 package not installed")
+        self._lock = threading.Lock()
+        self._stats: Dict[Origin, _OriginStats] = {}
+        self._sync_session: Optional[httpx.Client] = None
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry_seconds,
+        )
+
+    def _origin_stats(self, origin: Origin) -> _OriginStats:
+        with self._lock:
+            stats = self._stats.get(origin)
+            if stats is None:
+                stats = self._stats[origin] = _OriginStats()
+            return stats
+
+    def _count_request(self, origin: Origin) -> _OriginStats:
+        stats = self._origin_stats(origin)
+        with self._lock:
+            stats.requests += 1
+        return stats
+
+    def _count_new_connection(self, stats: _OriginStats) -> None:
+        with self._lock:
+            stats.new_connections += 1
+
+    def sync_session(self) -> httpx.Client:
+        if self._sync_session is None:
+            with self._lock:
+                if self._sync_session is None:
+                    self._sync_session = httpx.Client(
+                        transport=_PerOriginTransport(self),
+                        follow_redirects=True,
+                    )
+        return self._sync_session
+
+    def install_litellm_sessions(self) -> bool:
+        """Point litellm at the pooled sessions unless the caller configured its own."""
+        import litellm
+
+        installed = False
+        if litellm.client_session is None:
+            litellm.client_session = self.sync_session()
+            installed = True
+        if installed:
+            logger.info(
+                "http_pool_installed",
+                http2=self.http2,
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+            )
+        return installed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            origins = {
+                _origin_label(origin): {
+                    "requests": stats.requests,
+                    "new_connections": stats.new_connections,
+                    "reused_connections": max(stats.requests - stats.new_connections, 0),
+                }
+                for origin, stats in self._stats.items()
+            }
+        requests = sum(item["requests"] for item in origins.values())
+        new_connections = sum(item["new_connections"] for item in origins.values())
+        reused = max(requests - new_connections, 0)
+        return {
+            "enabled": self.config.enabled,
+            "http2": self.http2,
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / requests, 4) if requests else None,
+            "origins": origins,
+        }
+
+    def close(self) -> None:
+        """Close the pooled connections and take the client back out of litellm."""
+        with self._lock:
+            sync_session = self._sync_session
+            self._sync_session = None
+        if sync_session is None:
+            return
+        litellm: Any = sys.modules.get("litellm")
+        if litellm is not None and litellm.client_session is sync_session:
+            litellm.client_session = None
+        sync_session.close()
+
+
+_HTTP_POOL: Optional[HTTPSessionPool] = None
+_HTTP_POOL_LOCK = threading.Lock()
+
+
+def get_http_pool() -> HTTPSessionPool:
+    """Return the process-wide pool, creating it from the environment on first use."""
+    global _HTTP_POOL
+    if _HTTP_POOL is None:
+        with _HTTP_POOL_LOCK:
+            if _HTTP_POOL is None:
+                _HTTP_POOL = HTTPSessionPool()
+    return _HTTP_POOL
+
+
+def close_http_pool() -> None:
+    """Close the process-wide pool's connections, if it was ever created."""
+    if _HTTP_POOL is not None:
+        _HTTP_POOL.close()
@@ -1,20 +1,22 @@
 # modelpack/llm.py
 import ast
-import json
-import inspect
 import os
+import threading
 import time
+from contextlib import contextmanager
 from contextvars import ContextVar, Token
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
 
-import instructor
 import structlog
 from dotenv import load_dotenv
-from litellm import completion as litellm_completion
-from pydantic import BaseModel
-from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+from pydantic import BaseModel, ValidationError
+from tenacity import Retrying, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+
+from .routing import ModelRoute, ModelRouter
+from .spans import current_span_id, monotonic_offset
+from .trace_store import TraceBlobStore, trace_inline_mode
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 load_dotenv(REPO_ROOT / ".env")
@@ -31,12 +33,56 @@ from config import (  # noqa: E402
 logger = structlog.get_logger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
-_ACTIVE_LLM_TRACE: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+OutputValidator = Callable[[str], Tuple[bool, List[str]]]
+
+
+class _TraceSession:
+    """Calls recorded for one run, plus the blob store when the trace is compact."""
+
+    __slots__ = ("calls", "blobs", "total_tokens", "lock")
+
+    def __init__(self, blobs: Optional[TraceBlobStore]) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.blobs = blobs
+        self.total_tokens = 0
+        # Parallel graph branches record into the same session from different threads.
+        self.lock = threading.Lock()
+
+
+_ACTIVE_LLM_TRACE: ContextVar[Optional[_TraceSession]] = ContextVar(
     "ACTIVE_LLM_TRACE",
     default=None,
 )
 
 
+_ACTIVE_LLM_CALLER: ContextVar[Optional[str]] = ContextVar(
+    "ACTIVE_LLM_CALLER",
+    default=None,
+)
+
+
+@contextmanager
+def llm_caller(label: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to ``label`` (e.g. an agent node name)."""
+    token = _ACTIVE_LLM_CALLER.set(label)
+    try:
+        yield
+    finally:
+        _ACTIVE_LLM_CALLER.reset(token)
+
+
+@contextmanager
+def llm_caller_mode(mode: str) -> Iterator[None]:
+    """Narrow the current caller to a sub-mode, e.g. ``build_model`` -> ``build_model.critique``."""
+    parent = _ACTIVE_LLM_CALLER.get()
+    with llm_caller(f"{parent}.{mode}" if parent else mode):
+        yield
+
+
+def current_llm_caller() -> str:
+    return _ACTIVE_LLM_CALLER.get() or "unknown"
+
+
 class NonRetryableLLMError(RuntimeError):
     """Raised for deterministic LLM response issues that retries will not fix."""
 
@@ -45,6 +91,25 @@ DEFAULT_MODEL = resolve_default_model()
 DEFAULT_LENGTH_RETRY_MAX_COMPLETION_TOKENS = 16384
 
 
+def litellm_completion(**kwargs: Any) -> Any:
+    """Call ``litellm.completion``, importing litellm on first use."""
+    from litellm import completion
+
+    return completion(**kwargs)
+
+
+def _is_schema_validation_error(exc: BaseException) -> bool:
+    """True for response-model validation failures (pydantic or instructor's retry wrapper)."""
+    current: Optional[BaseException] = exc
+    while current is not None:
+        if isinstance(current, ValidationError):
+            return True
+        if type(current).__name__ in {"InstructorRetryException", "ValidationError"}:
+            return True
+        current = current.__cause__
+    return False
+
+
 def _env_retry_attempts(default: int = 3) -> int:
     raw_value = os.getenv("LLM_CLIENT_MAX_ATTEMPTS")
     if not raw_value:
@@ -56,6 +121,15 @@ def _env_retry_attempts(default: int = 3) -> int:
     return parsed_value if parsed_value > 0 else default
 
 
+def _llm_retrying() -> Retrying:
+    """Backoff and attempt limit for one LLM call (``LLM_CLIENT_MAX_ATTEMPTS``)."""
+    return Retrying(
+        retry=retry_if_not_exception_type(NonRetryableLLMError),
+        stop=stop_after_attempt(_env_retry_attempts()),
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+    )
+
+
 def _env_optional_positive_int(name: str) -> Optional[int]:
     raw_value = os.getenv(name)
     if not raw_value:
@@ -82,6 +156,10 @@ class LLMClient:
         self.model_name = configured_model_name or DEFAULT_MODEL
         self.structured_model_name = os.getenv("STRUCTURED_MODEL_NAME") or self.model_name
         self.code_generation_model_name = os.getenv("CODE_MODEL_NAME") or self.model_name
+        self.router = ModelRouter.from_env(
+            structured_model=self.structured_model_name,
+            code_model=self.code_generation_model_name,
+        )
         self.base_url_override = base_url
         self.api_key_override = api_key
         self.max_completion_tokens = (
@@ -102,38 +180,72 @@ class LLMClient:
             except ValueError:
                 timeout_seconds = None
         self.timeout_seconds = timeout_seconds
+        self._instructor_client: Any = None
+        self._http_pool: Any = None
 
-        self.client = instructor.from_litellm(litellm_completion, mode=instructor.Mode.JSON)
+    @property
+    def client(self) -> Any:
+        """Instructor client, built on first structured call."""
+        if self._instructor_client is None:
+            import instructor
 
-    def begin_trace(self) -> Token:
-        return _ACTIVE_LLM_TRACE.set([])
+            self._instructor_client = instructor.from_litellm(
+                litellm_completion, mode=instructor.Mode.JSON
+            )
+        return self._instructor_client
+
+    @property
+    def http_pool(self) -> Any:
+        """Process-wide pooled HTTP sessions, installed into litellm on first request."""
+        if self._http_pool is None:
+            from .http_pool import get_http_pool
+
+            pool = get_http_pool()
+            if pool.config.enabled:
+                pool.install_litellm_sessions()
+            self._http_pool = pool
+        return self._http_pool
+
+    def resolve_route(self, call_type: str, caller: Optional[str] = None) -> ModelRoute:
+        """Model route for ``caller`` (default: the active LLM caller) and call type."""
+        return self.router.resolve(caller or current_llm_caller(), call_type)
+
+    def begin_trace(self, inline: Optional[bool] = None) -> Token:
+        """Start recording calls; long strings go to a blob store unless ``inline``."""
+        if inline is None:
+            inline = trace_inline_mode()
+        return _ACTIVE_LLM_TRACE.set(_TraceSession(None if inline else TraceBlobStore()))
 
     def end_trace(self, token: Token) -> Dict[str, Any]:
-        calls = list(_ACTIVE_LLM_TRACE.get() or [])
+        session = _ACTIVE_LLM_TRACE.get()
         _ACTIVE_LLM_TRACE.reset(token)
-        return {"calls": calls, "summary": self._summarize_calls(calls)}
+        calls = []
+        if session is not None:
+            with session.lock:
+                calls = list(session.calls)
+        blobs = session.blobs.as_dict() if session is not None and session.blobs else {}
+        summary = self._summarize_calls(calls)
+        summary["trace_blobs"] = len(blobs)
+        return {"calls": calls, "blobs": blobs, "summary": summary}
 
     def trace_length(self) -> int:
-        trace = _ACTIVE_LLM_TRACE.get()
-        return len(trace) if trace is not None else 0
-
-    def _detect_caller(self) -> str:
-        frame = inspect.currentframe()
-        fallback = "unknown"
-        try:
-            current = frame.f_back if frame is not None else None
-            while current is not None:
-                module_name = str(current.f_globals.get("__name__") or "")
-                function_name = current.f_code.co_name
-                label = f"{module_name}.{function_name}" if module_name else function_name
-                if ".agents." in module_name:
-                    return label
-                if module_name != __name__ and not module_name.startswith("tenacity"):
-                    fallback = label
-                current = current.f_back
-        finally:
-            del frame
-        return fallback
+        session = _ACTIVE_LLM_TRACE.get()
+        return len(session.calls) if session is not None else 0
+
+    def trace_calls_for_span(self, span_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Calls recorded in the active trace while ``span_id`` was the active span."""
+        session = _ACTIVE_LLM_TRACE.get()
+        if session is None or span_id is None:
+            return []
+        with session.lock:
+            return [call for call in session.calls if call.get("span_id") == span_id]
+
+    def trace_usage(self) -> Dict[str, int]:
+        """Calls and total tokens recorded so far in the active trace."""
+        session = _ACTIVE_LLM_TRACE.get()
+        if session is None:
+            return {"calls": 0, "total_tokens": 0}
+        return {"calls": len(session.calls), "total_tokens": session.total_tokens}
 
     def _usage_to_dict(self, usage_obj: Any) -> Optional[Dict[str, Any]]:
         if usage_obj is None:
@@ -282,19 +394,15 @@ class LLMClient:
         if isinstance(value, (list, tuple, set)):
             return [self._serialize_trace_value(item) for item in value]
 
-        model_dump_json = getattr(value, "model_dump_json", None)
-        if callable(model_dump_json):
-            try:
-                return json.loads(model_dump_json(indent=2))
-            except (TypeError, ValueError, json.JSONDecodeError):
-                pass
-
         model_dump = getattr(value, "model_dump", None)
         if callable(model_dump):
             try:
-                return self._serialize_trace_value(model_dump(mode="json"))
+                # Pydantic's JSON mode already yields plain JSON types; no second walk needed.
+                return model_dump(mode="json")
             except TypeError:
                 return self._serialize_trace_value(model_dump())
+            except ValueError:
+                pass
 
         dict_fn = getattr(value, "dict", None)
         if callable(dict_fn):
@@ -350,6 +458,7 @@ class LLMClient:
         error: Optional[str],
         temperature: float,
         model_name: Optional[str] = None,
+        escalated_from: Optional[str] = None,
         response_model: Optional[str] = None,
         system_prompt: Optional[str] = None,
         user_prompt: Optional[str] = None,
@@ -358,41 +467,56 @@ class LLMClient:
         extracted_output: Any = None,
         trace_input: Optional[Dict[str, Any]] = None,
     ) -> None:
-        trace = _ACTIVE_LLM_TRACE.get()
-        if trace is None:
+        session = _ACTIVE_LLM_TRACE.get()
+        if session is None:
             return
 
         usage_payload = self._extract_usage_payload(raw_response)
         normalized_usage = self._normalize_usage(usage_payload)
         finish_reason = self._extract_finish_reason(raw_response)
-        trace.append(
-            {
-                "sequence": len(trace) + 1,
-                "call_type": call_type,
-                "caller": self._detect_caller(),
-                "provider": self.provider,
-                "model_name": model_name or self.model_name,
-                "response_model": response_model,
-                "temperature": float(temperature),
-                "started_at": started_at.astimezone(timezone.utc).isoformat(),
-                "latency_seconds": round(latency_seconds, 6),
-                "success": success,
-                "error": error,
-                "finish_reason": finish_reason,
-                "input_tokens": normalized_usage["input_tokens"],
-                "output_tokens": normalized_usage["output_tokens"],
-                "total_tokens": normalized_usage["total_tokens"],
-                "usage": usage_payload,
-                "prompt": {
-                    "system": system_prompt,
-                    "user": user_prompt,
-                    "messages": self._serialize_trace_value(prompt_messages),
-                },
-                "raw_output_text": raw_output_text,
-                "extracted_output": self._serialize_trace_value(extracted_output),
-                "trace_input": self._serialize_trace_value(trace_input),
-            }
+        prompt: Dict[str, Any] = {
+            "system": system_prompt,
+            "user": user_prompt,
+            "messages": self._serialize_trace_value(prompt_messages),
+        }
+        extracted = self._serialize_trace_value(extracted_output)
+        serialized_trace_input = self._serialize_trace_value(trace_input)
+        blobs = session.blobs
+        if blobs is not None:
+            prompt = blobs.compact(prompt)
+            raw_output_text = blobs.ref(raw_output_text)
+            extracted = blobs.compact(extracted)
+            serialized_trace_input = blobs.compact(serialized_trace_input)
+        call_tokens = normalized_usage["total_tokens"] or (
+            (normalized_usage["input_tokens"] or 0) + (normalized_usage["output_tokens"] or 0)
         )
+        record = {
+            "call_type": call_type,
+            "caller": current_llm_caller(),
+            "span_id": current_span_id(),
+            "provider": self.provider,
+            "model_name": model_name or self.model_name,
+            "escalated_from": escalated_from,
+            "response_model": response_model,
+            "temperature": float(temperature),
+            "started_at": started_at.astimezone(timezone.utc).isoformat(),
+            "latency_seconds": round(latency_seconds, 6),
+            "end_offset_seconds": monotonic_offset(),
+            "success": success,
+            "error": error,
+            "finish_reason": finish_reason,
+            "input_tokens": normalized_usage["input_tokens"],
+            "output_tokens": normalized_usage["output_tokens"],
+            "total_tokens": normalized_usage["total_tokens"],
+            "usage": usage_payload,
+            "prompt": prompt,
+            "raw_output_text": raw_output_text,
+            "extracted_output": extracted,
+            "trace_input": serialized_trace_input,
+        }
+        with session.lock:
+            session.total_tokens += call_tokens
+            session.calls.append({"sequence": len(session.calls) + 1, **record})
 
     def _normalize_chat_messages(
         self,
@@ -428,6 +552,8 @@ class LLMClient:
         temperature: float,
         max_completion_tokens: Optional[int],
     ) -> Dict[str, Any]:
+        # Touching the pool installs the shared keep-alive sessions before the first request.
+        self.http_pool
         resolved_base_url = resolve_base_url(self.base_url_override, model=model_name)
         resolved_api_key = resolve_api_key(
             self.api_key_override,
@@ -468,6 +594,7 @@ class LLMClient:
             "calls_without_usage": 0,
             "structured_calls": 0,
             "code_generation_calls": 0,
+            "escalated_calls": 0,
             "input_tokens": 0,
             "output_tokens": 0,
             "total_tokens": 0,
@@ -484,6 +611,8 @@ class LLMClient:
                 summary["structured_calls"] += 1
             elif call.get("call_type") == "code_generation":
                 summary["code_generation_calls"] += 1
+            if call.get("escalated_from"):
+                summary["escalated_calls"] += 1
 
             latency_seconds = call.get("latency_seconds")
             if isinstance(latency_seconds, (int, float)):
@@ -507,13 +636,29 @@ class LLMClient:
                 summary["total_latency_seconds"] / len(calls),
                 6,
             )
+        summary["by_agent"] = self._summarize_by_agent(calls)
+        # Connection reuse is process-wide: counters cover every pipeline sharing the pool.
+        summary["http_pool"] = self._http_pool.stats() if self._http_pool is not None else None
         return summary
 
-    @retry(
-        retry=retry_if_not_exception_type(NonRetryableLLMError),
-        stop=stop_after_attempt(_env_retry_attempts()),
-        wait=wait_exponential(multiplier=1, min=2, max=60),
-    )
+    def _summarize_by_agent(self, calls: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Calls, tokens and latency per agent (the caller label before any ``.mode``)."""
+        by_agent: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            agent = str(call.get("caller") or "unknown").split(".", 1)[0]
+            entry = by_agent.setdefault(
+                agent,
+                {"calls": 0, "failed_calls": 0, "total_tokens": 0, "latency_seconds": 0.0},
+            )
+            entry["calls"] += 1
+            if not call.get("success"):
+                entry["failed_calls"] += 1
+            entry["total_tokens"] += self._safe_int(call.get("total_tokens")) or 0
+            latency_seconds = call.get("latency_seconds")
+            if isinstance(latency_seconds, (int, float)):
+                entry["latency_seconds"] = round(entry["latency_seconds"] + latency_seconds, 6)
+        return by_agent
+
     def structured_call(
         self,
         sys_prompt: str,
@@ -522,13 +667,67 @@ class LLMClient:
         temperature: float = 0.0,
         trace_input: Optional[Dict[str, Any]] = None,
     ) -> T:
-        """Generate structured output using any LLM provider."""
+        """Generate structured output using any LLM provider.
+
+        Failed attempts are retried; once the routed model's output fails schema validation
+        and the route names an ``escalate_to`` model, every later attempt uses that model.
+        """
+        route = self.resolve_route("structured")
+        model_name = route.model
+        escalated_from: Optional[str] = None
+
+        def attempt() -> T:
+            nonlocal model_name, escalated_from
+            try:
+                return self._structured_attempt(
+                    model_name=model_name,
+                    sys_prompt=sys_prompt,
+                    user_prompt=user_prompt,
+                    pyd_model=pyd_model,
+                    temperature=temperature,
+                    trace_input=trace_input,
+                    escalated_from=escalated_from,
+                )
+            except Exception as exc:
+                if escalated_from or not (route.escalate_to and _is_schema_validation_error(exc)):
+                    raise
+                logger.info(
+                    "llm_route_escalated",
+                    caller=current_llm_caller(),
+                    from_model=route.model,
+                    to_model=route.escalate_to,
+                    reason="schema_validation_failed",
+                )
+                model_name, escalated_from = route.escalate_to, route.model
+            return self._structured_attempt(
+                model_name=model_name,
+                sys_prompt=sys_prompt,
+                user_prompt=user_prompt,
+                pyd_model=pyd_model,
+                temperature=temperature,
+                trace_input=trace_input,
+                escalated_from=escalated_from,
+            )
+
+        return _llm_retrying()(attempt)
+
+    def _structured_attempt(
+        self,
+        *,
+        model_name: str,
+        sys_prompt: str,
+        user_prompt: str,
+        pyd_model: Type[T],
+        temperature: float,
+        trace_input: Optional[Dict[str, Any]],
+        escalated_from: Optional[str] = None,
+    ) -> T:
         started_at = datetime.now(timezone.utc)
         started_perf = time.perf_counter()
         result: Optional[T] = None
         try:
             request_kwargs = self._build_completion_kwargs(
-                model_name=self.structured_model_name,
+                model_name=model_name,
                 messages=[
                     {"role": "system", "content": sys_prompt},
                     {"role": "user", "content": user_prompt},
@@ -547,7 +746,8 @@ class LLMClient:
                 success=True,
                 error=None,
                 temperature=temperature,
-                model_name=self.structured_model_name,
+                model_name=model_name,
+                escalated_from=escalated_from,
                 response_model=getattr(pyd_model, "__name__", str(pyd_model)),
                 system_prompt=sys_prompt,
                 user_prompt=user_prompt,
@@ -567,7 +767,8 @@ class LLMClient:
                 success=False,
                 error=str(e),
                 temperature=temperature,
-                model_name=self.structured_model_name,
+                model_name=model_name,
+                escalated_from=escalated_from,
                 response_model=getattr(pyd_model, "__name__", str(pyd_model)),
                 system_prompt=sys_prompt,
                 user_prompt=user_prompt,
@@ -580,11 +781,6 @@ class LLMClient:
             logger.error("structured_call_error", provider=self.provider, error=str(e))
             raise
 
-    @retry(
-        retry=retry_if_not_exception_type(NonRetryableLLMError),
-        stop=stop_after_attempt(_env_retry_attempts()),
-        wait=wait_exponential(multiplier=1, min=2, max=60),
-    )
     def code_generation_call(
         self,
         sys_prompt: Optional[str] = None,
@@ -593,12 +789,14 @@ class LLMClient:
         validate: bool = True,
         messages: Optional[List[Dict[str, Any]]] = None,
         trace_input: Optional[Dict[str, Any]] = None,
+        output_validator: Optional[OutputValidator] = None,
     ) -> str:
-        """Generate code with optional validation."""
-        started_at = datetime.now(timezone.utc)
-        started_perf = time.perf_counter()
-        response: Any = None
-        raw_output_text: Optional[str] = None
+        """Generate code with optional validation.
+
+        When the caller's route names an ``escalate_to`` model and ``output_validator``
+        rejects the routed model's code, the request is repeated once on the stronger model.
+        Failed attempts are retried, on the stronger model once the call has escalated.
+        """
         request_messages = self._normalize_chat_messages(
             sys_prompt=sys_prompt,
             user_prompt=user_prompt,
@@ -609,9 +807,73 @@ class LLMClient:
         if messages is None:
             request_system_prompt = str(sys_prompt or "")
             request_user_prompt = str(user_prompt or "")
+        attempt_kwargs: Dict[str, Any] = {
+            "request_messages": request_messages,
+            "request_system_prompt": request_system_prompt,
+            "request_user_prompt": request_user_prompt,
+            "temperature": temperature,
+            "validate": validate,
+            "trace_input": trace_input,
+        }
+
+        route = self.resolve_route("code_generation")
+        model_name = route.model
+        escalated_from: Optional[str] = None
+
+        def attempt() -> str:
+            nonlocal model_name, escalated_from
+            try:
+                code = self._code_generation_attempt(
+                    model_name=model_name,
+                    escalated_from=escalated_from,
+                    **attempt_kwargs,
+                )
+            except Exception as exc:
+                if escalated_from or not (route.escalate_to and isinstance(exc, SyntaxError)):
+                    raise
+                reason = "syntax_error"
+            else:
+                if escalated_from or not (route.escalate_to and output_validator is not None):
+                    return code
+                valid, diagnostics = output_validator(code)
+                if valid:
+                    return code
+                reason = f"output_validation_failed: {', '.join(diagnostics[:5])}"
+            logger.info(
+                "llm_route_escalated",
+                caller=current_llm_caller(),
+                from_model=route.model,
+                to_model=route.escalate_to,
+                reason=reason,
+            )
+            model_name, escalated_from = route.escalate_to, route.model
+            return self._code_generation_attempt(
+                model_name=model_name,
+                escalated_from=escalated_from,
+                **attempt_kwargs,
+            )
+
+        return _llm_retrying()(attempt)
+
+    def _code_generation_attempt(
+        self,
+        *,
+        model_name: str,
+        request_messages: List[Dict[str, Any]],
+        request_system_prompt: Optional[str],
+        request_user_prompt: Optional[str],
+        temperature: float,
+        validate: bool,
+        trace_input: Optional[Dict[str, Any]],
+        escalated_from: Optional[str] = None,
+    ) -> str:
+        started_at = datetime.now(timezone.utc)
+        started_perf = time.perf_counter()
+        response: Any = None
+        raw_output_text: Optional[str] = None
         try:
             request_kwargs = self._build_completion_kwargs(
-                model_name=self.code_generation_model_name,
+                model_name=model_name,
                 messages=request_messages,
                 temperature=temperature,
                 max_completion_tokens=(
@@ -651,7 +913,8 @@ class LLMClient:
                 success=True,
                 error=None,
                 temperature=temperature,
-                model_name=self.code_generation_model_name,
+                model_name=model_name,
+                escalated_from=escalated_from,
                 system_prompt=request_system_prompt,
                 user_prompt=request_user_prompt,
                 prompt_messages=request_messages,
@@ -670,7 +933,8 @@ class LLMClient:
                 success=False,
                 error=str(e),
                 temperature=temperature,
-                model_name=self.code_generation_model_name,
+                model_name=model_name,
+                escalated_from=escalated_from,
                 system_prompt=request_system_prompt,
                 user_prompt=request_user_prompt,
                 prompt_messages=request_messages,
@@ -730,5 +994,53 @@ class LLMClient:
         return "\n".join(fixed_lines)
 
 
+_ACTIVE_LLM_CLIENT: ContextVar[Optional[LLMClient]] = ContextVar(
+    "ACTIVE_LLM_CLIENT",
+    default=None,
+)
+
+
+@contextmanager
+def use_llm_client(client: Optional[LLMClient]) -> Iterator[None]:
+    """Route ``llm_client`` to ``client`` inside the block (``None`` keeps the default)."""
+    if client is None:
+        yield
+        return
+    token = _ACTIVE_LLM_CLIENT.set(client)
+    try:
+        yield
+    finally:
+        _ACTIVE_LLM_CLIENT.reset(token)
+
+
+class _LazyLLMClient:
+    """Proxy for the active LLMClient.
+
+    Resolves to the client bound with ``use_llm_client`` (e.g. a run's ``PipelineContext``),
+    otherwise to the process-wide default constructed on first attribute access.
+    """
+
+    def __init__(self) -> None:
+        self._instance: Optional[LLMClient] = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> LLMClient:
+        active = _ACTIVE_LLM_CLIENT.get()
+        if active is not None:
+            return active
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = LLMClient()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self._instance is not None else "uninitialized"
+        return f"<lazy LLMClient ({state})>"
+
+
 # Global client
-llm_client = LLMClient()
+llm_client = _LazyLLMClient()
@@ -1,4 +1,12 @@
 # modelpack/orchestration/__init__.py
-from .graph import create_app, create_graph
+from .context import PipelineContext, current_pipeline_context
+from .graph import clear_app_cache, create_app, create_graph, get_app
 
-__all__ = ["create_app", "create_graph"]
+__all__ = [
+    "PipelineContext",
+    "clear_app_cache",
+    "create_app",
+    "create_graph",
+    "current_pipeline_context",
+    "get_app",
+]
@@ -0,0 +1,107 @@
+# modelpack/orchestration/budget.py
+"""Per-run wall-clock, LLM token and LLM call budgets.
+
+A ``RunBudgetTracker`` is activated around one pipeline invocation. ``_run_agent`` checks it
+before each node and the routers check it before following a feedback loop, so an exhausted
+run ends at the next stage boundary with the artifacts produced so far. An LLM call already
+in flight is never interrupted, so a run can overshoot a limit by at most one stage.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..env import env_positive
+from ..llm import llm_client
+
+BUDGET_EXHAUSTED_STATUS = "budget_exhausted"
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    max_seconds: Optional[float] = None
+    max_llm_tokens: Optional[int] = None
+    max_llm_calls: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "RunBudget":
+        return cls(
+            max_seconds=env_positive("RUN_MAX_SECONDS", None, float),
+            max_llm_tokens=env_positive("RUN_MAX_LLM_TOKENS", None, int),
+            max_llm_calls=env_positive("RUN_MAX_LLM_CALLS", None, int),
+        )
+
+    @property
+    def bounded(self) -> bool:
+        return any(value is not None for value in asdict(self).values())
+
+
+class RunBudgetTracker:
+    """Measure one run against its ``RunBudget`` (LLM usage comes from the active trace)."""
+
+    def __init__(self, budget: RunBudget) -> None:
+        self.budget = budget
+        self.started = time.monotonic()
+        self.exhausted_reason: Optional[str] = None
+        self.skipped_nodes: List[str] = []
+
+    def usage(self) -> Dict[str, Any]:
+        llm_usage = llm_client.trace_usage()
+        return {
+            "elapsed_seconds": round(time.monotonic() - self.started, 3),
+            "llm_calls": llm_usage["calls"],
+            "llm_tokens": llm_usage["total_tokens"],
+        }
+
+    def check(self) -> Optional[str]:
+        """Return the exhausted limit (sticky once hit), or ``None`` while within budget."""
+        if self.exhausted_reason is not None:
+            return self.exhausted_reason
+        usage = self.usage()
+        budget = self.budget
+        if budget.max_seconds is not None and usage["elapsed_seconds"] >= budget.max_seconds:
+            self.exhausted_reason = "max_seconds"
+        elif budget.max_llm_tokens is not None and usage["llm_tokens"] >= budget.max_llm_tokens:
+            self.exhausted_reason = "max_llm_tokens"
+        elif budget.max_llm_calls is not None and usage["llm_calls"] >= budget.max_llm_calls:
+            self.exhausted_reason = "max_llm_calls"
+        return self.exhausted_reason
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limits": asdict(self.budget),
+            "usage": self.usage(),
+            "exhausted": self.exhausted_reason is not None,
+            "exhausted_reason": self.exhausted_reason,
+            "skipped_nodes": list(self.skipped_nodes),
+        }
+
+
+_ACTIVE_RUN_BUDGET: ContextVar[Optional[RunBudgetTracker]] = ContextVar(
+    "ACTIVE_RUN_BUDGET",
+    default=None,
+)
+
+
+@contextmanager
+def run_budget(budget: Optional[RunBudget] = None) -> Iterator[Optional[RunBudgetTracker]]:
+    """Track ``budget`` (default: ``RUN_MAX_*`` env vars) for the enclosed run.
+
+    Yields ``None`` and tracks nothing when no limit is set.
+    """
+    budget = budget if budget is not None else RunBudget.from_env()
+    if not budget.bounded:
+        yield None
+        return
+    tracker = RunBudgetTracker(budget)
+    token = _ACTIVE_RUN_BUDGET.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _ACTIVE_RUN_BUDGET.reset(token)
+
+
+def current_run_budget() -> Optional[RunBudgetTracker]:
+    return _ACTIVE_RUN_BUDGET.get()
@@ -0,0 +1,107 @@
+# modelpack/orchestration/context.py
+"""Per-run state for pipelines that share one process.
+
+A ``PipelineContext`` carries everything a run must not share with concurrent runs: the
+LLM client (and so its model routing), the LLM trace, the run budget, the executor agent
+threads run on, and named cache handles. ``run_pipeline`` activates it around the graph
+invocation and also passes it in the LangGraph config under
+``configurable["pipeline_context"]``; agents and helpers reach it with
+``current_pipeline_context()``, which follows the run into agent threads because
+``asyncio.to_thread``/``run_in_thread`` copy the context.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import uuid
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+from ..llm import LLMClient, llm_client, use_llm_client
+from ..spans import recording_spans, span
+from .budget import RunBudget, RunBudgetTracker, run_budget
+
+T = TypeVar("T")
+
+CONFIG_KEY = "pipeline_context"
+
+
+@dataclass
+class PipelineContext:
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    client: Optional[LLMClient] = None
+    budget: Optional[RunBudget] = None
+    executor: Optional[Executor] = None
+    caches: Dict[str, Any] = field(default_factory=dict)
+    budget_tracker: Optional[RunBudgetTracker] = field(default=None, init=False)
+    trace_payload: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    spans: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False)
+    _cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def cache(self, name: str, factory: Callable[[], T]) -> T:
+        """The run-scoped cache ``name``, created with ``factory`` on first use."""
+        with self._cache_lock:
+            if name not in self.caches:
+                self.caches[name] = factory()
+            cached: T = self.caches[name]
+            return cached
+
+    @contextmanager
+    def bind(self) -> Iterator["PipelineContext"]:
+        """Make this the current context and route ``llm_client`` to its client."""
+        context_token = _ACTIVE_PIPELINE_CONTEXT.set(self)
+        try:
+            with use_llm_client(self.client):
+                yield self
+        finally:
+            _ACTIVE_PIPELINE_CONTEXT.reset(context_token)
+
+    @contextmanager
+    def activate(self) -> Iterator["PipelineContext"]:
+        """``bind`` plus a fresh LLM trace, the run budget and a root span for the run.
+
+        The finished trace is left in ``trace_payload`` and the node spans in ``spans``.
+        """
+        with self.bind(), recording_spans() as recorder:
+            trace_token = llm_client.begin_trace()
+            try:
+                with span("run", "run", run_id=self.run_id), run_budget(self.budget) as tracker:
+                    self.budget_tracker = tracker
+                    yield self
+            finally:
+                self.trace_payload = llm_client.end_trace(trace_token)
+                self.spans = recorder.as_list()
+
+    def as_config(self) -> Dict[str, Any]:
+        return {"configurable": {CONFIG_KEY: self}}
+
+    def run_in_thread(self, coro: Coroutine[Any, Any, T]) -> "asyncio.Future[T]":
+        """Run ``coro`` on its own event loop in a worker thread, keeping the context."""
+        if self.executor is None:
+            return asyncio.ensure_future(asyncio.to_thread(asyncio.run, coro))
+        loop = asyncio.get_running_loop()
+        run = functools.partial(contextvars.copy_context().run, asyncio.run, coro)
+        return loop.run_in_executor(self.executor, run)
+
+
+_ACTIVE_PIPELINE_CONTEXT: ContextVar[Optional[PipelineContext]] = ContextVar(
+    "ACTIVE_PIPELINE_CONTEXT",
+    default=None,
+)
+
+
+def current_pipeline_context() -> Optional[PipelineContext]:
+    return _ACTIVE_PIPELINE_CONTEXT.get()
+
+
+def pipeline_context_from_config(
+    config: Optional[Mapping[str, Any]],
+) -> Optional[PipelineContext]:
+    """The context passed in a LangGraph config, else the active one."""
+    configurable = (config or {}).get("configurable") or {}
+    context = configurable.get(CONFIG_KEY)
+    return context if isinstance(context, PipelineContext) else current_pipeline_context()
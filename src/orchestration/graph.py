@@ -1,67 +1,78 @@
 # modelpack/orchestration/graph.py
-from collections.abc import Awaitable, Callable
+import asyncio
+import importlib
+import threading
+from collections.abc import Awaitable, Callable, Coroutine
 from dataclasses import dataclass
-from typing import TypedDict
+from contextlib import nullcontext
+from typing import Any, List, Optional, Tuple, TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 
-from ..agents import (
-    audit_model,
-    build_model,
-    check_solution,
-    derive_math,
-    generate_data,
-    judge_solution,
-    screen_data,
-    solve_model,
-    specify_problem,
+from ..llm import llm_caller, llm_client
+from ..schemas import CodePack, ModelPack
+from ..spans import current_span, monotonic_offset, span
+from .budget import BUDGET_EXHAUSTED_STATUS, RunBudgetTracker, current_run_budget
+from .context import PipelineContext, current_pipeline_context, pipeline_context_from_config
+from .graph_spec import (
+    END_TARGET,
+    GraphSpec,
+    NodeSpec,
+    ParallelSpec,
+    available_graph_variants,
+    load_graph_spec,
 )
-from ..llm import llm_client
-from ..schemas import ModelPack
+from .memo import stage_memo_for
 
 MAIN_FULL_GRAPH_VARIANT = "main"
-SUPPORTED_GRAPH_VARIANTS = {
-    MAIN_FULL_GRAPH_VARIANT,
-}
+SUPPORTED_GRAPH_VARIANTS = set(available_graph_variants())
 
-END_NODE = "END"
+END_NODE = END_TARGET
 
 
 @dataclass(frozen=True)
 class AgentSpec:
     key: str
     node_name: str
-    handler: Callable[[ModelPack], Awaitable[ModelPack]]
+    handler_path: str
     feedback_target: str | None = None
 
+    @property
+    def handler(self) -> Callable[[ModelPack], Awaitable[ModelPack]]:
+        """Resolve ``module.function`` under ``src.agents``, importing the agent on first use."""
+        module_name, _, function_name = self.handler_path.rpartition(".")
+        module = importlib.import_module(f"..agents.{module_name}", __package__)
+        return getattr(module, function_name)
+
 
 AGENT_SPECS = (
     AgentSpec(
         "specify",
         "specify_problem",
-        specify_problem.specify_problem,
+        "specify_problem.specify_problem",
     ),
-    AgentSpec("math", "derive_math", derive_math.derive_math),
+    AgentSpec("math", "derive_math", "derive_math.derive_math"),
     AgentSpec(
         "model",
         "build_model",
-        build_model.build_model,
+        "build_model.build_model",
         feedback_target="build_model",
     ),
-    AgentSpec("audit", "audit_model", audit_model.audit_model),
-    AgentSpec("data", "generate_data", generate_data.generate_data),
-    AgentSpec("screen", "screen_data", screen_data.screen_data),
-    AgentSpec("solve", "solve_model", solve_model.solve_model),
+    AgentSpec("audit", "audit_model", "audit_model.audit_model"),
+    AgentSpec("data", "generate_data", "generate_data.generate_data"),
+    AgentSpec("screen", "screen_data", "screen_data.screen_data"),
+    AgentSpec("solve", "solve_model", "solve_model.solve_model"),
     AgentSpec(
         "check",
         "check_solution",
-        check_solution.check_solution,
+        "check_solution.check_solution",
         feedback_target="check_solution",
     ),
     AgentSpec(
         "judge",
         "judge_solution",
-        judge_solution.judge_solution,
+        "judge_solution.judge_solution",
     ),
 )
 
@@ -96,14 +107,32 @@ def _feedback_summary(feedback: object) -> dict[str, object] | None:
     return {"value": str(feedback)}
 
 
+# Parallel branches append from worker threads.
+_TRAJECTORY_LOCK = threading.Lock()
+
+
 def _append_trajectory_event(model_pack: ModelPack, **event: object) -> None:
-    trajectory = model_pack.tests.setdefault("trajectory", [])
-    if not isinstance(trajectory, list):
-        trajectory = []
-        model_pack.tests["trajectory"] = trajectory
-    entry = {"sequence": len(trajectory) + 1}
+    # ``sequence`` is the append order; ``span_id``/``parent_span_id`` say which node (and
+    # which parallel branch) emitted the event, and ``t`` when, so interleaved branches
+    # can still be read per agent.
+    active_span = current_span()
+    entry: dict = {
+        "span_id": active_span.span_id if active_span is not None else None,
+        "parent_span_id": active_span.parent_id if active_span is not None else None,
+        "t": monotonic_offset(),
+    }
     entry.update(event)
-    trajectory.append(entry)
+    with _TRAJECTORY_LOCK:
+        trajectory = model_pack.tests.setdefault("trajectory", [])
+        if not isinstance(trajectory, list):
+            trajectory = []
+            model_pack.tests["trajectory"] = trajectory
+        trajectory.append({"sequence": len(trajectory) + 1, **entry})
+
+
+def _mark_budget_exhausted(model_pack: ModelPack, tracker: RunBudgetTracker) -> None:
+    model_pack.status = BUDGET_EXHAUSTED_STATUS
+    model_pack.tests["budget"] = tracker.snapshot()
 
 
 async def _run_agent(
@@ -111,18 +140,89 @@ async def _run_agent(
     *,
     label: str,
     handler,
+    context: Optional[PipelineContext] = None,
 ) -> GraphState:
-    before = llm_client.trace_length()
-    model_pack = await handler(state["model_pack"])
-    after = llm_client.trace_length()
-    llm_sequences = list(range(before + 1, after + 1))
-    _append_trajectory_event(
-        model_pack,
-        type="agent",
-        agent=label,
-        llm_call_sequences=llm_sequences,
-        status=model_pack.status,
-    )
+    with context.bind() if context is not None else nullcontext():
+        with span(label, "agent") as agent_span:
+            return await _run_agent_in_context(
+                state,
+                label=label,
+                handler=handler,
+                span_id=agent_span.span_id,
+            )
+
+
+async def _run_agent_in_context(
+    state: GraphState,
+    *,
+    label: str,
+    handler: Callable[[ModelPack], Awaitable[ModelPack]],
+    span_id: str,
+) -> GraphState:
+    tracker = current_run_budget()
+    if tracker is not None and tracker.check():
+        # Nodes on a fixed edge still run after the budget is spent; skip them so the run
+        # reaches END with the artifacts it already has.
+        model_pack = state["model_pack"]
+        tracker.skipped_nodes.append(label)
+        _mark_budget_exhausted(model_pack, tracker)
+        _append_trajectory_event(
+            model_pack,
+            type="agent_skipped",
+            agent=label,
+            reason=BUDGET_EXHAUSTED_STATUS,
+            budget=tracker.exhausted_reason,
+        )
+        return state
+
+    model_pack = state["model_pack"]
+    preseeded = model_pack.context.get("preseeded_stages")
+    if isinstance(preseeded, list) and label in preseeded:
+        # Artifacts were reused from another run; consumed once so a later loop back to
+        # this stage (e.g. derive_math after a failed build) recomputes it.
+        preseeded.remove(label)
+        _append_trajectory_event(
+            model_pack,
+            type="agent_reused",
+            agent=label,
+            source=model_pack.context.get("preseeded_from"),
+        )
+        return state
+
+    memo = stage_memo_for(label, context=current_pipeline_context())
+    memoized = False
+    if memo is not None:
+        memo_key = memo.key(model_pack)
+        memo_paths = memo.spec.writes(model_pack)
+        memoized = memo.restore(model_pack, memo_key)
+
+    if not memoized:
+        with llm_caller(label):
+            model_pack = await handler(model_pack)
+    # Calls are attributed by span, not by trace position: a parallel branch's calls can
+    # land between this agent's.
+    llm_calls = llm_client.trace_calls_for_span(span_id)
+    llm_sequences = [call["sequence"] for call in llm_calls]
+    if memo is not None and not memoized:
+        memo.record(memo_paths, model_pack, memo_key, llm_calls)
+    if tracker is not None:
+        model_pack.tests["budget"] = tracker.snapshot()
+    if memoized:
+        _append_trajectory_event(
+            model_pack,
+            type="agent_memoized",
+            agent=label,
+            memo_key=memo_key,
+            status=model_pack.status,
+        )
+    else:
+        _append_trajectory_event(
+            model_pack,
+            type="agent",
+            agent=label,
+            llm_call_sequences=llm_sequences,
+            status=model_pack.status,
+        )
     if label == _node("model"):
         paired_outputs = model_pack.tests.setdefault("paired_outputs", {})
         if isinstance(paired_outputs, dict) and "generation" not in paired_outputs:
@@ -132,7 +232,7 @@ async def _run_agent(
             paired_outputs["generation"] = {
                 "candidate_source": source or None,
                 "generation_error": build_error,
-                "llm_trace_end_sequence": after,
+                "llm_trace_end_sequence": max(llm_sequences, default=llm_client.trace_length()),
             }
     state["model_pack"] = model_pack
     return state
@@ -151,16 +251,221 @@ def _node_for_feedback_target(target_agent: str | None) -> str | None:
     return spec.node_name if spec else None
 
 
-def _make_runner(label: str) -> Callable[[GraphState], Awaitable[GraphState]]:
-    handler = AGENTS_BY_NODE[label].handler
+# A graph node: ``(state, config) -> state``, as LangGraph calls it.
+_Runner = Callable[[GraphState, Optional[RunnableConfig]], Coroutine[Any, Any, GraphState]]
+
+
+def _make_runner(label: str) -> _Runner:
+    spec = AGENTS_BY_NODE[label]
 
-    async def run(state: GraphState) -> GraphState:
-        return await _run_agent(state, label=label, handler=handler)
+    async def run(state: GraphState, config: Optional[RunnableConfig] = None) -> GraphState:
+        return await _run_agent(
+            state,
+            label=label,
+            handler=spec.handler,
+            context=pipeline_context_from_config(config),
+        )
 
     return run
 
 
-RUNNERS = {label: _make_runner(label) for label in AGENTS_BY_NODE}
+def _run_in_thread(
+    coro: Coroutine[Any, Any, GraphState],
+    config: Optional[RunnableConfig] = None,
+) -> Awaitable[GraphState]:
+    # Agents make blocking LLM and solver calls; a private event loop keeps them off the
+    # graph's loop. The thread gets a copy of the context, so trace, caller and budget
+    # carry over; a pipeline context supplies the executor.
+    context = pipeline_context_from_config(config)
+    if context is not None:
+        return context.run_in_thread(coro)
+    return asyncio.to_thread(asyncio.run, coro)
+
+
+def _with_timeout(
+    name: str,
+    timeout_seconds: float,
+    run: _Runner,
+) -> _Runner:
+    """Run ``run`` on a deep copy of the pack; on timeout keep the pre-node pack.
+
+    The timed-out thread cannot be interrupted, so it only ever touches the copy.
+    """
+
+    async def run_with_timeout(
+        state: GraphState,
+        config: Optional[RunnableConfig] = None,
+    ) -> GraphState:
+        model_pack = state["model_pack"]
+        work_state: GraphState = {"model_pack": model_pack.model_copy(deep=True)}
+        try:
+            return await asyncio.wait_for(
+                _run_in_thread(run(work_state, config), config),
+                timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            timeouts = model_pack.tests.setdefault("node_timeouts", [])
+            timeouts.append({"node": name, "timeout_seconds": timeout_seconds})
+            _append_trajectory_event(
+                model_pack,
+                type="agent_timeout",
+                agent=name,
+                timeout_seconds=timeout_seconds,
+            )
+            if name == _node("model"):
+                model_pack.tests["build_model_error"] = f"build_model timed out after {timeout_seconds}s"
+            return {"model_pack": model_pack}
+
+    return run_with_timeout
+
+
+def _node_runner(node: NodeSpec) -> _Runner:
+    run = _make_runner(node.name)
+    if node.timeout_seconds is None:
+        return run
+    return _with_timeout(node.name, node.timeout_seconds, run)
+
+
+_MISSING = object()
+# Fields merged key by key (and one level further for dict values such as retry_counts),
+# so branches touching different keys of the same field do not overwrite each other.
+_BRANCH_MERGE_DEPTH = 2
+
+
+def _same_value(before: object, after: object) -> bool:
+    if before is after:
+        return True
+    try:
+        return bool(before == after)
+    except ValueError:
+        # Column-backed instances hold arrays, whose ``==`` has no single truth value.
+        return False
+
+
+def _branch_changes(
+    before: object,
+    after: object,
+    prefix: Tuple[str, ...] = (),
+) -> List[Tuple[Tuple[str, ...], Any]]:
+    """The ``(path, value)`` pairs a branch changed relative to the pack it was copied from."""
+    before_items = dict(before) if isinstance(before, (ModelPack, CodePack)) else before
+    after_items = dict(after) if isinstance(after, (ModelPack, CodePack)) else after
+    changes: List[Tuple[Tuple[str, ...], Any]] = []
+    for key in [*before_items, *(key for key in after_items if key not in before_items)]:
+        old = before_items.get(key, _MISSING)
+        new = after_items.get(key, _MISSING)
+        if _same_value(old, new):
+            continue
+        path = (*prefix, key)
+        if (
+            len(prefix) < _BRANCH_MERGE_DEPTH
+            and isinstance(old, (dict, CodePack))
+            and isinstance(new, type(old))
+        ):
+            changes.extend(_branch_changes(old, new, path))
+        else:
+            changes.append((path, new))
+    return changes
+
+
+def _set_path(model_pack: ModelPack, path: Tuple[str, ...], value: Any) -> None:
+    target: Any = model_pack
+    for key in path[:-1]:
+        target = target[key] if isinstance(target, dict) else getattr(target, key)
+    leaf = path[-1]
+    if isinstance(target, dict):
+        if value is _MISSING:
+            target.pop(leaf, None)
+        else:
+            target[leaf] = value
+    elif value is _MISSING:
+        delattr(target, leaf)
+    else:
+        setattr(target, leaf, value)
+
+
+def _merge_branches(model_pack: ModelPack, branch_packs: List[ModelPack]) -> List[str]:
+    """Apply each branch's changes to ``model_pack``; earlier branches win a shared key.
+
+    Returns the conflicting paths a later branch also wrote, which were dropped.
+    """
+    per_branch = [_branch_changes(model_pack, branch_pack) for branch_pack in branch_packs]
+    claimed: List[Tuple[str, ...]] = []
+    conflicts: List[str] = []
+    for changes in per_branch:
+        applied: List[Tuple[str, ...]] = []
+        for path, value in changes:
+            if any(path[: len(owned)] == owned or owned[: len(path)] == path for owned in claimed):
+                conflicts.append(".".join(path))
+                continue
+            _set_path(model_pack, path, value)
+            applied.append(path)
+        claimed.extend(applied)
+    return conflicts
+
+
+def _parallel_runner(group: ParallelSpec) -> _Runner:
+    """Run each branch's agents in order, with branches concurrent on their own pack copies.
+
+    After the join, what each branch changed is merged back in branch order; the
+    trajectory stays one shared list so events keep their global order.
+    """
+    branch_runners = [[_make_runner(label) for label in branch] for branch in group.branches]
+
+    async def run_branch(
+        state: GraphState,
+        runners: List[_Runner],
+        config: Optional[RunnableConfig],
+        index: int,
+    ) -> GraphState:
+        with span(f"{group.name}[{index}]", "branch", agents=list(group.branches[index])):
+            for run in runners:
+                state = await run(state, config)
+        return state
+
+    def branch_state(model_pack: ModelPack) -> GraphState:
+        branch_pack = model_pack.model_copy(deep=True)
+        branch_pack.tests["trajectory"] = model_pack.tests.setdefault("trajectory", [])
+        return {"model_pack": branch_pack}
+
+    async def run(state: GraphState, config: Optional[RunnableConfig] = None) -> GraphState:
+        model_pack = state["model_pack"]
+        with span(group.name, "parallel"):
+            _append_trajectory_event(
+                model_pack,
+                type="parallel_start",
+                group=group.name,
+                branches=[list(branch) for branch in group.branches],
+            )
+            results = await asyncio.gather(
+                *(
+                    _run_in_thread(
+                        run_branch(branch_state(model_pack), runners, config, index),
+                        config,
+                    )
+                    for index, runners in enumerate(branch_runners)
+                ),
+                return_exceptions=True,
+            )
+            errors = [str(result) for result in results if isinstance(result, BaseException)]
+            conflicts = _merge_branches(
+                model_pack,
+                [result["model_pack"] for result in results if not isinstance(result, BaseException)],
+            )
+            _append_trajectory_event(
+                model_pack,
+                type="parallel_join",
+                group=group.name,
+                errors=errors,
+                conflicts=conflicts,
+            )
+        if errors:
+            raise RuntimeError(f"parallel group {group.name} failed: {'; '.join(errors)}")
+        return {"model_pack": model_pack}
+
+    if group.timeout_seconds is None:
+        return run
+    return _with_timeout(group.name, group.timeout_seconds, run)
 
 
 def _route(
@@ -180,6 +485,20 @@ def _route(
     return to_node
 
 
+def _budget_exit(state: GraphState, *, from_node: str) -> str | None:
+    """Route to END when the run budget is spent, before any loop or next stage."""
+    tracker = current_run_budget()
+    if tracker is None or not tracker.check():
+        return None
+    _mark_budget_exhausted(state["model_pack"], tracker)
+    return _route(
+        state,
+        from_node=from_node,
+        to_node=END_NODE,
+        reason={"reason": BUDGET_EXHAUSTED_STATUS, "budget": tracker.exhausted_reason},
+    )
+
+
 def _feedback_route(
     state: GraphState,
     *,
@@ -210,6 +529,9 @@ def _feedback_route(
 
 
 def route_after_screen(state: GraphState) -> str:
+    budget_exit = _budget_exit(state, from_node=_node("screen"))
+    if budget_exit is not None:
+        return budget_exit
     model_feedback_target = _feedback_target("model")
     return _feedback_route(
         state,
@@ -221,6 +543,9 @@ def route_after_screen(state: GraphState) -> str:
 
 
 def route_after_model(state: GraphState) -> str:
+    budget_exit = _budget_exit(state, from_node=_node("model"))
+    if budget_exit is not None:
+        return budget_exit
     model_pack = state["model_pack"]
     build_error = str(model_pack.tests.get("build_model_error") or "").strip()
     model_builder = getattr(model_pack.code, "model_builder", None)
@@ -241,6 +566,9 @@ def route_after_model(state: GraphState) -> str:
 
 
 def route_after_solve(state: GraphState) -> str:
+    budget_exit = _budget_exit(state, from_node=_node("solve"))
+    if budget_exit is not None:
+        return budget_exit
     solved_instances = [
         instance
         for instance in state["model_pack"].tests.get("instances", [])
@@ -261,11 +589,21 @@ def route_after_solve(state: GraphState) -> str:
         state,
         from_node=_node("solve"),
         to_node=END_NODE,
-        reason={"reason": "no_solved_instances"},
+        reason={
+            "reason": "no_solved_instances",
+            "precheck_infeasible": sum(
+                1
+                for instance in state["model_pack"].tests.get("instances", [])
+                if str(getattr(instance, "solver_status", "") or "").startswith("precheck_")
+            ),
+        },
     )
 
 
 def route_after_judge(state: GraphState) -> str:
+    budget_exit = _budget_exit(state, from_node=_node("judge"))
+    if budget_exit is not None:
+        return budget_exit
     return _feedback_route(
         state,
         from_node=_node("judge"),
@@ -273,21 +611,13 @@ def route_after_judge(state: GraphState) -> str:
         default_reason={"reason": "judge_completed"},
     )
 
-def _validate_graph_variant(graph_variant: str) -> None:
-    normalized = (graph_variant or MAIN_FULL_GRAPH_VARIANT).strip().lower()
-    if normalized not in SUPPORTED_GRAPH_VARIANTS:
-        raise ValueError(f"Unsupported full graph variant: {graph_variant}")
-
-
-def _add_nodes(graph: StateGraph, node_names: tuple[str, ...]) -> None:
-    for node_name in node_names:
-        graph.add_node(node_name, RUNNERS[node_name])
-
-
 MAX_BUILD_FEEDBACK_RETRIES = 1
 
 
 def route_after_build_feedback(state: GraphState) -> str:
+    budget_exit = _budget_exit(state, from_node=_node("model"))
+    if budget_exit is not None:
+        return budget_exit
     model_pack = state["model_pack"]
     build_error = str(model_pack.tests.get("build_model_error") or "").strip()
     model_builder = getattr(model_pack.code, "model_builder", None)
@@ -317,23 +647,77 @@ def route_after_build_feedback(state: GraphState) -> str:
     )
 
 
+ROUTERS: dict[str, Callable[[GraphState], str]] = {
+    "route_after_build_feedback": route_after_build_feedback,
+    "route_after_model": route_after_model,
+    "route_after_screen": route_after_screen,
+    "route_after_solve": route_after_solve,
+    "route_after_judge": route_after_judge,
+}
+
+
+def load_variant_spec(graph_variant: str = MAIN_FULL_GRAPH_VARIANT) -> GraphSpec:
+    """Load a bundled variant by name, or a spec file by path."""
+    return load_graph_spec(
+        (graph_variant or MAIN_FULL_GRAPH_VARIANT).strip(),
+        agent_nodes=tuple(AGENTS_BY_NODE),
+        routers=tuple(ROUTERS),
+    )
+
+
+def _graph_target(name: str) -> str:
+    return END if name == END_NODE else name
+
+
 def create_graph(graph_variant: str = MAIN_FULL_GRAPH_VARIANT) -> StateGraph:
-    """V5: specify → derive_math → build_model → (feedback → derive_math | END)."""
-    _validate_graph_variant(graph_variant)
+    """Build the StateGraph declared by ``graphs/<graph_variant>.json`` (or a spec path).
+
+    ``main`` is V5: specify → derive_math → build_model → (feedback → derive_math | END).
+    """
+    spec = load_variant_spec(graph_variant)
 
     graph = StateGraph(GraphState)
-    _add_nodes(graph, GENERATION_PATH)
-    graph.add_edge(_node("specify"), _node("math"))
-    graph.add_edge(_node("math"), _node("model"))
-    graph.add_conditional_edges(
-        _node("model"),
-        route_after_build_feedback,
-        {_node("math"): _node("math"), END_NODE: END},
-    )
-    graph.set_entry_point(_node("specify"))
+    for node in spec.nodes.values():
+        graph.add_node(node.name, _node_runner(node))
+    for group in spec.parallel.values():
+        graph.add_node(group.name, _parallel_runner(group))
+    for source, target in spec.edges:
+        graph.add_edge(source, _graph_target(target))
+    for edge in spec.conditional_edges:
+        graph.add_conditional_edges(
+            edge.source,
+            ROUTERS[edge.router],
+            {label: _graph_target(target) for label, target in edge.targets.items()},
+        )
+    graph.set_entry_point(spec.entry)
     return graph
 
 
 def create_app(graph_variant: str = MAIN_FULL_GRAPH_VARIANT):
     graph = create_graph(graph_variant=graph_variant)
     return graph.compile()
+
+
+_COMPILED_APPS: dict[str, object] = {}
+_COMPILED_APPS_LOCK = threading.Lock()
+
+
+def get_app(graph_variant: str = MAIN_FULL_GRAPH_VARIANT):
+    """Return the compiled app for ``graph_variant``, compiling it once per process.
+
+    The compiled graph holds no per-run state (each ``ainvoke`` gets its own
+    ``GraphState``), so one instance is shared by every pipeline run and task.
+    """
+    normalized = (graph_variant or MAIN_FULL_GRAPH_VARIANT).strip()
+    app = _COMPILED_APPS.get(normalized)
+    if app is None:
+        with _COMPILED_APPS_LOCK:
+            app = _COMPILED_APPS.get(normalized)
+            if app is None:
+                app = _COMPILED_APPS[normalized] = create_app(normalized)
+    return app
+
+
+def clear_app_cache() -> None:
+    with _COMPILED_APPS_LOCK:
+        _COMPILED_APPS.clear()
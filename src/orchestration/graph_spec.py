@@ -0,0 +1,226 @@
+# modelpack/orchestration/graph_spec.py
+"""Declarative graph variants.
+
+A variant is a JSON (or YAML, when PyYAML is installed) file under
+``src/orchestration/graphs/``; ``create_graph(graph_variant=...)`` accepts either a bundled
+variant name or a path to such a file::
+
+    {
+      "variant": "full",
+      "entry": "specify_problem",
+      "nodes": {"specify_problem": {}, "screen_data": {"timeout_seconds": 300}},
+      "parallel": {
+        "model_and_data": {
+          "branches": [["build_model", "audit_model"], ["generate_data"]],
+          "timeout_seconds": 1200
+        }
+      },
+      "edges": [["specify_problem", "derive_math"], ["derive_math", "model_and_data"]],
+      "conditional_edges": [
+        {"source": "model_and_data", "router": "route_after_model",
+         "targets": {"generate_data": "screen_data", "END": "END"}}
+      ]
+    }
+
+``nodes`` are agent node names from ``AGENT_SPECS``. A ``parallel`` group is one graph
+node that runs each branch (an agent chain) concurrently on its own copy of the ModelPack;
+at the join each branch's changes are merged back, and where two branches wrote the same
+key the earlier branch wins (the loser is listed in the ``parallel_join`` event).
+``targets`` maps a router's return value to a node (a list means identity); ``END`` is
+always routable so budget exits work from every router.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+GRAPH_SPEC_DIR = Path(__file__).resolve().parent / "graphs"
+GRAPH_SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+END_TARGET = "END"
+
+
+@dataclass(frozen=True)
+class NodeSpec:
+    name: str
+    timeout_seconds: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ParallelSpec:
+    name: str
+    branches: Tuple[Tuple[str, ...], ...]
+    timeout_seconds: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ConditionalEdgeSpec:
+    source: str
+    router: str
+    targets: Dict[str, str]
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    variant: str
+    entry: str
+    description: str = ""
+    nodes: Dict[str, NodeSpec] = field(default_factory=dict)
+    parallel: Dict[str, ParallelSpec] = field(default_factory=dict)
+    edges: Tuple[Tuple[str, str], ...] = ()
+    conditional_edges: Tuple[ConditionalEdgeSpec, ...] = ()
+    source_path: Optional[str] = None
+
+    @property
+    def graph_nodes(self) -> List[str]:
+        return [*self.nodes, *self.parallel]
+
+
+def available_graph_variants() -> List[str]:
+    return sorted(
+        path.stem for path in GRAPH_SPEC_DIR.iterdir() if path.suffix in GRAPH_SPEC_SUFFIXES
+    )
+
+
+def _read_spec_file(path: Path) -> Dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ValueError(f"PyYAML is required to read {path}") from exc
+        payload = yaml.safe_load(text)
+    else:
+        payload = json.loads(text)
+    if not isinstance(payload, dict):
+        raise ValueError(f"Graph spec must be a mapping: {path}")
+    return payload
+
+
+def resolve_graph_spec_path(graph_variant: str) -> Path:
+    candidate = Path(graph_variant)
+    if candidate.suffix.lower() in GRAPH_SPEC_SUFFIXES:
+        if not candidate.is_file():
+            raise ValueError(f"Graph spec file not found: {graph_variant}")
+        return candidate
+    normalized = graph_variant.strip().lower()
+    for suffix in GRAPH_SPEC_SUFFIXES:
+        path = GRAPH_SPEC_DIR / f"{normalized}{suffix}"
+        if path.is_file():
+            return path
+    raise ValueError(
+        f"Unsupported graph variant: {graph_variant} "
+        f"(available: {', '.join(available_graph_variants())})"
+    )
+
+
+def _timeout(value: Any, where: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{where}: timeout_seconds must be a number") from exc
+    if timeout <= 0:
+        raise ValueError(f"{where}: timeout_seconds must be positive")
+    return timeout
+
+
+def parse_graph_spec(
+    payload: Dict[str, Any],
+    *,
+    agent_nodes: Tuple[str, ...],
+    routers: Tuple[str, ...],
+    source_path: Optional[str] = None,
+) -> GraphSpec:
+    """Validate a raw spec against the known agents and routers."""
+    variant = str(payload.get("variant") or (Path(source_path).stem if source_path else ""))
+    where = f"graph variant {variant!r}"
+
+    nodes: Dict[str, NodeSpec] = {}
+    for name, options in (payload.get("nodes") or {}).items():
+        if name not in agent_nodes:
+            raise ValueError(f"{where}: unknown agent node {name!r}")
+        options = options or {}
+        nodes[name] = NodeSpec(name, _timeout(options.get("timeout_seconds"), f"{where}/{name}"))
+
+    parallel: Dict[str, ParallelSpec] = {}
+    for name, options in (payload.get("parallel") or {}).items():
+        if name in agent_nodes:
+            raise ValueError(f"{where}: parallel group {name!r} shadows an agent node")
+        branches = tuple(tuple(branch) for branch in (options or {}).get("branches") or ())
+        if len(branches) < 2:
+            raise ValueError(f"{where}: parallel group {name!r} needs at least two branches")
+        members = [agent for branch in branches for agent in branch]
+        unknown = sorted(set(members) - set(agent_nodes))
+        if unknown:
+            raise ValueError(f"{where}: parallel group {name!r} has unknown agents {unknown}")
+        if len(members) != len(set(members)):
+            raise ValueError(f"{where}: parallel group {name!r} repeats an agent")
+        parallel[name] = ParallelSpec(
+            name,
+            branches,
+            _timeout(options.get("timeout_seconds"), f"{where}/{name}"),
+        )
+
+    graph_nodes = set(nodes) | set(parallel)
+
+    def _check_node(name: str, role: str) -> None:
+        if name not in graph_nodes:
+            raise ValueError(f"{where}: {role} {name!r} is not a declared node or group")
+
+    edges: List[Tuple[str, str]] = []
+    for edge in payload.get("edges") or ():
+        source, target = edge
+        _check_node(source, "edge source")
+        if target != END_TARGET:
+            _check_node(target, "edge target")
+        edges.append((source, target))
+
+    conditional_edges: List[ConditionalEdgeSpec] = []
+    for entry in payload.get("conditional_edges") or ():
+        source = entry["source"]
+        router = entry["router"]
+        _check_node(source, "conditional edge source")
+        if router not in routers:
+            raise ValueError(f"{where}: unknown router {router!r}")
+        raw_targets = entry.get("targets") or {}
+        targets = (
+            {target: target for target in raw_targets}
+            if isinstance(raw_targets, list)
+            else dict(raw_targets)
+        )
+        targets.setdefault(END_TARGET, END_TARGET)
+        for target in targets.values():
+            if target != END_TARGET:
+                _check_node(target, "conditional edge target")
+        conditional_edges.append(ConditionalEdgeSpec(source, router, targets))
+
+    entry_node = str(payload.get("entry") or "")
+    _check_node(entry_node, "entry")
+
+    return GraphSpec(
+        variant=variant,
+        entry=entry_node,
+        description=str(payload.get("description") or ""),
+        nodes=nodes,
+        parallel=parallel,
+        edges=tuple(edges),
+        conditional_edges=tuple(conditional_edges),
+        source_path=source_path,
+    )
+
+
+def load_graph_spec(
+    graph_variant: str,
+    *,
+    agent_nodes: Tuple[str, ...],
+    routers: Tuple[str, ...],
+) -> GraphSpec:
+    path = resolve_graph_spec_path(graph_variant)
+    return parse_graph_spec(
+        _read_spec_file(path),
+        agent_nodes=agent_nodes,
+        routers=routers,
+        source_path=str(path),
+    )
@@ -0,0 +1,295 @@
+# modelpack/orchestration/memo.py
+"""Stage-level memoization keyed by the exact upstream artifacts an agent reads.
+
+Each memoizable agent declares the inputs its prompt is built from (``upstream_reads`` in
+the agent's own module, next to the prompt), the prompts it sends, the LLM callers whose
+model route matters, and the ModelPack paths it writes. The key hashes all of them, so changing
+one stage's prompt or model only invalidates that stage and, through its outputs, the
+stages downstream of it.
+
+Opt-in per agent with ``STAGE_MEMO_AGENTS`` (comma-separated agent node names, or ``all``);
+entries are JSON files under ``STAGE_MEMO_DIR`` (default ``.stage_memo``).
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
+
+import structlog
+from pydantic import BaseModel, TypeAdapter
+
+from ..schemas import CodePack, ModelPack
+
+if TYPE_CHECKING:
+    from .context import PipelineContext
+
+logger = structlog.get_logger(__name__)
+
+MEMO_FORMAT_VERSION = 1
+DEFAULT_MEMO_DIR = ".stage_memo"
+_SPECIFY_CONTEXT_KEYS = ("assumptions", "units", "objective_sense", "scope", "deliverables")
+
+
+def _agent_reads(module_name: str) -> Callable[[ModelPack], Dict[str, Any]]:
+    """``src.agents.<module_name>.upstream_reads``, imported on first use.
+
+    Each agent keeps its read extractor next to the prompt it builds, so the key follows
+    the prompt's inputs when they change.
+    """
+
+    def reads(state: ModelPack) -> Dict[str, Any]:
+        module = importlib.import_module(f"..agents.{module_name}", __package__)
+        upstream_reads: Callable[[ModelPack], Dict[str, Any]] = module.upstream_reads
+        return upstream_reads(state)
+
+    return reads
+
+
+def _build_model_writes(state: ModelPack) -> Tuple[str, ...]:
+    from ..agents.utils import targeted_feedback_payload
+
+    paths: Tuple[str, ...] = ("code.model_builder", "tests.build_model_error")
+    if targeted_feedback_payload(state, "build_model") is not None:
+        # The consumed feedback is cleared; any other pending feedback is left alone.
+        paths += ("tests.last_feedback",)
+    return paths
+
+
+@dataclass(frozen=True)
+class StageMemoSpec:
+    agent: str
+    reads: Callable[[ModelPack], Dict[str, Any]]
+    writes: Callable[[ModelPack], Tuple[str, ...]]
+    produced: Callable[[ModelPack], bool]
+    prompts: Tuple[str, ...]
+    call_type: str
+    route_callers: Tuple[str, ...] = ()
+
+
+STAGE_MEMO_SPECS: Dict[str, StageMemoSpec] = {
+    spec.agent: spec
+    for spec in (
+        StageMemoSpec(
+            "specify_problem",
+            reads=_agent_reads("specify_problem"),
+            writes=lambda state: (
+                "components_nl",
+                *(f"context.{key}" for key in _SPECIFY_CONTEXT_KEYS),
+            ),
+            produced=lambda state: state.components_nl is not None,
+            prompts=("specify_problem_contract", "specify_problem_components"),
+            call_type="structured",
+        ),
+        StageMemoSpec(
+            "derive_math",
+            reads=_agent_reads("derive_math"),
+            writes=lambda state: ("components_math",),
+            produced=lambda state: state.components_math is not None,
+            prompts=("derive_math",),
+            call_type="structured",
+        ),
+        StageMemoSpec(
+            "build_model",
+            reads=_agent_reads("build_model"),
+            writes=_build_model_writes,
+            produced=lambda state: (
+                state.code.model_builder is not None and not state.tests.get("build_model_error")
+            ),
+            prompts=("build_model", "build_model_create_model", "build_model_critique"),
+            call_type="code_generation",
+            route_callers=("build_model.repair", "build_model.critique"),
+        ),
+        StageMemoSpec(
+            "audit_model",
+            reads=_agent_reads("audit_model"),
+            writes=lambda state: ("code.model_builder",),
+            produced=lambda state: state.code.model_builder is not None,
+            prompts=("audit_model",),
+            call_type="code_generation",
+        ),
+        StageMemoSpec(
+            "generate_data",
+            reads=_agent_reads("generate_data"),
+            writes=lambda state: ("code.datagen",),
+            produced=lambda state: state.code.datagen is not None,
+            prompts=("generate_data",),
+            call_type="code_generation",
+        ),
+        StageMemoSpec(
+            "check_solution",
+            reads=_agent_reads("check_solution"),
+            writes=lambda state: ("code.solution_checker", "tests.checker_contract"),
+            produced=lambda state: state.code.solution_checker is not None,
+            prompts=("check_solution",),
+            call_type="code_generation",
+        ),
+    )
+}
+
+
+def _field_adapter(owner: Type[BaseModel], name: str) -> TypeAdapter:
+    return TypeAdapter(owner.model_fields[name].annotation or Any)
+
+
+def _resolve_path(path: str) -> Tuple[str, str]:
+    head, _, tail = path.partition(".")
+    return head, tail
+
+
+def read_path(state: ModelPack, path: str) -> Any:
+    head, tail = _resolve_path(path)
+    if head in {"context", "tests"}:
+        return getattr(state, head).get(tail)
+    if head == "code":
+        return _field_adapter(CodePack, tail).dump_python(getattr(state.code, tail), mode="json")
+    return _field_adapter(ModelPack, head).dump_python(getattr(state, head), mode="json")
+
+
+def write_path(state: ModelPack, path: str, value: Any) -> None:
+    head, tail = _resolve_path(path)
+    if head in {"context", "tests"}:
+        getattr(state, head)[tail] = value
+    elif head == "code":
+        setattr(state.code, tail, _field_adapter(CodePack, tail).validate_python(value))
+    else:
+        setattr(state, head, _field_adapter(ModelPack, head).validate_python(value))
+
+
+class StageMemoStore:
+    """One JSON file per entry: ``<root>/<agent>/<key>.json``."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, agent: str, key: str) -> Path:
+        return self.root / agent / f"{key}.json"
+
+    def load(self, agent: str, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(agent, key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("stage_memo_unreadable", path=str(path), error=str(exc))
+            return None
+        return payload if payload.get("version") == MEMO_FORMAT_VERSION else None
+
+    def save(self, agent: str, key: str, writes: Dict[str, Any]) -> None:
+        path = self._path(agent, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MEMO_FORMAT_VERSION,
+            "agent": agent,
+            "key": key,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "writes": writes,
+        }
+        # Write-then-rename so concurrent readers never see a partial entry.
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def memo_enabled_agents() -> List[str]:
+    raw_value = os.getenv("STAGE_MEMO_AGENTS", "").strip()
+    if not raw_value:
+        return []
+    if raw_value.lower() == "all":
+        return list(STAGE_MEMO_SPECS)
+    return [name.strip() for name in raw_value.split(",") if name.strip() in STAGE_MEMO_SPECS]
+
+
+class StageMemo:
+    """Memoization for one agent: compute the key, restore a hit, record a fresh result."""
+
+    def __init__(self, spec: StageMemoSpec, store: StageMemoStore) -> None:
+        self.spec = spec
+        self.store = store
+
+    def key(self, state: ModelPack) -> str:
+        from ..llm import llm_client
+        from ..prompts import PROMPTS
+
+        routes = {
+            caller: llm_client.resolve_route(self.spec.call_type, caller=caller).model
+            for caller in (self.spec.agent, *self.spec.route_callers)
+        }
+        payload = {
+            "version": MEMO_FORMAT_VERSION,
+            "agent": self.spec.agent,
+            "reads": self.spec.reads(state),
+            "prompts": {name: PROMPTS[name] for name in self.spec.prompts},
+            "routes": routes,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def restore(self, state: ModelPack, key: str) -> bool:
+        entry = self.store.load(self.spec.agent, key)
+        if entry is None:
+            return False
+        for path, value in entry["writes"].items():
+            write_path(state, path, value)
+        logger.info("stage_memo_hit", agent=self.spec.agent, key=key[:12])
+        return True
+
+    def record(
+        self,
+        paths: Tuple[str, ...],
+        state: ModelPack,
+        key: str,
+        llm_calls: List[Dict[str, Any]],
+    ) -> None:
+        """Store ``paths`` of a finished stage.
+
+        Nothing is cached when the stage produced nothing or its last LLM call failed (the
+        agent then keeps its previous artifact, which is not a result for this key).
+        """
+        if not self.spec.produced(state):
+            return
+        own_calls = [
+            call
+            for call in llm_calls
+            if str(call.get("caller") or "").split(".", 1)[0] == self.spec.agent
+        ]
+        if own_calls and not own_calls[-1].get("success"):
+            return
+        writes = {path: read_path(state, path) for path in paths}
+        try:
+            self.store.save(self.spec.agent, key, writes)
+        except OSError as exc:
+            logger.warning("stage_memo_save_failed", agent=self.spec.agent, error=str(exc))
+
+
+_MEMO_STORES: Dict[str, StageMemoStore] = {}
+_MEMO_STORES_LOCK = threading.Lock()
+
+
+def _shared_store(root: str) -> StageMemoStore:
+    with _MEMO_STORES_LOCK:
+        store = _MEMO_STORES.get(root)
+        if store is None:
+            store = _MEMO_STORES[root] = StageMemoStore(root)
+    return store
+
+
+def stage_memo_for(agent: str, context: Optional["PipelineContext"] = None) -> Optional[StageMemo]:
+    """The memo for ``agent`` when it is opted in via ``STAGE_MEMO_AGENTS``.
+
+    A run's ``PipelineContext`` may carry its own store under ``caches["stage_memo"]``.
+    """
+    if agent not in memo_enabled_agents():
+        return None
+    root = os.getenv("STAGE_MEMO_DIR", "").strip() or DEFAULT_MEMO_DIR
+    if context is not None:
+        store = context.cache("stage_memo", lambda: _shared_store(root))
+    else:
+        store = _shared_store(root)
+    return StageMemo(STAGE_MEMO_SPECS[agent], store)
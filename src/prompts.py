@@ -186,6 +186,6 @@ Preserve the exact signature; use every argument. Return Python code only."""
     "generate_data": {"system": """DataGen Author. Write `DataGen(seed: int) -> dict` returning small feasible test data using upstream ids. Sets are lists; indexed parameters are dicts preserving tuple-key order. Use float for continuous values. Code only."""},
     "check_solution": {"system": """SolutionChecker Author. Define top-level `CHECKER_METADATA` then `SolutionChecker(data, solution, tolerance=1e-6)`.
 Use the checker contract's exact names. Check every grounded constraint; skip (with reason) when uncertain.
-Prefer native tuple/index keys with `str(index)` fallback.
+Prefer native tuple/index keys with `str(index)` fallback. Indexed solution values are mappings (`dict`, or `IndexedColumn` for large variables): use `.get`/`[]`/`.items()`, never `isinstance(value, dict)`.
 Return `{"feasible": bool, "violations": str}`. Code only."""},
 }
@@ -0,0 +1,135 @@
+# modelpack/routing.py
+"""Per-agent model routing for LLM calls.
+
+Routes are keyed by the LLM caller label (``specify_problem``, ``build_model``,
+``build_model.critique`` ...) and name either a tier or a literal model. A route may also
+name an ``escalate_to`` model that is retried once when the routed model's output fails
+schema or entrypoint validation.
+
+Configuration comes from ``LLM_MODEL_ROUTES`` (inline JSON) or ``LLM_MODEL_ROUTES_FILE``
+(JSON, or YAML when PyYAML is installed)::
+
+    {
+      "tiers": {"cheap": "openrouter/openai/gpt-5-mini", "strong": "openrouter/openai/gpt-5.2"},
+      "routes": {
+        "specify_problem": "cheap",
+        "build_model": "strong",
+        "build_model.critique": {"model": "cheap", "escalate_to": "strong"}
+      }
+    }
+
+``LLM_MODEL_TIER_<NAME>`` env vars override or add tiers. The built-in tiers ``structured``
+and ``code`` resolve to the client's ``STRUCTURED_MODEL_NAME`` / ``CODE_MODEL_NAME``.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_TIER_ENV_PREFIX = "LLM_MODEL_TIER_"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    model: str
+    escalate_to: Optional[str] = None
+    route_key: Optional[str] = None
+
+
+def _load_routes_file(path: str) -> Dict[str, Any]:
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ValueError(f"PyYAML is required to read {path}") from exc
+        payload = yaml.safe_load(text)
+    else:
+        payload = json.loads(text)
+    if not isinstance(payload, dict):
+        raise ValueError(f"Model routing config must be a mapping: {path}")
+    return payload
+
+
+def load_routing_config() -> Dict[str, Any]:
+    """Read the routing config from the environment (empty when nothing is configured)."""
+    inline = os.getenv("LLM_MODEL_ROUTES", "").strip()
+    config_path = os.getenv("LLM_MODEL_ROUTES_FILE", "").strip()
+    try:
+        if inline:
+            payload = json.loads(inline)
+            if not isinstance(payload, dict):
+                raise ValueError("LLM_MODEL_ROUTES must be a JSON object")
+            return payload
+        if config_path:
+            return _load_routes_file(config_path)
+    except (OSError, ValueError) as exc:
+        logger.error("model_routing_config_invalid", error=str(exc))
+    return {}
+
+
+class ModelRouter:
+    """Resolve the model (and escalation model) for an LLM caller label."""
+
+    def __init__(
+        self,
+        *,
+        structured_model: str,
+        code_model: str,
+        tiers: Optional[Mapping[str, str]] = None,
+        routes: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self.tiers: Dict[str, str] = {"structured": structured_model, "code": code_model}
+        self.tiers.update({str(name): str(model) for name, model in (tiers or {}).items()})
+        self.routes: Dict[str, Any] = dict(routes or {})
+
+    @classmethod
+    def from_env(cls, *, structured_model: str, code_model: str) -> "ModelRouter":
+        config = load_routing_config()
+        tiers = dict(config.get("tiers") or {})
+        for name, value in os.environ.items():
+            if name.startswith(_TIER_ENV_PREFIX) and value.strip():
+                tiers[name[len(_TIER_ENV_PREFIX) :].lower()] = value.strip()
+        return cls(
+            structured_model=structured_model,
+            code_model=code_model,
+            tiers=tiers,
+            routes=config.get("routes") or {},
+        )
+
+    def _model(self, name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        return self.tiers.get(str(name), str(name))
+
+    def _route_entry(self, caller: str) -> tuple[Optional[str], Any]:
+        # "build_model.critique" falls back to "build_model" when it has no route of its own.
+        key = caller
+        while key:
+            if key in self.routes:
+                return key, self.routes[key]
+            if "." not in key:
+                break
+            key = key.rsplit(".", 1)[0]
+        return None, None
+
+    def resolve(self, caller: str, call_type: str) -> ModelRoute:
+        default_model = self.tiers["code" if call_type == "code_generation" else "structured"]
+        route_key, entry = self._route_entry(caller)
+        if entry is None:
+            return ModelRoute(model=default_model)
+        if isinstance(entry, Mapping):
+            model = self._model(entry.get("model")) or default_model
+            escalate_to = self._model(entry.get("escalate_to"))
+        else:
+            model = self._model(entry) or default_model
+            escalate_to = None
+        if escalate_to == model:
+            escalate_to = None
+        return ModelRoute(model=model, escalate_to=escalate_to, route_key=route_key)
@@ -1,5 +1,5 @@
 # modelpack/schemas.py
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_serializer, field_validator
 from typing import Literal, Optional, Any, Dict, List, Tuple
 from datetime import datetime
 import uuid
@@ -78,12 +78,34 @@ class TestInstance(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     id: str
     data_dict: Dict[str, Any]
+    seed: Optional[int] = None
     solution_dict: Optional[Dict[str, Any]] = None
     solver_status: Optional[str] = None
     feasible: Optional[bool] = None
     objective_value: Optional[float] = None
+    time_limit_seconds: Optional[float] = None
+    solve_wall_seconds: Optional[float] = None
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None
+    node_count: Optional[int] = None
+    iteration_count: Optional[int] = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
+    @field_validator("data_dict", "solution_dict")
+    @classmethod
+    def _compact_large_mappings(cls, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Indexed parameters/solutions above COLUMNAR_MIN_ENTRIES become IndexedColumns.
+        # Imported here: columnar pulls in NumPy, which schemas must not load eagerly.
+        from .columnar import columnar_min_entries, compact_values
+
+        return compact_values(value, columnar_min_entries())
+
+    @field_serializer("data_dict", "solution_dict", when_used="json")
+    def _columns_json(self, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        from .columnar import to_json
+
+        return to_json(value) if value is not None else None
+
 
 class Feedback(BaseModel):
     source_agent: str
@@ -127,6 +149,7 @@ class ModelPack(BaseModel):
         default_factory=lambda: {
             "instances": [],
             "llm_trace": [],
+            "llm_trace_blobs": {},  # sha256 -> text, referenced from llm_trace as {"$blob": ...}
             "trajectory": [],
             "last_feedback": None,
             "retry_counts": {},  # Track retries per agent
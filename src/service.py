@@ -0,0 +1,553 @@
+# modelpack/service.py
+"""Long-running local HTTP service for the modeling pipeline.
+
+``python -m src serve`` keeps one process warm (imports, compiled graph, solver probe,
+pooled HTTP sessions) and runs submitted problems from a bounded in-process job queue:
+
+    POST /jobs                      {"problem": "...", "mode": "pipeline", "graph_variant": "full",
+                                     "model": "...", "budget": {"max_llm_tokens": 200000}}
+    GET  /jobs                      recent jobs
+    GET  /jobs/<id>                 status
+    GET  /jobs/<id>/model_pack      full ModelPack JSON (once finished)
+    GET  /jobs/<id>/code            generated sources (once finished)
+    GET  /health                    queue depth, workers, solver
+
+A full queue answers ``429``. Each job runs its pipeline on a thread of a pool sized to the
+worker count, with its own event loop (agents make blocking LLM and solver calls), inside its
+own ``PipelineContext`` so a job's ``model`` and ``budget`` never leak into concurrent jobs.
+The per-job timeout is also the run budget's ``max_seconds``: a job past it is reported as
+``timeout`` and its pipeline stops at the next stage boundary, and its worker slot is freed
+only once the thread has returned, so timed-out runs never pile up behind the queue.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from .env import env_positive
+
+if TYPE_CHECKING:
+    from .orchestration.budget import RunBudget
+
+logger = structlog.get_logger(__name__)
+
+JOB_MODES = ("pipeline", "single_agent")
+FINISHED_STATUSES = {"completed", "failed", "timeout"}
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    workers: int = 2
+    max_queue: int = 32
+    job_timeout_seconds: int = 1800
+    max_retained_jobs: int = 500
+
+    @classmethod
+    def from_env(cls) -> "ServiceConfig":
+        defaults = cls()
+        return cls(
+            host=os.getenv("SERVE_HOST", "").strip() or defaults.host,
+            port=env_positive("SERVE_PORT", defaults.port, int),
+            workers=env_positive("SERVE_WORKERS", defaults.workers, int),
+            max_queue=env_positive("SERVE_MAX_QUEUE", defaults.max_queue, int),
+            job_timeout_seconds=env_positive(
+                "SERVE_JOB_TIMEOUT_SECONDS",
+                defaults.job_timeout_seconds,
+                int,
+            ),
+            max_retained_jobs=env_positive(
+                "SERVE_MAX_RETAINED_JOBS",
+                defaults.max_retained_jobs,
+                int,
+            ),
+        )
+
+
+@dataclass
+class Job:
+    job_id: str
+    problem_text: str
+    target_interface: str = ""
+    mode: str = "pipeline"
+    graph_variant: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    model: Optional[str] = None
+    budget: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    model_pack: Any = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "mode": self.mode,
+            "graph_variant": self.graph_variant,
+            "model": self.model,
+            "budget": self.budget,
+            "status": self.status,
+            "pipeline_status": getattr(self.model_pack, "status", None),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": _elapsed(self.submitted_at, self.started_at),
+            "run_seconds": _elapsed(self.started_at, self.finished_at),
+        }
+
+
+def _elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round(end - start, 3)
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class JobService:
+    """Bounded asyncio job queue served by a fixed pool of worker tasks.
+
+    The event loop runs on a background thread; HTTP handler threads talk to it through
+    ``run_coroutine_threadsafe``.
+    """
+
+    def __init__(self, config: Optional[ServiceConfig] = None) -> None:
+        self.config = config or ServiceConfig.from_env()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Bound to the service loop on first use.
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=self.config.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self.warmup_info: Dict[str, Any] = {}
+
+    # ---- lifecycle -------------------------------------------------------------------
+
+    def start(self) -> None:
+        self.warmup_info = warm_up()
+        # One thread per worker task: a task holds its thread until the job returns.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.workers,
+            thread_name_prefix="job-worker",
+        )
+        self._thread = threading.Thread(target=self._run_loop, name="job-service", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._workers = [
+            loop.create_task(self._worker(index)) for index in range(self.config.workers)
+        ]
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+
+        def _shutdown() -> None:
+            for task in self._workers:
+                task.cancel()
+            loop.stop()
+
+        loop.call_soon_threadsafe(_shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        from .http_pool import close_http_pool
+
+        close_http_pool()
+
+    # ---- jobs ------------------------------------------------------------------------
+
+    def submit(
+        self,
+        problem_text: str,
+        *,
+        target_interface: str = "",
+        mode: str = "pipeline",
+        graph_variant: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        model: Optional[str] = None,
+        budget: Optional[Dict[str, Any]] = None,
+    ) -> Job:
+        if mode not in JOB_MODES:
+            raise ValueError(f"Unsupported job mode: {mode}")
+        budget = dict(budget or {})
+        _job_budget(budget)
+        if graph_variant:
+            # Fail at submit time rather than in the worker; compiled apps are cached.
+            from .orchestration.graph import get_app
+
+            get_app(graph_variant)
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            problem_text=problem_text,
+            target_interface=target_interface,
+            mode=mode,
+            graph_variant=graph_variant,
+            timeout_seconds=timeout_seconds,
+            model=model,
+            budget=budget,
+        )
+        if self._loop is None:
+            raise RuntimeError("job service is not started")
+        future = asyncio.run_coroutine_threadsafe(self._enqueue(job), self._loop)
+        future.result()
+        return job
+
+    async def _enqueue(self, job: Job) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as exc:
+            raise QueueFullError(f"job queue is full ({self.config.max_queue})") from exc
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+            self._evict_finished_jobs()
+        logger.info("service_job_queued", job_id=job.job_id, queue_depth=self._queue.qsize())
+
+    def _evict_finished_jobs(self) -> None:
+        overflow = len(self._jobs) - self.config.max_retained_jobs
+        if overflow <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES
+        ][:overflow]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            self._active += 1
+            job.status = "running"
+            job.started_at = time.time()
+            timeout = job.timeout_seconds or self.config.job_timeout_seconds
+            logger.info("service_job_started", job_id=job.job_id, worker=index)
+            run = asyncio.get_running_loop().run_in_executor(
+                self._executor, _execute_job, job, timeout
+            )
+            try:
+                job.model_pack = await asyncio.wait_for(asyncio.shield(run), timeout=timeout)
+                job.status = "completed"
+            except asyncio.TimeoutError:
+                job.status = "timeout"
+                job.error = f"job exceeded {timeout}s"
+                # The thread cannot be interrupted mid LLM/solver call, but the run budget
+                # ends the pipeline at its next stage boundary; hold the slot until then.
+                logger.warning("service_job_timeout", job_id=job.job_id, timeout_seconds=timeout)
+                try:
+                    job.model_pack = await run
+                except Exception as exc:
+                    logger.warning("service_job_failed_after_timeout", job_id=job.job_id, error=str(exc))
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "service_shutdown"
+                raise
+            except Exception as exc:
+                job.status = "failed"
+                job.error = str(exc)
+            finally:
+                job.finished_at = time.time()
+                self._active -= 1
+                self._queue.task_done()
+                logger.info(
+                    "service_job_finished",
+                    job_id=job.job_id,
+                    status=job.status,
+                    run_seconds=_elapsed(job.started_at, job.finished_at),
+                )
+
+    def health(self) -> Dict[str, Any]:
+        with self._jobs_lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "status": "ok",
+            "workers": self.config.workers,
+            "active_jobs": self._active,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.config.max_queue,
+            "job_timeout_seconds": self.config.job_timeout_seconds,
+            "jobs": counts,
+            "warmup": self.warmup_info,
+        }
+
+
+def _job_budget(
+    budget: Dict[str, Any],
+    timeout_seconds: Optional[float] = None,
+) -> Optional["RunBudget"]:
+    """``RunBudget`` from a job's ``budget`` payload (default: the env limits).
+
+    ``max_seconds`` is capped at ``timeout_seconds``. ``None`` keeps the env defaults.
+    """
+    from .orchestration.budget import RunBudget
+
+    if not budget and timeout_seconds is None:
+        return None
+    unknown = sorted(set(budget) - set(RunBudget.__dataclass_fields__))
+    if unknown:
+        raise ValueError(f"Unknown budget fields: {', '.join(unknown)}")
+    run_budget = RunBudget(**budget) if budget else RunBudget.from_env()
+    if timeout_seconds is not None and (
+        run_budget.max_seconds is None or run_budget.max_seconds > timeout_seconds
+    ):
+        run_budget = dataclasses.replace(run_budget, max_seconds=float(timeout_seconds))
+    return run_budget
+
+
+def _execute_job(job: Job, timeout_seconds: Optional[float] = None) -> Any:
+    from .__main__ import run_pipeline, run_single_agent_generation
+    from .llm import LLMClient, use_llm_client
+    from .orchestration.context import PipelineContext
+
+    client = LLMClient(model_name=job.model) if job.model else None
+    if job.mode == "single_agent":
+        with use_llm_client(client):
+            return asyncio.run(run_single_agent_generation(job.problem_text))
+    context = PipelineContext(
+        run_id=job.job_id,
+        client=client,
+        budget=_job_budget(job.budget, timeout_seconds),
+    )
+    return asyncio.run(
+        run_pipeline(
+            job.problem_text,
+            target_interface=job.target_interface,
+            graph_variant=job.graph_variant,
+            context=context,
+        )
+    )
+
+
+def warm_up() -> Dict[str, Any]:
+    """Load the pipeline, compile the graph and probe the solver before accepting jobs."""
+    started = time.perf_counter()
+    from .agents.utils import resolve_solver
+    from .llm import llm_client
+    from .orchestration.graph import FULL_GRAPH_NODES, AGENTS_BY_NODE, get_app
+
+    for node_name in FULL_GRAPH_NODES:
+        AGENTS_BY_NODE[node_name].handler
+    get_app(os.getenv("GRAPH_VARIANT") or "main")
+    solver_name, _ = resolve_solver()
+    llm_client.http_pool
+    info = {
+        "solver": solver_name,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info("service_warmed_up", **info)
+    return info
+
+
+def _code_payload(model_pack: Any) -> Dict[str, Optional[Dict[str, str]]]:
+    payload: Dict[str, Optional[Dict[str, str]]] = {}
+    for name in ("model_builder", "datagen", "solution_checker"):
+        blob = getattr(model_pack.code, name, None)
+        payload[name] = (
+            {"filename": blob.filename, "language": blob.language, "source": blob.source}
+            if blob is not None
+            else None
+        )
+    return payload
+
+
+class _ServiceRequestHandler(BaseHTTPRequestHandler):
+    service: JobService
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("service_http_request", line=format % args)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _path_parts(self) -> List[str]:
+        return [part for part in self.path.split("?", 1)[0].split("/") if part]
+
+    def _read_json(self) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None, "request body must be JSON"
+        if not isinstance(payload, dict):
+            return None, "request body must be a JSON object"
+        return payload, None
+
+    def do_POST(self) -> None:
+        if self._path_parts() != ["jobs"]:
+            self._error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        payload, error = self._read_json()
+        if payload is None:
+            self._error(HTTPStatus.BAD_REQUEST, error or "request body must be JSON")
+            return
+        problem_text = str(payload.get("problem") or "")
+        if not problem_text.strip():
+            self._error(HTTPStatus.BAD_REQUEST, "'problem' is required")
+            return
+        timeout_seconds = payload.get("timeout_seconds")
+        budget = payload.get("budget")
+        if budget is not None and not isinstance(budget, dict):
+            self._error(HTTPStatus.BAD_REQUEST, "'budget' must be an object")
+            return
+        try:
+            job = self.service.submit(
+                problem_text,
+                target_interface=str(payload.get("target_interface") or ""),
+                mode=str(payload.get("mode") or "pipeline"),
+                graph_variant=str(payload.get("graph_variant") or "") or None,
+                timeout_seconds=float(timeout_seconds) if timeout_seconds else None,
+                model=str(payload.get("model") or "") or None,
+                budget=budget,
+            )
+        except QueueFullError as exc:
+            self._error(HTTPStatus.TOO_MANY_REQUESTS, str(exc))
+            return
+        except (TypeError, ValueError) as exc:
+            self._error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job.summary())
+
+    def do_GET(self) -> None:
+        parts = self._path_parts()
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, self.service.health())
+            return
+        if parts == ["jobs"]:
+            self._send_json(
+                HTTPStatus.OK, {"jobs": [job.summary() for job in self.service.list_jobs()]}
+            )
+            return
+        if len(parts) < 2 or parts[0] != "jobs" or len(parts) > 3:
+            self._error(HTTPStatus.NOT_FOUND, "not found")
+            return
+
+        job = self.service.get(parts[1])
+        if job is None:
+            self._error(HTTPStatus.NOT_FOUND, f"unknown job {parts[1]}")
+            return
+        if len(parts) == 2:
+            self._send_json(HTTPStatus.OK, job.summary())
+            return
+        if parts[2] not in {"model_pack", "code"}:
+            self._error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        if job.model_pack is None:
+            self._error(HTTPStatus.CONFLICT, f"job is {job.status}; no ModelPack available")
+            return
+        if parts[2] == "model_pack":
+            self._send_json(HTTPStatus.OK, job.model_pack.model_dump(mode="json"))
+        else:
+            self._send_json(HTTPStatus.OK, _code_payload(job.model_pack))
+
+
+def create_server(service: JobService) -> ThreadingHTTPServer:
+    handler = type("ServiceRequestHandler", (_ServiceRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((service.config.host, service.config.port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = ServiceConfig.from_env()
+    parser = argparse.ArgumentParser(
+        prog="python -m src serve",
+        description="Serve the modeling pipeline over a local HTTP job API",
+    )
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=defaults.max_queue,
+        help="Queued jobs accepted before POST /jobs answers 429",
+    )
+    parser.add_argument(
+        "--job-timeout",
+        type=int,
+        default=defaults.job_timeout_seconds,
+        help="Per-job timeout in seconds",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args(argv)
+
+    from .__main__ import configure_logging
+
+    configure_logging(args.verbose)
+
+    config = ServiceConfig(
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        max_queue=max(1, args.max_queue),
+        job_timeout_seconds=max(1, args.job_timeout),
+        max_retained_jobs=defaults.max_retained_jobs,
+    )
+    service = JobService(config)
+    service.start()
+    server = create_server(service)
+    logger.info(
+        "service_listening",
+        host=config.host,
+        port=server.server_address[1],
+        workers=config.workers,
+        max_queue=config.max_queue,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
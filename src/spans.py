@@ -0,0 +1,127 @@
+# modelpack/spans.py
+"""Per-node spans for attributing trajectory events and LLM calls.
+
+A span is opened around each unit of pipeline work (the run, a parallel group, an agent)
+and becomes the parent of every span opened inside it. The active span lives in a
+ContextVar, so it follows work into ``asyncio.to_thread``/``asyncio.run`` threads and stays
+correct when branches of a parallel group interleave. LLM calls and trajectory events carry
+the id of the span they happened in; per-agent accounting filters by span id instead of
+diffing counters that concurrent branches share.
+
+Timestamps are ``time.monotonic()`` offsets from the start of the recording run, so they
+order and time events without wall-clock jumps.
+"""
+
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class SpanRecorder:
+    """Finished spans of one run, in completion order."""
+
+    def __init__(self) -> None:
+        self.origin = time.monotonic()
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def offset(self, monotonic: float) -> float:
+        return round(monotonic - self.origin, 6)
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span.start)
+        return [
+            {
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "kind": span.kind,
+                "start": self.offset(span.start),
+                "end": self.offset(span.end) if span.end is not None else None,
+                "duration_seconds": (
+                    round(span.end - span.start, 6) if span.end is not None else None
+                ),
+                **span.attributes,
+            }
+            for span in spans
+        ]
+
+
+_ACTIVE_SPAN: ContextVar[Optional[Span]] = ContextVar("ACTIVE_SPAN", default=None)
+_ACTIVE_SPAN_RECORDER: ContextVar[Optional[SpanRecorder]] = ContextVar(
+    "ACTIVE_SPAN_RECORDER",
+    default=None,
+)
+
+
+def current_span() -> Optional[Span]:
+    return _ACTIVE_SPAN.get()
+
+
+def current_span_id() -> Optional[str]:
+    active = _ACTIVE_SPAN.get()
+    return active.span_id if active is not None else None
+
+
+def monotonic_offset() -> float:
+    """Seconds since the recording run started (raw ``time.monotonic()`` outside a run)."""
+    now = time.monotonic()
+    recorder = _ACTIVE_SPAN_RECORDER.get()
+    return recorder.offset(now) if recorder is not None else round(now, 6)
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[Span]:
+    """Open a child of the active span for the enclosed block."""
+    parent = _ACTIVE_SPAN.get()
+    opened = Span(
+        name=name,
+        kind=kind,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent is not None else None,
+        start=time.monotonic(),
+        attributes=dict(attributes),
+    )
+    token = _ACTIVE_SPAN.set(opened)
+    try:
+        yield opened
+    except BaseException as exc:
+        opened.attributes["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        opened.end = time.monotonic()
+        _ACTIVE_SPAN.reset(token)
+        recorder = _ACTIVE_SPAN_RECORDER.get()
+        if recorder is not None:
+            recorder.record(opened)
+
+
+@contextmanager
+def recording_spans() -> Iterator[SpanRecorder]:
+    """Collect every span finished inside the block (including in copied contexts)."""
+    recorder = SpanRecorder()
+    token = _ACTIVE_SPAN_RECORDER.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _ACTIVE_SPAN_RECORDER.reset(token)
@@ -0,0 +1,149 @@
+# modelpack/trace_store.py
+"""Content-addressed storage for LLM trace strings.
+
+Prompts, raw outputs and upstream artifacts repeat across the calls of a run (the same
+system prompt on a repair call, the same NL problem in every agent's ``trace_input``).
+In compact mode each long string is stored once in a ``TraceBlobStore`` and call records
+carry ``{"$blob": "<sha256>"}`` references instead.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+BLOB_REF_KEY = "$blob"
+DEFAULT_MIN_BLOB_CHARS = 200
+
+
+def trace_inline_mode() -> bool:
+    """Whether traces keep every string inline (``LLM_TRACE_INLINE=1``)."""
+    raw_value = os.getenv("LLM_TRACE_INLINE", "").strip().lower()
+    return raw_value in {"1", "true", "yes", "on"}
+
+
+def blob_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+
+class TraceBlobStore:
+    """Deduplicating string store keyed by SHA-256 of the content."""
+
+    def __init__(self, min_chars: int = DEFAULT_MIN_BLOB_CHARS) -> None:
+        self.min_chars = min_chars
+        self._blobs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def put(self, text: str) -> str:
+        digest = blob_hash(text)
+        with self._lock:
+            self._blobs.setdefault(digest, text)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        return self._blobs.get(digest)
+
+    def ref(self, value: Any) -> Any:
+        """Return a blob reference for long strings, the value itself otherwise."""
+        if isinstance(value, str) and len(value) >= self.min_chars:
+            return {BLOB_REF_KEY: self.put(value)}
+        return value
+
+    def compact(self, value: Any) -> Any:
+        """Replace every long string inside a JSON-like value with a blob reference."""
+        if isinstance(value, str):
+            return self.ref(value)
+        if isinstance(value, dict):
+            return {key: self.compact(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.compact(item) for item in value]
+        return value
+
+    def as_dict(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._blobs)
+
+
+def inflate_trace_value(value: Any, blobs: Mapping[str, str]) -> Any:
+    """Resolve blob references back into their strings (unknown hashes are left as-is)."""
+    if is_blob_ref(value):
+        return blobs.get(value[BLOB_REF_KEY], value)
+    if isinstance(value, dict):
+        return {key: inflate_trace_value(item, blobs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [inflate_trace_value(item, blobs) for item in value]
+    return value
+
+
+def export_trace(
+    directory: str | Path,
+    *,
+    calls: list,
+    blobs: Mapping[str, str],
+    summary: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, str]:
+    """Write call records to ``calls.jsonl`` and each blob once under ``blobs/<hash>.txt``.
+
+    Blob files are content-addressed, so several runs exported into the same directory
+    share their common prompts on disk.
+    """
+    root = Path(directory)
+    blob_dir = root / "blobs"
+    blob_dir.mkdir(parents=True, exist_ok=True)
+
+    for digest, text in blobs.items():
+        blob_path = blob_dir / f"{digest}.txt"
+        if not blob_path.exists():
+            blob_path.write_text(text, encoding="utf-8")
+
+    calls_path = root / "calls.jsonl"
+    with calls_path.open("w", encoding="utf-8") as handle:
+        for call in calls:
+            handle.write(json.dumps(call, ensure_ascii=False, default=str))
+            handle.write("\n")
+
+    paths = {"calls": str(calls_path), "blobs": str(blob_dir)}
+    if summary is not None:
+        summary_path = root / "summary.json"
+        summary_path.write_text(json.dumps(summary, indent=2, default=str), encoding="utf-8")
+        paths["summary"] = str(summary_path)
+    return paths
+
+
+def load_exported_trace(directory: str | Path) -> list:
+    """Read an exported trace back with blob references resolved."""
+    root = Path(directory)
+    calls = [
+        json.loads(line)
+        for line in (root / "calls.jsonl").read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    blob_dir = root / "blobs"
+    blobs: Dict[str, str] = {}
+    for call in calls:
+        _collect_blob_refs(call, blob_dir, blobs)
+    return [inflate_trace_value(call, blobs) for call in calls]
+
+
+def _collect_blob_refs(value: Any, blob_dir: Path, blobs: Dict[str, str]) -> None:
+    if is_blob_ref(value):
+        digest = value[BLOB_REF_KEY]
+        blob_path = blob_dir / f"{digest}.txt"
+        if digest not in blobs and blob_path.exists():
+            blobs[digest] = blob_path.read_text(encoding="utf-8")
+        return
+    if isinstance(value, dict):
+        for item in value.values():
+            _collect_blob_refs(item, blob_dir, blobs)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_blob_refs(item, blob_dir, blobs)
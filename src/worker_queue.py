@@ -0,0 +1,525 @@
+# modelpack/worker_queue.py
+"""Durable SQLite job queue and worker processes for the pipeline.
+
+Any number of ``python -m src worker`` processes, on one host or several hosts sharing the
+queue directory, pull jobs from one SQLite file, run them through the same entry points as
+``serve`` and write each ModelPack as ``<results>/<job_id>.json``:
+
+    python -m src queue submit problems/ --queue runs/queue.sqlite3 --graph-variant full
+    python -m src worker --queue runs/queue.sqlite3          # start N of these
+    python -m src queue status --queue runs/queue.sqlite3
+    python -m src queue result <job_id> --queue runs/queue.sqlite3
+
+A claimed job holds a lease that the worker's heartbeat thread keeps extending. When a
+worker dies, its lease expires and the job is claimed again, up to ``max_attempts``
+claims in total. Completion is conditional on still owning the lease, so a worker that
+lost its lease (e.g. after a long stall) cannot overwrite the retry's result.
+
+SQLite locking relies on the filesystem: a local disk or a network filesystem with working
+POSIX locks (not every NFS setup has them).
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import structlog
+
+from .env import env_positive
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_QUEUE_PATH = "worker_queue.sqlite3"
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    problem_text TEXT NOT NULL,
+    target_interface TEXT NOT NULL DEFAULT '',
+    mode TEXT NOT NULL DEFAULT 'pipeline',
+    graph_variant TEXT,
+    model TEXT,
+    budget TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    heartbeat_at REAL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    pipeline_status TEXT,
+    error TEXT,
+    result_path TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, submitted_at);
+"""
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    queue_path: str = DEFAULT_QUEUE_PATH
+    results_dir: Optional[str] = None
+    lease_seconds: float = 300.0
+    poll_seconds: float = 2.0
+    max_attempts: int = 3
+
+    @classmethod
+    def from_env(cls) -> "WorkerConfig":
+        defaults = cls()
+        return cls(
+            queue_path=os.getenv("WORKER_QUEUE_PATH", "").strip() or defaults.queue_path,
+            results_dir=os.getenv("WORKER_RESULTS_DIR", "").strip() or None,
+            lease_seconds=env_positive("WORKER_LEASE_SECONDS", defaults.lease_seconds, float),
+            poll_seconds=env_positive("WORKER_POLL_SECONDS", defaults.poll_seconds, float),
+            max_attempts=env_positive("WORKER_MAX_ATTEMPTS", defaults.max_attempts, int),
+        )
+
+
+@dataclass
+class QueuedJob:
+    job_id: str
+    problem_text: str
+    target_interface: str = ""
+    mode: str = "pipeline"
+    graph_variant: Optional[str] = None
+    model: Optional[str] = None
+    budget: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"
+    attempts: int = 0
+    max_attempts: int = 3
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    pipeline_status: Optional[str] = None
+    error: Optional[str] = None
+    result_path: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "QueuedJob":
+        values = {name: row[name] for name in row.keys() if name != "heartbeat_at"}
+        values["budget"] = json.loads(values.get("budget") or "{}")
+        return cls(**values)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "mode": self.mode,
+            "graph_variant": self.graph_variant,
+            "status": self.status,
+            "pipeline_status": self.pipeline_status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "lease_owner": self.lease_owner,
+            "error": self.error,
+            "result_path": self.result_path,
+        }
+
+
+class LeaseLostError(RuntimeError):
+    pass
+
+
+class WorkerQueue:
+    """Queue operations; each call opens its own short SQLite transaction."""
+
+    def __init__(self, path: str | Path, results_dir: str | Path | None = None) -> None:
+        self.path = Path(path)
+        self.results_dir = Path(results_dir) if results_dir else self.path.with_suffix(".results")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same row.
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    # ---- producers -------------------------------------------------------------------
+
+    def submit(
+        self,
+        problem_text: str,
+        *,
+        job_id: Optional[str] = None,
+        target_interface: str = "",
+        mode: str = "pipeline",
+        graph_variant: Optional[str] = None,
+        model: Optional[str] = None,
+        budget: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3,
+    ) -> str:
+        from .service import JOB_MODES, _job_budget
+
+        if mode not in JOB_MODES:
+            raise ValueError(f"Unsupported job mode: {mode}")
+        budget = dict(budget or {})
+        _job_budget(budget)
+        job_id = job_id or uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO jobs (job_id, problem_text, target_interface, mode, graph_variant,"
+                " model, budget, max_attempts, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    problem_text,
+                    target_interface,
+                    mode,
+                    graph_variant,
+                    model,
+                    json.dumps(budget),
+                    max(1, max_attempts),
+                    time.time(),
+                ),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return QueuedJob.from_row(row) if row is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def jobs(self, status: Optional[str] = None, limit: int = 50) -> List[QueuedJob]:
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY submitted_at DESC LIMIT ?"
+        with self._connect() as connection:
+            rows = connection.execute(query, (*params, limit)).fetchall()
+        return [QueuedJob.from_row(row) for row in rows]
+
+    # ---- workers ---------------------------------------------------------------------
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[QueuedJob]:
+        """Lease the oldest queued job, or one whose lease expired; ``None`` when idle.
+
+        Expired jobs that already used all their attempts are marked failed instead.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL,"
+                " error = COALESCE(error, 'lease expired after ' || attempts || ' attempts')"
+                " WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'queued'"
+                " OR (status = 'running' AND lease_expires_at < ?)"
+                " ORDER BY submitted_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "running":
+                logger.warning(
+                    "worker_lease_expired",
+                    job_id=row["job_id"],
+                    previous_owner=row["lease_owner"],
+                    attempts=row["attempts"],
+                )
+            connection.execute(
+                "UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires_at = ?,"
+                " heartbeat_at = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now + lease_seconds, now, now, row["job_id"]),
+            )
+        return self.get(row["job_id"])
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease; ``False`` when ``worker_id`` no longer owns the job."""
+        now = time.time()
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ?"
+                " WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, model_pack: Any) -> Path:
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        result_path = self.results_dir / f"{job_id}.json"
+        tmp_path = result_path.with_suffix(f".{worker_id}.tmp")
+        tmp_path.write_text(model_pack.model_dump_json(indent=2), encoding="utf-8")
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ?, pipeline_status = ?,"
+                " error = NULL, result_path = ?, lease_owner = NULL, lease_expires_at = NULL"
+                " WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), getattr(model_pack, "status", None), str(result_path), job_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                tmp_path.unlink(missing_ok=True)
+                raise LeaseLostError(f"lease on {job_id} lost before completion")
+            os.replace(tmp_path, result_path)
+        return result_path
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """Requeue the job while it has attempts left, else mark it failed; returns the status."""
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT attempts, max_attempts FROM jobs"
+                " WHERE job_id = ? AND lease_owner = ? AND status = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                raise LeaseLostError(f"lease on {job_id} lost before failure was recorded")
+            status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL,"
+                " lease_expires_at = NULL, finished_at = ? WHERE job_id = ?",
+                (status, error, time.time() if status == "failed" else None, job_id),
+            )
+        return status
+
+    def load_result(self, job_id: str) -> Optional[Any]:
+        from .schemas import ModelPack
+
+        job = self.get(job_id)
+        if job is None or not job.result_path:
+            return None
+        return ModelPack.model_validate_json(Path(job.result_path).read_text(encoding="utf-8"))
+
+
+class _Heartbeat:
+    """Background thread extending one job's lease every third of the lease period."""
+
+    def __init__(self, queue: WorkerQueue, job_id: str, worker_id: str, lease_seconds: float) -> None:
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                owned = self.queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds)
+            except sqlite3.Error as exc:
+                # Keep trying; the lease only lapses if the queue stays unreachable.
+                logger.warning("worker_heartbeat_failed", job_id=self.job_id, error=str(exc))
+                continue
+            if not owned:
+                self.lost = True
+                logger.warning("worker_lease_lost", job_id=self.job_id, worker_id=self.worker_id)
+                return
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(
+    queue: WorkerQueue,
+    config: WorkerConfig,
+    *,
+    worker_id: Optional[str] = None,
+    max_jobs: Optional[int] = None,
+    exit_when_idle: bool = False,
+) -> int:
+    """Claim and run jobs until ``max_jobs`` are done (or the queue is idle); returns the count."""
+    from .service import Job, _execute_job
+
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    logger.info("worker_started", worker_id=worker_id, queue=str(queue.path))
+    while max_jobs is None or processed < max_jobs:
+        queued = queue.claim(worker_id, config.lease_seconds)
+        if queued is None:
+            if exit_when_idle:
+                break
+            time.sleep(config.poll_seconds)
+            continue
+
+        logger.info("worker_job_started", job_id=queued.job_id, attempt=queued.attempts)
+        job = Job(
+            job_id=queued.job_id,
+            problem_text=queued.problem_text,
+            target_interface=queued.target_interface,
+            mode=queued.mode,
+            graph_variant=queued.graph_variant,
+            model=queued.model,
+            budget=queued.budget,
+        )
+        with _Heartbeat(queue, queued.job_id, worker_id, config.lease_seconds):
+            try:
+                model_pack = _execute_job(job)
+                error = None
+            except Exception as exc:
+                model_pack = None
+                error = str(exc) or type(exc).__name__
+        try:
+            if error is None:
+                queue.complete(queued.job_id, worker_id, model_pack)
+                status = "completed"
+            else:
+                status = queue.fail(queued.job_id, worker_id, error)
+        except LeaseLostError as exc:
+            status = "lease_lost"
+            logger.warning("worker_result_discarded", job_id=queued.job_id, error=str(exc))
+        logger.info("worker_job_finished", job_id=queued.job_id, status=status, error=error)
+        processed += 1
+    return processed
+
+
+def worker_main(argv: Optional[List[str]] = None) -> int:
+    defaults = WorkerConfig.from_env()
+    parser = argparse.ArgumentParser(
+        prog="python -m src worker",
+        description="Run pipeline jobs from a shared SQLite queue",
+    )
+    parser.add_argument("--queue", default=defaults.queue_path, help="SQLite queue file")
+    parser.add_argument("--results", default=defaults.results_dir, help="ModelPack output directory")
+    parser.add_argument("--lease-seconds", type=float, default=defaults.lease_seconds)
+    parser.add_argument("--poll-seconds", type=float, default=defaults.poll_seconds)
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args(argv)
+
+    from .__main__ import configure_logging
+    from .http_pool import close_http_pool
+    from .service import warm_up
+
+    configure_logging(args.verbose)
+    config = WorkerConfig(
+        queue_path=args.queue,
+        results_dir=args.results,
+        lease_seconds=args.lease_seconds,
+        poll_seconds=args.poll_seconds,
+        max_attempts=defaults.max_attempts,
+    )
+    queue = WorkerQueue(config.queue_path, config.results_dir)
+    warm_up()
+    try:
+        processed = run_worker(
+            queue,
+            config,
+            worker_id=args.worker_id,
+            max_jobs=args.max_jobs,
+            exit_when_idle=args.exit_when_idle,
+        )
+    except KeyboardInterrupt:
+        # The claimed job's lease expires and another worker retries it.
+        return 130
+    finally:
+        close_http_pool()
+    print(f"Processed {processed} jobs")
+    return 0
+
+
+def queue_main(argv: Optional[List[str]] = None) -> int:
+    defaults = WorkerConfig.from_env()
+    parser = argparse.ArgumentParser(
+        prog="python -m src queue",
+        description="Submit to and inspect the SQLite job queue",
+    )
+    parser.add_argument("--queue", default=defaults.queue_path, help="SQLite queue file")
+    parser.add_argument("--results", default=defaults.results_dir, help="ModelPack output directory")
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    submit = actions.add_parser("submit", help="Queue a problem file, a directory of *.txt or a JSONL file")
+    submit.add_argument("input")
+    submit.add_argument("--mode", default="pipeline")
+    submit.add_argument("--graph-variant", default=None)
+    submit.add_argument("--model", default=None)
+    submit.add_argument("--max-attempts", type=int, default=defaults.max_attempts)
+
+    status = actions.add_parser("status", help="Job counts and recent jobs")
+    status.add_argument("--state", choices=JOB_STATUSES, default=None)
+    status.add_argument("--limit", type=int, default=20)
+
+    result = actions.add_parser("result", help="Print a finished job's ModelPack JSON path or contents")
+    result.add_argument("job_id")
+    result.add_argument("--print", action="store_true", help="Print the ModelPack JSON")
+
+    args = parser.parse_args(argv)
+    queue = WorkerQueue(args.queue, args.results)
+
+    if args.action == "submit":
+        from .batch import BatchItem, load_batch_items
+
+        source = Path(args.input)
+        if source.is_file() and source.suffix != ".jsonl":
+            items = [BatchItem(source.stem, source.read_text(encoding="utf-8"))]
+        else:
+            items = load_batch_items(source)
+        for item in items:
+            job_id = queue.submit(
+                item.problem_text,
+                target_interface=item.target_interface,
+                mode=args.mode,
+                graph_variant=args.graph_variant,
+                model=args.model,
+                max_attempts=args.max_attempts,
+            )
+            print(f"{item.item_id}\t{job_id}")
+        return 0
+
+    if args.action == "status":
+        print(json.dumps(queue.counts()))
+        for listed in queue.jobs(args.state, args.limit):
+            print(json.dumps(listed.summary()))
+        return 0
+
+    job = queue.get(args.job_id)
+    if job is None:
+        print(f"Error: unknown job {args.job_id}")
+        return 1
+    if job.status != "completed" or not job.result_path:
+        print(json.dumps(job.summary()))
+        return 1
+    if args.print:
+        print(Path(job.result_path).read_text(encoding="utf-8"))
+    else:
+        print(job.result_path)
+    return 0